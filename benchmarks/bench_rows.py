@@ -0,0 +1,93 @@
+"""
+Compare the per-row allocations of the dict-based and index-aligned row paths.
+
+Usage:
+    python benchmarks/bench_rows.py [--rows N] [--columns N]
+
+The "dict" path reproduces the former chain: include and exclude dict copies
+in the pipeline, a normalized dict per row, then csv.DictWriter. The "list"
+path is the current one: a single header-aligned list per row, consumed by
+csv.writer.writerows.
+
+For allocations, the intermediate objects each path creates per row are kept
+alive and measured with tracemalloc; throughput is measured separately.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import time
+import tracemalloc
+from decimal import Decimal
+from typing import Callable, Dict, List
+
+from json_to_excel_converter.io_table import _normalize_cell, _row_values
+
+Row = Dict[str, object]
+
+
+def make_rows(n: int, columns: int) -> List[Row]:
+    keys = [f"group{c % 5}.field{c}" for c in range(columns)]
+    return [{k: (i, f"v{i}", Decimal("1.25"), None, True)[c % 5] for c, k in enumerate(keys)} for i in range(n)]
+
+
+def dict_intermediates(row: Row, headers: List[str]) -> list:
+    included = {k: v for k, v in row.items()}
+    filtered = {k: v for k, v in included.items()}
+    normalized = {k: _normalize_cell(filtered.get(k)) for k in headers}
+    return [included, filtered, normalized, [normalized.get(k, "") for k in headers]]
+
+
+def list_intermediates(row: Row, headers: List[str]) -> list:
+    return [_row_values(row, headers)]
+
+
+def dict_write(rows: List[Row], headers: List[str]) -> None:
+    writer = csv.DictWriter(io.StringIO(), fieldnames=headers, extrasaction="ignore")
+    for row in rows:
+        included = {k: v for k, v in row.items()}
+        filtered = {k: v for k, v in included.items()}
+        writer.writerow({k: _normalize_cell(filtered.get(k)) for k in headers})
+
+
+def list_write(rows: List[Row], headers: List[str]) -> None:
+    csv.writer(io.StringIO()).writerows(_row_values(row, headers) for row in rows)
+
+
+def allocated_per_row(fn: Callable[[Row, List[str]], list], rows: List[Row], headers: List[str]) -> tuple[float, float]:
+    """(bytes, objects) allocated per row by fn's intermediates."""
+    tracemalloc.start()
+    kept = [fn(row, headers) for row in rows]
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    objects = sum(len(k) for k in kept)
+    return size / len(rows), objects / len(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--columns", type=int, default=30)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows, args.columns)
+    headers = list(rows[0])
+    sample = rows[: min(len(rows), 10_000)]
+
+    for name, intermediates, write in (
+        ("dict", dict_intermediates, dict_write),
+        ("list", list_intermediates, list_write),
+    ):
+        per_row_bytes, per_row_objects = allocated_per_row(intermediates, sample, headers)
+        t0 = time.perf_counter()
+        write(rows, headers)
+        elapsed = time.perf_counter() - t0
+        print(
+            f"{name:>4}: {per_row_objects:.0f} containers/row  {per_row_bytes:>8,.0f} B/row  "
+            f"{args.rows / elapsed:>12,.0f} rows/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
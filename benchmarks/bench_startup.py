@@ -0,0 +1,76 @@
+"""
+Measure CLI start-up: import time of the package and wall time of short runs.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat N] [--top N]
+
+Each command runs in a fresh interpreter N times and the median is reported:
+importing the CLI module, `--help`, and converting a tiny file to CSV (the
+case that dominates when thousands of small files are converted). The
+slowest imports (cumulative, from `python -X importtime`) are listed last.
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+
+def run_ms(args: List[str], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run(args, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def import_times(module: str) -> List[Tuple[str, int, int]]:
+    """(module, self us, cumulative us) for every module imported by module."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    cli = [sys.executable, "-c", "import sys; from json_to_excel_converter import main; sys.exit(main())"]
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "small.json"
+        src.write_text('[{"id": 1, "a": {"b": 2}}, {"id": 2, "a": {"b": 3}}]', encoding="utf-8")
+        cases = [
+            ("import cli", [sys.executable, "-c", "import json_to_excel_converter.cli"]),
+            ("--help", [*cli, "--help"]),
+            ("small csv", [*cli, str(src), str(Path(tmp) / "out.csv")]),
+            ("python only", [sys.executable, "-c", "pass"]),
+        ]
+        for name, cmd in cases:
+            print(f"{name:>12}: {run_ms(cmd, args.repeat):8.1f} ms")
+
+    rows = import_times("json_to_excel_converter.cli")
+    print("\nslowest imports of json_to_excel_converter.cli (cumulative):")
+    for name, _self_us, cumulative_us in sorted(rows, key=lambda r: -r[2])[: args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
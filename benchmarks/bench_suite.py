@@ -0,0 +1,205 @@
+"""
+Stage-by-stage throughput benchmark on synthetic inputs, with baseline comparison.
+
+Usage:
+    python benchmarks/bench_suite.py [--size 10MB] [--shapes wide,deep,arrays,object-root]
+        [--writers csv,xlsx-stream] [--parser auto] [--report report.json]
+        [--baseline benchmarks/baseline.json [--tolerance 0.25]] [--save-baseline FILE]
+
+For every shape (see generate.py) and writer, a fresh interpreter converts the
+generated input and times each stage separately (exclusive time, measured in
+one pass):
+
+    parse    io_json.iter_items (--parser: auto, stream or memory)
+    flatten  flatten.iter_flatten_record (no filter)
+    filter   filters.ColumnFilter.filter_row with the shape's --exclude prefixes
+    headers  io_table._collect_headers (sampling 1000 rows)
+    write    the writer consuming header-aligned rows
+
+The JSON report has rows/s, MB/s and peak RSS per run and items/s per stage,
+and the JSON parser each run used ("memory" or "stream"; --parser auto picks
+memory up to io_json.DEFAULT_MEMORY_PARSE_LIMIT). With --baseline, end-to-end
+rows/s is compared per (shape, writer, parser) and the
+script exits with status 1 when a run is slower than baseline * (1 - tolerance).
+Inputs are generated once per (shape, size) into --data-dir and reused.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from generate import SHAPES, generate, parse_size
+from json_to_excel_converter.stats import StageClock, peak_rss_mb
+
+WRITERS = ("csv", "xlsx-stream", "xlsx-openpyxl", "parquet", "arrow")
+STAGES = ("parse", "flatten", "filter", "headers", "write")
+
+
+def _writer(name: str) -> Callable[..., None]:
+    from json_to_excel_converter.io_table import XlsxEngine, write_arrow, write_csv, write_parquet, write_xlsx
+
+    return {
+        "csv": write_csv,
+        "xlsx-stream": lambda rows, out, **kw: write_xlsx(rows, out, engine=XlsxEngine.STREAM, **kw),
+        "xlsx-openpyxl": lambda rows, out, **kw: write_xlsx(rows, out, engine=XlsxEngine.OPENPYXL, **kw),
+        "parquet": write_parquet,
+        "arrow": write_arrow,
+    }[name]
+
+
+def run_one(shape: str, writer: str, input_file: Path, output_dir: Path, parser: str = "auto") -> Dict[str, Any]:
+    """One measured conversion (run in a fresh interpreter, see main)."""
+    from json_to_excel_converter.filters import ColumnFilter
+    from json_to_excel_converter.flatten import iter_flatten_record
+    from json_to_excel_converter.io_json import iter_items, use_memory_parser
+    from json_to_excel_converter.io_table import _collect_headers
+
+    settings = SHAPES[shape]
+    column_filter = ColumnFilter((), settings["excludes"], ())
+    suffix = {"xlsx-stream": ".xlsx", "xlsx-openpyxl": ".xlsx", "arrow": ".arrow"}.get(writer, f".{writer}")
+    output = output_dir / f"{shape}{suffix}"
+
+    clock = StageClock("write")
+    start = time.perf_counter()
+    records = clock.wrap("parse", iter_items(input_file, settings["root"], settings["allow_object_values"], parser=parser))
+    flat = clock.wrap(
+        "flatten",
+        (row for rec in records for row in iter_flatten_record(rec, explode_paths=settings["explode"])),
+    )
+    rows = clock.wrap("filter", (column_filter.filter_row(row) for row in flat))
+    headers, _buf, chained = clock.call("headers", _collect_headers, rows, 1000)
+    _writer(writer)(clock.wrap("headers", chained), output, headers=headers)
+    clock.stop()
+    seconds = time.perf_counter() - start
+
+    input_mb = input_file.stat().st_size / 1e6
+    n_rows = clock.items["headers"]
+    return {
+        "shape": shape,
+        "writer": writer,
+        "parser": "memory" if use_memory_parser(input_file, parser) else "stream",
+        "input_mb": round(input_mb, 2),
+        "records": clock.items["parse"],
+        "rows": n_rows,
+        "seconds": round(seconds, 3),
+        "rows_per_s": round(n_rows / seconds),
+        "mb_per_s": round(input_mb / seconds, 2),
+        "peak_rss_mb": peak_rss_mb()["process"],
+        "output_mb": round(output.stat().st_size / 1e6, 2),
+        "stages": {
+            stage: {
+                "seconds": round(clock.seconds[stage], 3),
+                # Items each stage handled: records for parse, rows for the others
+                "items_per_s": round((clock.items["parse"] if stage == "parse" else n_rows) / max(clock.seconds[stage], 1e-9)),
+            }
+            for stage in STAGES
+        },
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions of end-to-end rows/s against baseline runs with the same parser, as messages."""
+    expected = {(r["shape"], r["writer"], r.get("parser")): r for r in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        base = expected.get((result["shape"], result["writer"], result.get("parser")))
+        if base is None:
+            continue
+        ratio = result["rows_per_s"] / base["rows_per_s"]
+        result["vs_baseline"] = round(ratio, 3)
+        if ratio < 1 - tolerance:
+            regressions.append(
+                f"{result['shape']}/{result['writer']}: {result['rows_per_s']:,} rows/s "
+                f"vs baseline {base['rows_per_s']:,} ({ratio:.0%})"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", default="10MB", help="Input size per shape, e.g. 10MB, 1GB, 10GB")
+    parser.add_argument("--shapes", default=",".join(SHAPES))
+    parser.add_argument("--writers", default="csv,xlsx-stream", help=f"Comma-separated, from {', '.join(WRITERS)}")
+    parser.add_argument("--parser", default="auto", choices=("auto", "stream", "memory"), help="JSON parser for the parse stage")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", type=Path, default=Path(tempfile.gettempdir()) / "json-to-excel-bench")
+    parser.add_argument("--report", type=Path, help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", type=Path, help="Compare against this report")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", type=Path, help="Also write the report here as a new baseline")
+    parser.add_argument("--one", nargs=5, metavar=("SHAPE", "WRITER", "INPUT", "OUTDIR", "PARSER"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.one:
+        shape, writer, input_file, output_dir, json_parser = args.one
+        print(json.dumps(run_one(shape, writer, Path(input_file), Path(output_dir), json_parser)))
+        return
+
+    shapes = [s for s in args.shapes.split(",") if s]
+    writers = [w for w in args.writers.split(",") if w]
+    unknown = [s for s in shapes if s not in SHAPES] + [w for w in writers if w not in WRITERS]
+    if unknown:
+        parser.error(f"unknown shape or writer: {', '.join(unknown)}")
+
+    size = parse_size(args.size)
+    args.data_dir.mkdir(parents=True, exist_ok=True)
+    results = []
+    with tempfile.TemporaryDirectory() as out_dir:
+        for shape in shapes:
+            input_file = args.data_dir / f"{shape}-{size}-{args.seed}.json"
+            if not input_file.exists():
+                print(f"generating {input_file} ...", file=sys.stderr)
+                partial = input_file.with_suffix(".partial")
+                generate(shape, partial, size, args.seed)
+                partial.rename(input_file)
+            for writer in writers:
+                proc = subprocess.run(
+                    [sys.executable, __file__, "--one", shape, writer, str(input_file), out_dir, args.parser],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                )
+                result = json.loads(proc.stdout)
+                stages = "  ".join(f"{s} {result['stages'][s]['seconds']:.2f}s" for s in STAGES)
+                print(
+                    f"{shape:>12} {writer:<13} {result['parser']:<6} {result['rows_per_s']:>10,} rows/s {result['mb_per_s']:>7.1f} MB/s "
+                    f"{result['peak_rss_mb']:>7.0f} MB RSS | {stages}",
+                    file=sys.stderr,
+                )
+                results.append(result)
+
+    report = {
+        "meta": {
+            "size": args.size,
+            "seed": args.seed,
+            "parser": args.parser,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    regressions = compare(report, json.loads(args.baseline.read_text()), args.tolerance) if args.baseline else []
+
+    text = json.dumps(report, indent=2)
+    if args.report:
+        args.report.write_text(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        args.save_baseline.write_text(text + "\n")
+    if regressions:
+        print("regressions:\n  " + "\n  ".join(regressions), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Deterministic synthetic JSON inputs for the benchmark suite.
+
+Usage:
+    python benchmarks/generate.py SHAPE OUTPUT.json [--size 100MB] [--seed 0]
+
+Shapes (see SHAPES for the conversion settings each one is benchmarked with):
+    wide         top-level array of flat records with ~150 scalar fields
+    deep         records nested 8 objects deep, a few scalars per level
+    arrays       orders with 1-20 line items and tag lists (for --explode)
+    object-root  {"data": {"<id>": record, ...}} (for --allow-object-values)
+
+Records are written one at a time until the file reaches the requested size,
+so 10 GB inputs need no more memory than 10 MB ones. The same shape, size
+and seed always produce the same bytes.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import orjson
+
+from json_to_excel_converter.io_split import parse_size
+
+_WORDS = ("alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india", "juliet")
+
+
+def _text(rng: random.Random, words: int = 3) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def _scalar(rng: random.Random, kind: int) -> Any:
+    if kind == 0:
+        return rng.randrange(1_000_000)
+    if kind == 1:
+        return round(rng.uniform(0, 10_000), 2)
+    if kind == 2:
+        return _text(rng)
+    if kind == 3:
+        return rng.random() < 0.5
+    return None if rng.random() < 0.3 else _text(rng, 1)
+
+
+def wide_record(rng: random.Random, i: int) -> Dict[str, Any]:
+    record: Dict[str, Any] = {"id": i}
+    for c in range(150):
+        record[f"field_{c:03d}"] = _scalar(rng, c % 5)
+    return record
+
+
+def deep_record(rng: random.Random, i: int) -> Dict[str, Any]:
+    record: Dict[str, Any] = {"id": i}
+    node = record
+    for depth in range(8):
+        child: Dict[str, Any] = {
+            "name": _text(rng, 2),
+            "value": _scalar(rng, depth % 2),
+            "flag": rng.random() < 0.5,
+        }
+        node[f"level{depth}"] = child
+        node = child
+    return record
+
+
+def arrays_record(rng: random.Random, i: int) -> Dict[str, Any]:
+    return {
+        "order_id": f"ORD{i:09d}",
+        "customer": {"name": _text(rng, 2), "email": f"user{i}@example.com", "country": rng.choice(_WORDS)},
+        "items": [
+            {"sku": f"SKU{rng.randrange(100_000):05d}", "price": round(rng.uniform(1, 500), 2), "quantity": rng.randrange(1, 5)}
+            for _ in range(rng.randrange(1, 21))
+        ],
+        "tags": [rng.choice(_WORDS) for _ in range(rng.randrange(0, 6))],
+        "total": round(rng.uniform(1, 5_000), 2),
+    }
+
+
+GENERATORS: Dict[str, Callable[[random.Random, int], Dict[str, Any]]] = {
+    "wide": wide_record,
+    "deep": deep_record,
+    "arrays": arrays_record,
+    "object-root": arrays_record,
+}
+
+# Conversion settings per shape; "filter" feeds the filtering stage
+SHAPES: Dict[str, Dict[str, Any]] = {
+    "wide": {"root": None, "allow_object_values": False, "explode": (), "excludes": ("field_1",)},
+    "deep": {"root": None, "allow_object_values": False, "explode": (), "excludes": ("level0.level1.level2.level3",)},
+    "arrays": {"root": None, "allow_object_values": False, "explode": ("items",), "excludes": ("customer.email",)},
+    "object-root": {"root": "data", "allow_object_values": True, "explode": ("items",), "excludes": ("tags",)},
+}
+
+
+def generate(shape: str, output: Path, target_bytes: int, seed: int = 0) -> int:
+    """Write a shape's input of about target_bytes to output; returns the record count."""
+    make = GENERATORS[shape]
+    rng = random.Random(seed)
+    object_root = shape == "object-root"
+    written = 0
+    count = 0
+    with output.open("wb", buffering=1 << 20) as f:
+        head = b'{"data": {' if object_root else b"["
+        f.write(head)
+        written += len(head)
+        while written < target_bytes or count == 0:
+            body = orjson.dumps(make(rng, count))
+            if object_root:
+                body = orjson.dumps(f"k{count}") + b": " + body
+            chunk = (b",\n" if count else b"\n") + body
+            f.write(chunk)
+            written += len(chunk)
+            count += 1
+        f.write(b"\n}}\n" if object_root else b"\n]\n")
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("shape", choices=sorted(GENERATORS))
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--size", default="100MB")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    count = generate(args.shape, args.output, parse_size(args.size), args.seed)
+    print(f"{args.output}: {count:,} records, {args.output.stat().st_size / 1e6:,.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
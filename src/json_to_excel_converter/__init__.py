@@ -2,4 +2,9 @@ from __future__ import annotations
 
 __all__ = ["main"]
 
-from .cli import main  # re-export for entry point
+
+def main() -> None:
+    """Console entry point; the CLI (typer, rich) is imported only when run."""
+    from .cli import main as cli_main
+
+    cli_main()
@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import glob
+import os
+import pickle
+import tempfile
+import time
+from dataclasses import dataclass
+from functools import partial
+from itertools import batched
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import typer
+from rich.console import Console
+
+from .flatten import ExplodeOverflow, ListPolicy
+from .io_json import NumberMode, ParserMode
+from .io_ndjson import COMPRESSION_SUFFIXES, NDJSON_SUFFIXES, InputFormat, detect_input_format
+from .io_split import SPOOL_BATCH_ROWS
+from .io_table import DEFAULT_BATCH_ROWS, TABLE_SUFFIXES, XlsxEngine, write_table
+from .options import check_common_options
+from .parallel import ordered_map, unordered_map
+from .pipeline import RowOptions, iter_source_rows
+
+batch_app = typer.Typer(add_completion=False, no_args_is_help=True)
+console = Console()
+
+# Files picked up when a directory is given as input
+INPUT_SUFFIXES = frozenset({".json"}) | NDJSON_SUFFIXES
+
+
+@dataclass(frozen=True)
+class BatchSettings:
+    """Everything a worker needs to convert one file."""
+
+    input_format: str
+    read_options: Dict[str, Any]
+    row_options: RowOptions
+    write_options: Dict[str, Any]
+    prune: bool = False
+
+
+@dataclass
+class FileResult:
+    input: Path
+    output: Optional[Path]
+    rows: int = 0
+    input_bytes: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+def _is_input_file(path: Path) -> bool:
+    suffixes = [s.lower() for s in path.suffixes]
+    if suffixes and suffixes[-1] in COMPRESSION_SUFFIXES:
+        suffixes.pop()
+    return bool(suffixes) and suffixes[-1] in INPUT_SUFFIXES
+
+
+def expand_inputs(patterns: Iterable[str]) -> List[Path]:
+    """
+    Resolve files, directories and glob patterns (** included) into input files.
+
+    Directories contribute the .json/.ndjson/.jsonl/.ldjson files (optionally
+    compressed) found directly inside them. Order is sorted and duplicates are
+    dropped.
+    """
+    found: Dict[Path, None] = {}
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            matches = sorted(p for p in path.iterdir() if p.is_file() and _is_input_file(p))
+        elif path.is_file():
+            matches = [path]
+        else:
+            matches = sorted(Path(m) for m in glob.glob(pattern, recursive=True) if os.path.isfile(m))
+        for match in matches:
+            found.setdefault(match.resolve(), None)
+    return list(found)
+
+
+def output_path_for(input_file: Path, base: Path, out_dir: Path, suffix: str) -> Path:
+    """Mirror input_file's location under base into out_dir, with a new suffix."""
+    relative = input_file.relative_to(base)
+    name = relative.name
+    # Drop ".json.gz", ".jsonl", ... but keep dots that are part of the name
+    for _ in range(2):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() not in INPUT_SUFFIXES | COMPRESSION_SUFFIXES:
+            break
+        name = stem
+    return out_dir / relative.parent / f"{name}{suffix}"
+
+
+def duplicate_outputs(tasks: Iterable[Tuple[Path, Path]]) -> Dict[Path, List[Path]]:
+    """Outputs that more than one input maps to (data.json and data.jsonl both become data.csv)."""
+    # Keyed case-insensitively: Data.json and data.json clash on macOS and Windows
+    by_output: Dict[str, Tuple[Path, List[Path]]] = {}
+    for input_file, output_file in tasks:
+        by_output.setdefault(str(output_file).lower(), (output_file, []))[1].append(input_file)
+    return {output_file: inputs for output_file, inputs in by_output.values() if len(inputs) > 1}
+
+
+def _counted(rows: Iterable[dict], result: FileResult) -> Iterator[dict]:
+    for row in rows:
+        result.rows += 1
+        yield row
+
+
+def _read_file(input_file: Path, settings: BatchSettings, result: FileResult) -> Iterator[dict]:
+    input_format = settings.input_format
+    if input_format == InputFormat.AUTO:
+        input_format = detect_input_format(input_file)
+    return _counted(
+        iter_source_rows(input_file, input_format, settings.read_options, settings.row_options, prune=settings.prune),
+        result,
+    )
+
+
+def convert_file(paths: Tuple[Path, Path], settings: BatchSettings) -> FileResult:
+    """
+    Convert one input file to its output (run on the worker processes).
+
+    Failures are reported in the result instead of raised, so one bad file
+    does not stop the batch.
+    """
+    input_file, output_file = paths
+    result = FileResult(input_file, output_file, input_bytes=input_file.stat().st_size)
+    start = time.perf_counter()
+    try:
+        write_table(_read_file(input_file, settings, result), output_file, **settings.write_options)
+    except Exception as exc:
+        result.error = f"{type(exc).__name__}: {exc}"
+        output_file.unlink(missing_ok=True)
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def spool_file_rows(paths: Tuple[Path, Path], settings: BatchSettings) -> FileResult:
+    """
+    Pickle the rows of one input file in batches to a spool file, for merged
+    output (run on the worker processes). A failed file leaves no spool.
+    """
+    input_file, spool = paths
+    result = FileResult(input_file, None, input_bytes=input_file.stat().st_size)
+    start = time.perf_counter()
+    try:
+        with spool.open("wb") as f:
+            for batch in batched(_read_file(input_file, settings, result), SPOOL_BATCH_ROWS):
+                pickle.dump(batch, f, pickle.HIGHEST_PROTOCOL)
+    except Exception as exc:
+        result.error = f"{type(exc).__name__}: {exc}"
+        spool.unlink(missing_ok=True)
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def read_spool(spool: Path) -> Iterator[dict]:
+    """The rows spool_file_rows wrote, one batch in memory at a time; the spool is removed after."""
+    try:
+        with spool.open("rb") as f:
+            while True:
+                try:
+                    batch = pickle.load(f)
+                except EOFError:
+                    return
+                yield from batch
+    finally:
+        spool.unlink(missing_ok=True)
+
+
+def _throughput(rows: int, size: int, seconds: float) -> str:
+    seconds = max(seconds, 1e-9)
+    return (
+        f"{rows:,} rows, {size / 1e6:,.1f} MB in {seconds:.2f}s "
+        f"({rows / seconds:,.0f} rows/s, {size / 1e6 / seconds:,.1f} MB/s)"
+    )
+
+
+def _report(result: FileResult) -> None:
+    if result.error:
+        console.print(f"[red]Failed:[/] {result.input}: {result.error}")
+    else:
+        console.print(f"[dim]{result.input.name}:[/] {_throughput(result.rows, result.input_bytes, result.seconds)}")
+
+
+@batch_app.command()
+def convert_batch(
+    inputs: List[str] = typer.Argument(..., help="Input files, directories or glob patterns (quote globs to expand ** here)"),
+    out_dir: Optional[Path] = typer.Option(None, "--out-dir", help="Write one output per input into this directory", file_okay=False),
+    merge: Optional[Path] = typer.Option(None, "--merge", help="Write the rows of all inputs into this single output file (rows are spooled to temporary files, so memory stays bounded; the file is only written if every input converts)", dir_okay=False),
+    output_format: str = typer.Option("csv", "--format", help="Output format for --out-dir: csv, xlsx, parquet or arrow", case_sensitive=False),
+    workers: int = typer.Option(os.cpu_count() or 1, "--workers", min=1, help="Files converted concurrently (processes)"),
+    root: Optional[str] = typer.Option(None, "--root", help="Root path to iterate (dotted or JSON Pointer)"),
+    allow_object_values: bool = typer.Option(False, "--allow-object-values", help="Iterate object values if root points to an object"),
+    sep: str = typer.Option(".", "--sep", help="Separator for nested keys in flattened columns"),
+    list_policy: str = typer.Option(ListPolicy.JOIN, "--list-policy", help="How to handle lists that are not exploded", case_sensitive=False),
+    list_separator: str = typer.Option(";", "--list-sep", help="Separator for JOIN list policy"),
+    explode: List[str] = typer.Option([], "--explode", help="Dotted key paths to explode into multiple rows (repeatable)", show_default=False),
+    max_explode_rows: Optional[int] = typer.Option(None, "--max-explode-rows", min=1, help="Limit on the rows one record may explode into (default: no limit)"),
+    explode_overflow: str = typer.Option(ExplodeOverflow.ERROR, "--explode-overflow", help="Past --max-explode-rows: error (stop) or truncate (keep the first rows)", case_sensitive=False),
+    where: Optional[str] = typer.Option(None, "--where", help="Only convert records matching this expression (see convert --help)"),
+    include: List[str] = typer.Option([], "--include", help="Only include columns whose dotted path equals or starts with this prefix (repeatable)", show_default=False),
+    exclude: List[str] = typer.Option([], "--exclude", help="Drop columns whose dotted path equals or starts with this prefix (repeatable)", show_default=False),
+    prune_while_parsing: bool = typer.Option(False, "--prune-while-parsing", help="Skip the JSON subtrees --include/--exclude drop while parsing instead of building them (less memory for records with large unused parts)"),
+    sheet_name: str = typer.Option("Sheet1", "--sheet-name", help="XLSX sheet name"),
+    xlsx_engine: str = typer.Option(XlsxEngine.OPENPYXL, "--xlsx-engine", help="XLSX writer: openpyxl (in memory) or stream (constant memory)", case_sensitive=False),
+    batch_rows: int = typer.Option(DEFAULT_BATCH_ROWS, "--batch-rows", min=1, help="Rows per record batch / row group for Parquet and Arrow output"),
+    sample_headers: int = typer.Option(1000, "--sample-headers", help="Number of rows to sample for headers"),
+    header_order: str = typer.Option("stable", "--header-order", help="Header ordering: stable or alpha", case_sensitive=False),
+    first_column: List[str] = typer.Option([], "--first-column", help="Pin a column at the beginning (repeatable)"),
+    number_mode: str = typer.Option(NumberMode.DECIMAL, "--number-mode", help="Parse numbers as decimal (exact), float (fastest) or string", case_sensitive=False),
+    ijson_backend: Optional[str] = typer.Option(None, "--ijson-backend", help="Force an ijson backend (default: fastest available)"),
+    parser: str = typer.Option(ParserMode.AUTO, "--parser", help="JSON parsing: auto (in memory up to --memory-parse-limit), stream (ijson), memory (whole input at once) or split (a top-level array cut into ranges parsed in parallel)", case_sensitive=False),
+    memory_parse_limit: str = typer.Option("32MB", "--memory-parse-limit", help="Largest uncompressed JSON file --parser auto parses in memory"),
+    input_format: str = typer.Option(InputFormat.AUTO, "--input-format", help="Input format: auto (per file), json or ndjson", case_sensitive=False),
+) -> None:
+    """Convert many JSON files at once on a shared process pool."""
+    if (out_dir is None) == (merge is None):
+        raise typer.BadParameter("Pass exactly one of --out-dir or --merge")
+    suffix = merge.suffix.lower() if merge is not None else f".{output_format.lower().lstrip('.')}"
+    if suffix not in TABLE_SUFFIXES:
+        raise typer.BadParameter("Output format must be csv, xlsx, parquet, arrow or feather")
+    checked = check_common_options(
+        root=root,
+        prune_while_parsing=prune_while_parsing,
+        number_mode=number_mode,
+        parser=parser,
+        memory_parse_limit=memory_parse_limit,
+        input_format=input_format,
+        explode_overflow=explode_overflow,
+        xlsx_engine=xlsx_engine,
+        where=where,
+        ijson_backend=ijson_backend,
+    )
+
+    files = expand_inputs(inputs)
+    if not files:
+        raise typer.BadParameter("No input files matched", param_hint="INPUTS")
+
+    settings = BatchSettings(
+        input_format=checked.input_format,
+        read_options=checked.read_options(root, allow_object_values),
+        row_options=RowOptions(
+            sep=sep,
+            list_policy=list_policy.lower(),
+            list_separator=list_separator,
+            explode=tuple(explode),
+            max_explode_rows=max_explode_rows,
+            explode_overflow=checked.explode_overflow,
+            where=where,
+            number_mode=checked.number_mode,
+            includes=tuple(include),
+            excludes=tuple(exclude),
+            pinned_first_columns=tuple(first_column),
+        ),
+        write_options=dict(
+            sheet_name=sheet_name,
+            xlsx_engine=checked.xlsx_engine,
+            batch_rows=batch_rows,
+            max_sample=sample_headers,
+            pre_headers=first_column or None,
+            header_order=header_order.lower(),
+            include_prefixes=include or None,
+        ),
+        prune=prune_while_parsing,
+    )
+
+    workers = min(workers, len(files))
+    console.print(f"[dim]Converting {len(files):,} files on {workers} worker(s)[/]")
+    start = time.perf_counter()
+    results: List[FileResult] = []
+
+    if merge is not None:
+        # Files are flattened concurrently into spool files; one writer streams them in input order
+        with tempfile.TemporaryDirectory(prefix="json-to-excel-merge-") as spool_dir:
+            spools = [(f, Path(spool_dir) / f"{n}.pickle") for n, f in enumerate(files)]
+            spool = partial(spool_file_rows, settings=settings)
+            per_file = ordered_map(spool, spools, workers=workers) if workers > 1 else map(spool, spools)
+
+            def merged_rows() -> Iterator[dict]:
+                for (_f, spool_file), result in zip(spools, per_file):
+                    results.append(result)
+                    _report(result)
+                    if not result.error:
+                        yield from read_spool(spool_file)
+
+            # Renamed to merge only if every file converted, so a failed run leaves no partial merge
+            partial_merge = merge.with_name(f"{merge.stem}.partial{merge.suffix}")
+            try:
+                write_table(merged_rows(), partial_merge, **settings.write_options)
+            except BaseException:
+                partial_merge.unlink(missing_ok=True)
+                raise
+            if any(r.error for r in results):
+                partial_merge.unlink(missing_ok=True)
+            else:
+                os.replace(partial_merge, merge)
+    else:
+        base = Path(os.path.commonpath([f.parent for f in files]))
+        tasks = [(f, output_path_for(f, base, out_dir, suffix)) for f in files]  # type: ignore[arg-type]
+        clashes = duplicate_outputs(tasks)
+        if clashes:
+            output_file, sources = next(iter(clashes.items()))
+            raise typer.BadParameter(
+                f"{', '.join(s.name for s in sources)} would all be written to {output_file}"
+                + (f" ({len(clashes) - 1:,} more clashes)" if len(clashes) > 1 else "")
+                + "; rename the inputs or convert them separately",
+                param_hint="INPUTS",
+            )
+        for _f, output_file in tasks:
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+        convert = partial(convert_file, settings=settings)
+        for result in unordered_map(convert, tasks, workers=workers) if workers > 1 else map(convert, tasks):
+            results.append(result)
+            _report(result)
+
+    elapsed = time.perf_counter() - start
+    failed = [r for r in results if r.error]
+    rows = sum(r.rows for r in results)
+    size = sum(r.input_bytes for r in results)
+    console.print(
+        f"[green]Done:[/] {len(results) - len(failed):,}/{len(files):,} files, {_throughput(rows, size, elapsed)}"
+        + (f" -> {merge}" if merge is not None else f" -> {out_dir}")
+    )
+    if failed:
+        console.print(f"[red]{len(failed):,} file(s) failed[/]" + ("; merged output not written" if merge is not None else ""))
+        raise typer.Exit(code=1)
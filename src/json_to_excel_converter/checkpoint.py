@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import orjson
+
+from .io_table import _collect_headers, _row_values
+from .pipeline import RecordCursor
+
+CHECKPOINT_VERSION = 1
+# Seconds between checkpoints
+DEFAULT_CHECKPOINT_INTERVAL = 60.0
+
+
+@dataclass
+class Checkpoint:
+    """
+    Progress of a checkpointed CSV conversion.
+
+    The first `records` input records are fully written as the first
+    `output_bytes` bytes of the output (`rows` data rows under `headers`).
+    fingerprint identifies the input file, output file and conversion options
+    it is valid for.
+    """
+
+    fingerprint: str
+    headers: List[str]
+    records: int
+    rows: int
+    output_bytes: int
+
+
+def checkpoint_fingerprint(input_file: Path, output_file: Path, settings: Mapping[str, Any]) -> str:
+    """Hash of the input file's identity (path, size, mtime), the output path and settings."""
+    stat = input_file.stat()
+    payload = {
+        "input": str(input_file.resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "output": str(output_file.resolve()),
+        "settings": settings,
+    }
+    return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def save_checkpoint(checkpoint: Checkpoint, checkpoint_file: str | Path) -> None:
+    """Write a checkpoint atomically (temporary file, fsync, rename)."""
+    path = Path(checkpoint_file)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(orjson.dumps({"version": CHECKPOINT_VERSION, **asdict(checkpoint)}))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_checkpoint(checkpoint_file: str | Path) -> Checkpoint:
+    """Load a checkpoint written by save_checkpoint; raises ValueError if it is not one."""
+    path = Path(checkpoint_file)
+    try:
+        payload = orjson.loads(path.read_bytes())
+    except orjson.JSONDecodeError as exc:
+        raise ValueError(f"Invalid checkpoint {path}: {exc}") from exc
+    if not isinstance(payload, dict) or payload.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint {path}: expected version {CHECKPOINT_VERSION}")
+    try:
+        return Checkpoint(
+            fingerprint=payload["fingerprint"],
+            headers=payload["headers"],
+            records=payload["records"],
+            rows=payload["rows"],
+            output_bytes=payload["output_bytes"],
+        )
+    except KeyError as exc:
+        raise ValueError(f"Invalid checkpoint {path}: missing {exc}") from exc
+
+
+def write_csv_checkpointed(
+    rows: Iterable[Dict[str, object]],
+    output_file: str | Path,
+    checkpoint_file: str | Path,
+    *,
+    cursor: RecordCursor,
+    fingerprint: str,
+    resume: Optional[Checkpoint] = None,
+    interval: float = DEFAULT_CHECKPOINT_INTERVAL,
+    max_sample: int = 1000,
+    pre_headers: Sequence[str] | None = None,
+    encoding: str = "utf-8",
+    header_order: str = "stable",
+    include_prefixes: Sequence[str] | None = None,
+    headers: Sequence[str] | None = None,
+) -> Checkpoint:
+    """
+    Write rows to CSV like io_table.write_csv, saving a checkpoint every interval seconds.
+
+    rows must come from pipeline.iter_source_rows with cursor, so record
+    boundaries are known: checkpoints are only taken between two records,
+    after the output has been flushed and fsynced.
+
+    With resume, rows must start after resume.records records (skip_records);
+    the output is truncated to resume.output_bytes and appended to under the
+    checkpoint's headers. Returns the final state; the caller removes the
+    checkpoint file once it no longer needs it.
+    """
+    import csv
+
+    out_path = Path(output_file)
+    it = iter(rows)
+    buffer: List[Dict[str, object]] = []
+    if resume is not None:
+        if not out_path.is_file() or out_path.stat().st_size < resume.output_bytes:
+            raise ValueError(f"Output {out_path} is missing or shorter than its checkpoint; start over without --resume")
+        with out_path.open("r+b") as f:
+            f.truncate(resume.output_bytes)
+        state = resume
+        mode = "a"
+    else:
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        header_list, buffer, _chained = _collect_headers(
+            it,
+            max_sample=max_sample,
+            pre_headers=pre_headers,
+            order=header_order,
+            include_prefixes=include_prefixes,
+            known_headers=headers,
+        )
+        state = Checkpoint(fingerprint, header_list, records=0, rows=0, output_bytes=0)
+        mode = "w"
+
+    columns = state.headers
+    with out_path.open(mode, newline="", encoding=encoding) as f:
+        writer = csv.writer(f)
+        writerow = writer.writerow
+
+        def save(records: int) -> None:
+            f.flush()
+            os.fsync(f.fileno())
+            state.records = records
+            state.output_bytes = os.fstat(f.fileno()).st_size
+            save_checkpoint(state, checkpoint_file)
+
+        if resume is None:
+            writer.writerow(columns)
+            # The sample ran ahead of the cursor, so the first checkpoint comes after it
+            writer.writerows(_row_values(row, columns) for row in buffer)
+            state.rows = len(buffer)
+            buffer.clear()
+
+        started = cursor.records
+        due = time.monotonic() + interval
+        for row in it:
+            if cursor.records != started:
+                # This row opens a new record: all earlier records are written
+                started = cursor.records
+                if time.monotonic() >= due:
+                    save(started - 1)
+                    due = time.monotonic() + interval
+            writerow(_row_values(row, columns))
+            state.rows += 1
+        save(cursor.records)
+    return state
@@ -1,144 +1,403 @@
 from __future__ import annotations
 
+import sys
+import time
+from contextlib import ExitStack, nullcontext
 from pathlib import Path
-from typing import Iterable, Iterator, List, Optional
+from typing import Any, BinaryIO, ContextManager, Iterable, Iterator, List, Optional
 
 import typer
 from rich.console import Console
-from rich.progress import Progress
 
-from .io_json import iter_items
-from .flatten import flatten_record, ListPolicy
-from .io_table import write_csv, write_xlsx
+from .io_array import check_splittable
+from .io_json import PURE_PYTHON_BACKEND, STDIN, ByteCounter, NumberMode, ParserMode, open_input, use_memory_parser
+from .io_ndjson import InputFormat, detect_input_format, sniff_input_format
+from .flatten import ExplodeLimitError, ExplodeOverflow, ListPolicy
+from .checkpoint import DEFAULT_CHECKPOINT_INTERVAL, Checkpoint, checkpoint_fingerprint, load_checkpoint, write_csv_checkpointed
+from .io_split import DEFAULT_MAX_OPEN_FILES, parse_size, write_split
+from .options import check_common_options
+from .io_table import COLUMNAR_SUFFIXES, ColumnTypeError, DEFAULT_BATCH_ROWS, TABLE_SUFFIXES, XlsxEngine, require_pyarrow, write_table
+from .pipeline import MatchCount, RecordCursor, RowOptions, compile_filter, compile_projection, iter_source_rows
+from .progress import byte_progress
+from .schema import discover_schema, load_schema, save_schema, schema_headers
+from .stats import StageClock, StageStalls, build_report, print_report, write_report
+
+# First argument that selects the multi-file command (see batch.py)
+BATCH_COMMAND = "convert-batch"
 
 app = typer.Typer(add_completion=False, no_args_is_help=True)
 console = Console()
 
 
-def _should_exclude(column: str, excludes: List[str]) -> bool:
-    for p in excludes:
-        if not p:
-            continue
-        if column == p or column.startswith(p + "."):
-            return True
-    return False
-
-
-def _should_include(column: str, includes: List[str]) -> bool:
-    for p in includes:
-        if not p:
-            continue
-        if column == p or column.startswith(p + "."):
-            return True
-    return False
-
-
-def _pipeline(
-    input_path: Path,
-    root_path: Optional[str],
-    allow_object_values: bool,
-    sep: str,
-    list_policy: str,
-    list_separator: str,
-    explode: List[str],
-    excludes: List[str],
-    includes: List[str],
-    pinned_first_columns: List[str],
-) -> Iterator[dict]:
-    for rec in iter_items(input_path, root_path=root_path, allow_object_values=allow_object_values):
-        rows = flatten_record(
-            rec,
-            sep=sep,
-            list_policy=list_policy,
-            list_separator=list_separator,
-            explode_paths=explode,
-        )
-        for row in rows:
-            # Apply include filter first (if provided), always retain pinned first columns
-            if includes:
-                filtered = {
-                    k: v
-                    for k, v in row.items()
-                    if _should_include(k, includes) or k in pinned_first_columns
-                }
-            else:
-                filtered = row
-            # Then apply excludes
-            if excludes:
-                filtered = {k: v for k, v in filtered.items() if not _should_exclude(k, excludes)}
-            yield filtered
-
-
 @app.command()
 def convert(
-    input: Path = typer.Argument(..., exists=True, dir_okay=False, readable=True, help="Input JSON file"),
-    output: Path = typer.Argument(..., help="Output file path (.csv or .xlsx)"),
+    input: Path = typer.Argument(..., help="Input JSON file, or - for stdin (gzip/bz2/xz/zstd detected automatically)"),
+    output: Path = typer.Argument(..., help="Output file path (.csv, .xlsx, .parquet or .arrow/.feather)"),
     root: Optional[str] = typer.Option(None, "--root", help="Root path to iterate (dotted or JSON Pointer)"),
     allow_object_values: bool = typer.Option(False, "--allow-object-values", help="Iterate object values if root points to an object"),
     sep: str = typer.Option(".", "--sep", help="Separator for nested keys in flattened columns"),
     list_policy: str = typer.Option(ListPolicy.JOIN, "--list-policy", help="How to handle lists that are not exploded", case_sensitive=False),
     list_separator: str = typer.Option(";", "--list-sep", help="Separator for JOIN list policy"),
     explode: List[str] = typer.Option([], "--explode", help="Dotted key paths to explode into multiple rows (repeatable)", show_default=False),
+    max_explode_rows: Optional[int] = typer.Option(None, "--max-explode-rows", min=1, help="Limit on the rows one record may explode into (default: no limit)"),
+    explode_overflow: str = typer.Option(ExplodeOverflow.ERROR, "--explode-overflow", help="Past --max-explode-rows: error (stop) or truncate (keep the first rows)", case_sensitive=False),
+    where: Optional[str] = typer.Option(None, "--where", help='Only convert records matching this expression, e.g. \'status == "active" and country in ["DE", "FR"]\''),
     include: List[str] = typer.Option([], "--include", help="Only include columns whose dotted path equals or starts with this prefix (repeatable)", show_default=False),
     exclude: List[str] = typer.Option([], "--exclude", help="Drop columns whose dotted path equals or starts with this prefix (repeatable)", show_default=False),
+    prune_while_parsing: bool = typer.Option(False, "--prune-while-parsing", help="Skip the JSON subtrees --include/--exclude drop while parsing instead of building them (less memory for records with large unused parts)"),
     sheet_name: str = typer.Option("Sheet1", "--sheet-name", help="XLSX sheet name"),
+    xlsx_engine: str = typer.Option(XlsxEngine.OPENPYXL, "--xlsx-engine", help="XLSX writer: openpyxl (in memory) or stream (constant memory)", case_sensitive=False),
     sample_headers: int = typer.Option(1000, "--sample-headers", help="Number of rows to sample for headers"),
     header_order: str = typer.Option("stable", "--header-order", help="Header ordering: stable or alpha", case_sensitive=False),
     first_column: List[str] = typer.Option([], "--first-column", help="Pin a column at the beginning (repeatable)"),
+    full_schema: bool = typer.Option(False, "--full-schema", help="Discover headers with a key-only pass over the whole input instead of sampling"),
+    schema: Optional[Path] = typer.Option(None, "--schema", help="Schema index file: reused if it exists, otherwise written after discovery", dir_okay=False),
+    workers: int = typer.Option(1, "--workers", min=1, help="Processes used to flatten and filter records (1 = in-process)"),
+    pipeline: bool = typer.Option(False, "--pipeline", help="Run parsing, flattening and writing on separate threads connected by bounded queues, and report how long each stage waited"),
+    number_mode: str = typer.Option(NumberMode.DECIMAL, "--number-mode", help="Parse numbers as decimal (exact), float (fastest) or string", case_sensitive=False),
+    ijson_backend: Optional[str] = typer.Option(None, "--ijson-backend", help="Force an ijson backend (default: fastest available)"),
+    parser: str = typer.Option(ParserMode.AUTO, "--parser", help="JSON parsing: auto (in memory up to --memory-parse-limit), stream (ijson), memory (whole input at once) or split (a top-level array cut into ranges parsed in parallel)", case_sensitive=False),
+    memory_parse_limit: str = typer.Option("32MB", "--memory-parse-limit", help="Largest uncompressed JSON file --parser auto parses in memory"),
+    batch_rows: int = typer.Option(DEFAULT_BATCH_ROWS, "--batch-rows", min=1, help="Rows per record batch / row group for Parquet and Arrow output"),
+    input_format: str = typer.Option(InputFormat.AUTO, "--input-format", help="Input format: auto (by extension, then content), json or ndjson (one JSON value per line)", case_sensitive=False),
+    stats: bool = typer.Option(False, "--stats", help="Print time per pipeline stage, records in / rows out, bytes read and peak memory"),
+    stats_json: Optional[Path] = typer.Option(None, "--stats-json", help="Also write the --stats summary as JSON to this file (implies --stats)", dir_okay=False),
+    profile: Optional[Path] = typer.Option(None, "--profile", help="Profile the conversion with cProfile and dump the stats to this file", dir_okay=False),
+    split_rows: Optional[int] = typer.Option(None, "--split-rows", min=1, help="Write shards of at most this many rows (out-00001.csv, out-00002.csv, ...)"),
+    split_bytes: Optional[str] = typer.Option(None, "--split-bytes", help="Write CSV shards of about this size, e.g. 500MB or 2GB"),
+    partition_by: Optional[str] = typer.Option(None, "--partition-by", help="Write one shard per value of this (flattened) column: out-<value>.csv"),
+    max_open_files: int = typer.Option(DEFAULT_MAX_OPEN_FILES, "--max-open-files", min=1, help="Shard files kept open at once with --partition-by"),
+    checkpoint: Optional[Path] = typer.Option(None, "--checkpoint", help="Periodically save progress to this file so an interrupted CSV conversion can be resumed", dir_okay=False),
+    resume: bool = typer.Option(False, "--resume", help="Continue from the --checkpoint file, appending to the partially written output"),
+    checkpoint_interval: float = typer.Option(DEFAULT_CHECKPOINT_INTERVAL, "--checkpoint-interval", min=0.0, help="Seconds between checkpoints"),
+    quiet: bool = typer.Option(False, "--quiet", "-q", help="No progress bar or informational messages (warnings and errors are still shown)"),
 ) -> None:
-    """Convert a large JSON file into a flat table (CSV or XLSX)."""
-    if output.suffix.lower() not in {".csv", ".xlsx"}:
-        raise typer.BadParameter("Output must end with .csv or .xlsx")
+    """Convert a large JSON file into a flat table (CSV or XLSX). For many files, use convert-batch."""
 
-    with Progress(transient=True) as progress:
-        task = progress.add_task("Processing", start=False)
-        rows = _pipeline(
-            input,
-            root_path=root,
-            allow_object_values=allow_object_values,
+    def info(message: str) -> None:
+        if not quiet:
+            console.print(message)
+
+    from_stdin = str(input) == STDIN
+    if not from_stdin and not input.is_file():
+        raise typer.BadParameter(f"File '{input}' does not exist or is not a file", param_hint="INPUT")
+    suffix = output.suffix.lower()
+    if suffix not in TABLE_SUFFIXES:
+        raise typer.BadParameter("Output must end with .csv, .xlsx, .parquet, .arrow or .feather")
+    if suffix in COLUMNAR_SUFFIXES:
+        try:
+            require_pyarrow()
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc), param_hint="OUTPUT") from exc
+    checked = check_common_options(
+        root=root,
+        prune_while_parsing=prune_while_parsing,
+        number_mode=number_mode,
+        parser=parser,
+        memory_parse_limit=memory_parse_limit,
+        input_format=input_format,
+        explode_overflow=explode_overflow,
+        xlsx_engine=xlsx_engine,
+        where=where,
+        ijson_backend=ijson_backend,
+    )
+    number_mode, parser, input_format = checked.number_mode, checked.parser, checked.input_format
+    backend_name = checked.backend_name
+
+    split_size: Optional[int] = None
+    if split_bytes is not None:
+        try:
+            split_size = parse_size(split_bytes)
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc), param_hint="--split-bytes") from exc
+        if split_size < 1:
+            raise typer.BadParameter("must be at least 1 byte", param_hint="--split-bytes")
+        if suffix != ".csv":
+            raise typer.BadParameter("splitting by size needs CSV output; use --split-rows", param_hint="--split-bytes")
+    split = split_rows is not None or split_size is not None or partition_by is not None
+    if split and checkpoint is not None:
+        raise typer.BadParameter("split output cannot be checkpointed", param_hint="--checkpoint")
+    if resume and checkpoint is None:
+        raise typer.BadParameter("--resume needs --checkpoint", param_hint="--resume")
+    if checkpoint is not None:
+        if from_stdin:
+            raise typer.BadParameter("stdin cannot be read again, so it cannot be resumed", param_hint="--checkpoint")
+        if suffix != ".csv":
+            raise typer.BadParameter(
+                "only CSV output can be resumed (XLSX, Parquet and Arrow files are unreadable until complete)",
+                param_hint="--checkpoint",
+            )
+
+    collect_stats = stats or stats_json is not None
+    # Bytes read, for the progress bar and the stats; nothing is counted with --quiet alone
+    counter = ByteCounter() if not quiet or collect_stats else None
+    stack = ExitStack()
+    source: Path | BinaryIO = input
+    if from_stdin:
+        # Opened once here so that sniffing the format does not lose any input
+        source = stack.enter_context(open_input(STDIN, counter))
+        if input_format == InputFormat.AUTO:
+            input_format, source = sniff_input_format(source)
+    elif input_format == InputFormat.AUTO:
+        input_format = detect_input_format(input)
+
+    pipeline_options = dict(
+        input_format=input_format,
+        read_options=checked.read_options(root, allow_object_values),
+        options=RowOptions(
             sep=sep,
             list_policy=list_policy.lower(),
             list_separator=list_separator,
-            explode=explode,
-            excludes=exclude,
-            includes=include,
-            pinned_first_columns=first_column,
+            explode=tuple(explode),
+            max_explode_rows=max_explode_rows,
+            explode_overflow=checked.explode_overflow,
+            where=where,
+            number_mode=number_mode,
+            includes=tuple(include),
+            excludes=tuple(exclude),
+            pinned_first_columns=tuple(first_column),
+        ),
+        workers=workers,
+        prune=prune_while_parsing,
+    )
+
+    if input_format == InputFormat.NDJSON:
+        if root or allow_object_values:
+            stack.close()
+            raise typer.BadParameter(
+                "NDJSON input has one record per line; --root and --allow-object-values do not apply",
+                param_hint="--input-format",
+            )
+        info("[dim]Input: NDJSON, one record per line[/]")
+    elif parser == ParserMode.SPLIT:
+        try:
+            check_splittable(source)
+        except ValueError as exc:
+            stack.close()
+            raise typer.BadParameter(str(exc), param_hint="--parser") from exc
+        decoder = "orjson" if number_mode == NumberMode.FLOAT else "json, exact decimals"
+        info(f"[dim]JSON parser: top-level array split into byte ranges ({decoder}{f', {workers} workers' if workers > 1 else ''})[/]")
+    elif use_memory_parser(
+        source,
+        parser,
+        checked.memory_limit,
+        compile_projection(pipeline_options["options"]) if prune_while_parsing else None,  # type: ignore[arg-type]
+    ):
+        info(f"[dim]JSON parser: in memory ({'orjson' if number_mode == NumberMode.FLOAT else 'json, exact decimals'})[/]")
+    elif backend_name == PURE_PYTHON_BACKEND and not ijson_backend:
+        console.print(
+            "[yellow]Warning:[/] no compiled ijson backend is available; "
+            "falling back to the pure-Python parser, which is much slower"
         )
+    else:
+        info(f"[dim]JSON parser: ijson {backend_name}[/]")
 
-        # Wrap rows with a generator that advances a progress bar periodically
-        def progress_rows() -> Iterator[dict]:
-            count = 0
-            progress.start_task(task)
-            for r in rows:
-                count += 1
-                if count % 1000 == 0:
-                    progress.update(task, description=f"Processed {count:,} rows")
-                yield r
-            progress.update(task, description=f"Processed {count:,} rows")
-
-        pre_headers = first_column if first_column else None
-        if output.suffix.lower() == ".csv":
-            write_csv(
-                progress_rows(),
-                output,
-                max_sample=sample_headers,
-                pre_headers=pre_headers,
+    column_filter = compile_filter(pipeline_options["options"])
+
+    resume_from: Optional[Checkpoint] = None
+    if checkpoint is not None:
+        fingerprint = checkpoint_fingerprint(
+            input,
+            output,
+            dict(
+                input_format=input_format,
+                read_options={
+                    # Parser choices do not change the output
+                    k: v
+                    for k, v in pipeline_options["read_options"].items()
+                    if k not in ("backend", "parser", "memory_limit")
+                },
+                row_options=pipeline_options["options"],
+                sample_headers=sample_headers,
                 header_order=header_order.lower(),
-                include_prefixes=include or None,
+                schema=str(schema) if schema is not None else None,
+                full_schema=full_schema,
+            ),
+        )
+        if resume:
+            if not checkpoint.is_file():
+                raise typer.BadParameter(f"No checkpoint at {checkpoint}; run without --resume to start over", param_hint="--resume")
+            try:
+                resume_from = load_checkpoint(checkpoint)
+            except ValueError as exc:
+                raise typer.BadParameter(str(exc), param_hint="--checkpoint") from exc
+            if resume_from.fingerprint != fingerprint:
+                raise typer.BadParameter(
+                    "the checkpoint was written for a different input file, output or options",
+                    param_hint="--resume",
+                )
+            if not output.is_file() or output.stat().st_size < resume_from.output_bytes:
+                raise typer.BadParameter(
+                    f"{output} is missing or shorter than the checkpoint records; run without --resume to start over",
+                    param_hint="--resume",
+                )
+            info(f"[dim]Resuming after {resume_from.records:,} records ({resume_from.rows:,} rows written)[/]")
+
+    if profile is not None:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        stack.callback(profiler.dump_stats, str(profile))
+        stack.callback(profiler.disable)
+        profiler.enable()
+
+    total = None if from_stdin else input.stat().st_size
+
+    def tracked(description: str, pass_counter: Optional[ByteCounter]) -> ContextManager[Any]:
+        if quiet or pass_counter is None:
+            return nullcontext()
+        return byte_progress(console, description, pass_counter, total)
+
+    clock = StageClock("write") if collect_stats else None
+    started = time.perf_counter()
+    try:
+        with stack:
+            known_headers: Optional[List[str]] = None
+            if resume_from is not None:
+                # The output already has its header row; rows continue under the same columns
+                known_headers = resume_from.headers
+            elif schema is not None and schema.exists() and not full_schema:
+                try:
+                    columns = load_schema(schema)
+                except ValueError as exc:
+                    raise typer.BadParameter(str(exc), param_hint="--schema") from exc
+                # Honor the current filters even if the index was built with different ones
+                known_headers = [c for c in schema_headers(columns) if column_filter.keep(c)]
+            elif full_schema or schema is not None:
+                if from_stdin:
+                    raise typer.BadParameter(
+                        "schema discovery reads the input twice, which stdin does not allow; "
+                        "pass --schema with an existing index instead",
+                        param_hint="--full-schema",
+                    )
+                discovery_counter = None if quiet else ByteCounter()
+                with tracked("Discovering schema", discovery_counter):
+                    discovered = iter_source_rows(source, **pipeline_options, counter=discovery_counter)
+                    if clock is None:
+                        columns = discover_schema(discovered)
+                    else:
+                        columns = clock.call("discover", discover_schema, discovered)
+                if schema is not None:
+                    save_schema(columns, schema)
+                known_headers = schema_headers(columns)
+
+            # Streams were wrapped with the counter when opened; paths are opened downstream
+            cursor = RecordCursor()
+            matches = MatchCount() if where is not None else None
+            # Pipelined stages run on their own threads, which the clock cannot follow
+            stalls = StageStalls() if pipeline else None
+            rows: Iterable[dict] = iter_source_rows(
+                source,
+                **pipeline_options,
+                clock=None if pipeline else clock,
+                stalls=stalls,
+                counter=None if from_stdin else counter,
+                skip_records=resume_from.records if resume_from is not None else 0,
+                cursor=cursor,
+                matches=matches,
             )
-        else:
-            write_xlsx(
-                progress_rows(),
-                output,
-                sheet_name=sheet_name,
+            count = 0
+            if clock is not None:
+
+                def counted_rows(rows: Iterable[dict]) -> Iterator[dict]:
+                    nonlocal count
+                    for row in rows:
+                        count += 1
+                        yield row
+
+                rows = counted_rows(rows)
+
+            write_options = dict(
                 max_sample=sample_headers,
-                pre_headers=pre_headers,
+                pre_headers=first_column or None,
                 header_order=header_order.lower(),
                 include_prefixes=include or None,
+                headers=known_headers,
             )
+            with tracked("Converting", counter):
+                if checkpoint is not None:
+                    write_csv_checkpointed(
+                        rows,
+                        output,
+                        checkpoint,
+                        cursor=cursor,
+                        fingerprint=fingerprint,
+                        resume=resume_from,
+                        interval=checkpoint_interval,
+                        **write_options,
+                    )
+                    # The output is complete: a later --resume must not reuse this state
+                    checkpoint.unlink()
+                elif split:
+                    shards = write_split(
+                        rows,
+                        output,
+                        split_rows=split_rows,
+                        split_bytes=split_size,
+                        partition_by=partition_by,
+                        max_open_files=max_open_files,
+                        sheet_name=sheet_name,
+                        xlsx_engine=checked.xlsx_engine,
+                        batch_rows=batch_rows,
+                        **write_options,
+                    )
+                else:
+                    write_table(
+                        rows,
+                        output,
+                        sheet_name=sheet_name,
+                        xlsx_engine=checked.xlsx_engine,
+                        batch_rows=batch_rows,
+                        **write_options,
+                    )
+            if stalls is not None:
+                stalls.done("write")
+            if clock is not None:
+                clock.stop()
+    except ExplodeLimitError as exc:
+        output.unlink(missing_ok=True)
+        if checkpoint is not None:
+            checkpoint.unlink(missing_ok=True)
+        console.print(f"[red]Error:[/] {exc}. Raise --max-explode-rows or pass --explode-overflow truncate")
+        raise typer.Exit(code=1) from exc
+    except ColumnTypeError as exc:
+        # The columnar writers remove their partial output themselves
+        console.print(f"[red]Error:[/] {exc}")
+        raise typer.Exit(code=1) from exc
 
-    console.print(f"[green]Done:[/] Wrote {output}")
+    if matches is not None:
+        info(f"[dim]--where: kept {matches.kept:,} of {matches.scanned:,} records[/]")
+    if stalls is not None:
+        info(f"[dim]Pipeline: {stalls.summary()}[/]")
+    if not split:
+        info(f"[green]Done:[/] Wrote {output}")
+    elif shards:
+        info(f"[green]Done:[/] Wrote {len(shards):,} files: {shards[0]} ... {shards[-1].name}")
+    else:
+        info("[green]Done:[/] No rows, no files written")
+    if profile is not None:
+        info(f"[dim]Profile written to {profile} (python -m pstats {profile})[/]")
+    if clock is not None:
+        stage_items = clock.items if stalls is None else stalls.items
+        first_stage = next((s for s in ("read", "read+transform") if s in stage_items), None)
+        report = build_report(
+            clock,
+            records=stage_items.get(first_stage, 0) if first_stage else 0,
+            rows=count,
+            input_bytes=counter.bytes_read if from_stdin else total,  # type: ignore[union-attr]
+            seconds=time.perf_counter() - started,
+            records_kept=matches.kept if matches is not None else None,
+            stalls=stalls,
+        )
+        print_report(console, report)
+        if stats_json is not None:
+            write_report(report, stats_json)
 
 
 def main() -> None:
+    if sys.argv[1:2] == [BATCH_COMMAND]:
+        from .batch import batch_app
+
+        batch_app(args=sys.argv[2:], prog_name=f"{Path(sys.argv[0]).name} {BATCH_COMMAND}")
+        return
     app()
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from typing import Dict, FrozenSet, Iterable
+
+# Memo tables are reset past this many entries so inputs with unbounded key
+# sets (ids used as object keys, ...) cannot grow them forever.
+_MEMO_LIMIT = 100_000
+
+# descend() results
+SKIP = 0  # nothing under this path can be kept
+CHECK = 1  # some columns under this path may be kept; test each one
+KEEP_ALL = 2  # every column under this path is kept
+
+
+def _dotted_ancestors(paths: Iterable[str]) -> FrozenSet[str]:
+    """All strict dotted prefixes of paths: "a.b.c" -> {"a", "a.b"}."""
+    out: set[str] = set()
+    for p in paths:
+        i = p.find(".")
+        while i != -1:
+            out.add(p[:i])
+            i = p.find(".", i + 1)
+    return frozenset(out)
+
+
+def _matches(column: str, prefixes: FrozenSet[str]) -> bool:
+    """True if column equals a prefix or starts with prefix + "."."""
+    if column in prefixes:
+        return True
+    i = column.find(".")
+    while i != -1:
+        if column[:i] in prefixes:
+            return True
+        i = column.find(".", i + 1)
+    return False
+
+
+class ColumnFilter:
+    """
+    Include/exclude column prefixes compiled into dotted-path prefix indexes.
+
+    A column matches a prefix when it equals it or starts with prefix + ".".
+    Instead of scanning every prefix, each dotted prefix of the column is
+    looked up in a set, so the cost is O(depth) regardless of how many
+    prefixes are configured. Decisions are memoized per column name.
+
+    Pinned columns are always kept by the include filter; excludes still apply.
+    """
+
+    def __init__(
+        self,
+        includes: Iterable[str] = (),
+        excludes: Iterable[str] = (),
+        pinned: Iterable[str] = (),
+    ) -> None:
+        self.includes = frozenset(p for p in includes if p)
+        self.excludes = frozenset(p for p in excludes if p)
+        self.pinned = frozenset(pinned)
+        self._include_ancestors = _dotted_ancestors(self.includes) | _dotted_ancestors(self.pinned)
+        self._exclude_ancestors = _dotted_ancestors(self.excludes)
+        self._keep_memo: Dict[str, bool] = {}
+        self._descend_memo: Dict[str, int] = {}
+
+    @property
+    def active(self) -> bool:
+        return bool(self.includes or self.excludes)
+
+    def keep(self, column: str) -> bool:
+        """Whether a flattened column survives the include and exclude filters."""
+        decision = self._keep_memo.get(column)
+        if decision is None:
+            if self.includes and column not in self.pinned and not _matches(column, self.includes):
+                decision = False
+            else:
+                decision = not (self.excludes and _matches(column, self.excludes))
+            if len(self._keep_memo) >= _MEMO_LIMIT:
+                self._keep_memo.clear()
+            self._keep_memo[column] = decision
+        return decision
+
+    def descend(self, path: str) -> int:
+        """
+        Decide what to do with the nested object at a dotted path.
+
+        Returns SKIP when no column below path can be kept (the subtree need not
+        be flattened at all), KEEP_ALL when every column below is kept, or CHECK
+        when columns must be tested individually with keep().
+        """
+        decision = self._descend_memo.get(path)
+        if decision is None:
+            if self.excludes and _matches(path, self.excludes):
+                decision = SKIP
+            elif not self.includes or _matches(path, self.includes):
+                decision = CHECK if path in self._exclude_ancestors else KEEP_ALL
+            elif path in self._include_ancestors:
+                decision = CHECK
+            else:
+                decision = SKIP
+            if len(self._descend_memo) >= _MEMO_LIMIT:
+                self._descend_memo.clear()
+            self._descend_memo[path] = decision
+        return decision
+
+    def filter_row(self, row: Dict[str, object]) -> Dict[str, object]:
+        keep = self.keep
+        return {k: v for k, v in row.items() if keep(k)}
+
+
+class RecordProjection:
+    """
+    The parts of a record that can contribute to a kept column.
+
+    Used by io_json to skip whole subtrees while parsing instead of building
+    them only for flattening to drop them. Decisions follow flatten exactly
+    (with the default "." separator): an object at a path is descended per
+    ColumnFilter.descend, a list or scalar is kept when its column is, and
+    explode paths (plus the objects leading to them) are always visited.
+    Elements of an exploded list are projected under the list's own path.
+    Values at keep_paths (e.g. fields tested by --where) are kept whole.
+    """
+
+    def __init__(
+        self,
+        column_filter: ColumnFilter,
+        explode_paths: Iterable[str] = (),
+        keep_paths: Iterable[str] = (),
+    ) -> None:
+        self.column_filter = column_filter
+        self.explode = frozenset(explode_paths)
+        self._kept = frozenset(keep_paths)
+        self._ancestors = _dotted_ancestors(self.explode) | _dotted_ancestors(self._kept)
+
+    def descend(self, path: str) -> int:
+        """SKIP, CHECK or KEEP_ALL for an object at path (see ColumnFilter.descend)."""
+        if path in self._kept:
+            return KEEP_ALL
+        decision = self.column_filter.descend(path)
+        if decision == SKIP and path in self._ancestors:
+            return CHECK
+        return decision
+
+    def keep(self, path: str) -> bool:
+        """Whether a list or scalar at path is needed."""
+        return path in self.explode or path in self._kept or self.column_filter.keep(path)
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
-from itertools import product
-from typing import Any, Dict, Iterable, List, Mapping, MutableMapping, Sequence
+from collections import OrderedDict
+from itertools import count, islice
+from math import prod
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, MutableMapping, Sequence
 from decimal import Decimal
 import orjson
 
+from .filters import KEEP_ALL, SKIP, ColumnFilter
+
 
 class ListPolicy:
     JOIN = "join"
@@ -12,6 +16,17 @@ class ListPolicy:
     # EXPLODE is handled via explode_paths argument
 
 
+class ExplodeOverflow:
+    """What to do with a record whose exploded rows exceed max_rows."""
+
+    ERROR = "error"
+    TRUNCATE = "truncate"
+
+
+class ExplodeLimitError(ValueError):
+    """A record explodes into more rows than allowed (ExplodeOverflow.ERROR)."""
+
+
 def _is_scalar(value: Any) -> bool:
     # Treat Decimal as a scalar
     return isinstance(value, (str, int, float, bool, Decimal)) or value is None
@@ -38,6 +53,18 @@ def _json_dumps_safe(value: Any) -> str:
         return orjson.dumps(value, default=default).decode("utf-8")
 
 
+def _list_cell(value: List[Any], list_policy: str, list_separator: str) -> str:
+    """Render a non-exploded list as a single cell according to list_policy."""
+    # Lists of dicts or scalars: handle per policy
+    if list_policy == ListPolicy.JSON:
+        return _json_dumps_safe(value)
+    # JOIN policy
+    if all(_is_scalar(v) for v in value):
+        return _join_scalars(value, list_separator)
+    # Mixed or list of dicts: JSON-encode as a safe fallback
+    return _json_dumps_safe(value)
+
+
 def _flatten_mapping(
     obj: Mapping[str, Any],
     parent_key: str = "",
@@ -45,6 +72,7 @@ def _flatten_mapping(
     list_policy: str = ListPolicy.JOIN,
     list_separator: str = ";",
     explode_paths: set[str] | None = None,
+    column_filter: ColumnFilter | None = None,
 ) -> Dict[str, Any]:
     """
     Flatten a nested mapping into a single-level dict, excluding explode paths.
@@ -52,6 +80,9 @@ def _flatten_mapping(
     Lists are handled according to list_policy unless the current key path is slated
     for exploding (handled by the caller). Explode paths are left as-is for the
     caller to process.
+
+    column_filter (only valid with sep ".") drops filtered columns while
+    flattening; subtrees that cannot yield a kept column are not visited.
     """
     items: Dict[str, Any] = {}
     explode_paths = explode_paths or set()
@@ -64,6 +95,13 @@ def _flatten_mapping(
             continue
 
         if isinstance(value, Mapping):
+            child_filter = column_filter
+            if column_filter is not None:
+                decision = column_filter.descend(new_key)
+                if decision == SKIP:
+                    continue
+                if decision == KEEP_ALL:
+                    child_filter = None
             items.update(
                 _flatten_mapping(
                     value,
@@ -72,73 +110,296 @@ def _flatten_mapping(
                     list_policy=list_policy,
                     list_separator=list_separator,
                     explode_paths=explode_paths,
+                    column_filter=child_filter,
                 )
             )
-        elif isinstance(value, list):
-            # Lists of dicts or scalars: handle per policy
-            if list_policy == ListPolicy.JSON:
-                items[new_key] = _json_dumps_safe(value)
-            else:
-                # JOIN policy
-                if all(_is_scalar(v) for v in value):
-                    items[new_key] = _join_scalars(value, list_separator)
-                else:
-                    # Mixed or list of dicts: JSON-encode as a safe fallback
-                    items[new_key] = _json_dumps_safe(value)
+            continue
+
+        if column_filter is not None and not column_filter.keep(new_key):
+            continue
+
+        if isinstance(value, list):
+            items[new_key] = _list_cell(value, list_policy, list_separator)
         else:
             items[new_key] = value
 
     return items
 
 
-def _flatten_single_object(obj: Any, prefix: str, sep: str) -> Dict[str, Any]:
+# ---------------------------------------------------------------------------
+# Flatten plans
+#
+# Records in a feed usually share a handful of shapes. For each shape (key
+# order and value kinds, recursively) we generate a small Python function that
+# builds the flat row with one dict display: column names, nesting accessors
+# and list handling are all decided at compile time. The generated code checks
+# the shape as it goes and raises _ShapeMismatch when a record differs, in
+# which case the record is flattened generically and a plan for its shape is
+# learned.
+# ---------------------------------------------------------------------------
+
+_SCALAR_TYPES = frozenset({str, int, float, bool, Decimal, type(None)})
+
+# Plans kept across all shapes (LRU), and alternative nested shapes per key set
+PLAN_CACHE_SIZE = 256
+_VARIANTS_PER_KEYS = 4
+# A key set whose nested shape keeps changing is flattened generically
+_MAX_MISSES_PER_KEYS = 16
+
+
+class _ShapeMismatch(Exception):
+    """Raised by a flatten plan when a record does not have the plan's shape."""
+
+
+class _Unplannable(Exception):
+    """The record contains something plans do not model (non-str keys, custom types)."""
+
+
+def _mismatch() -> Any:
+    raise _ShapeMismatch
+
+
+def _compile_plan(
+    obj: Mapping[str, Any],
+    parent_key: str,
+    sep: str,
+    list_policy: str,
+    list_separator: str,
+    explode_paths: frozenset[str],
+    column_filter: ColumnFilter | None,
+) -> Callable[[Mapping[str, Any]], Dict[str, Any]]:
+    """Generate the flatten plan for obj's shape; mirrors _flatten_mapping exactly."""
+    lines: List[str] = []
+    entries: List[str] = []
+    var_ids = count(1)
+
+    def visit(var: str, mapping: Mapping[str, Any], parent: str, filt: ColumnFilter | None) -> None:
+        for key, value in mapping.items():
+            if type(key) is not str:
+                raise _Unplannable
+            new_key = f"{parent}{sep}{key}" if parent else key
+            access = f"{var}[{key!r}]"
+            if new_key in explode_paths:
+                entries.append(f"{new_key!r}: {access}")
+                continue
+
+            if type(value) is dict:
+                child = filt
+                if filt is not None:
+                    decision = filt.descend(new_key)
+                    if decision == SKIP:
+                        lines.append(f"if {access}.__class__ is not dict: _mismatch()")
+                        continue
+                    if decision == KEEP_ALL:
+                        child = None
+                child_var = f"v{next(var_ids)}"
+                lines.append(f"{child_var} = {access}")
+                lines.append(
+                    f"if {child_var}.__class__ is not dict or tuple({child_var}) != {tuple(value)!r}: _mismatch()"
+                )
+                visit(child_var, value, new_key, child)
+                continue
+            if isinstance(value, Mapping):
+                raise _Unplannable
+
+            if filt is not None and not filt.keep(new_key):
+                # Dropped leaf; only a nested object here could produce kept columns
+                if filt.descend(new_key) != SKIP:
+                    lines.append(f"if {access}.__class__ is dict: _mismatch()")
+                continue
+
+            if type(value) is list:
+                entries.append(f"{new_key!r}: (_list(x) if (x := {access}).__class__ is list else _mismatch())")
+            elif type(value) in _SCALAR_TYPES:
+                entries.append(f"{new_key!r}: (x if (x := {access}).__class__ in _SCALARS else _mismatch())")
+            else:
+                raise _Unplannable
+
+    visit("r", obj, parent_key, column_filter)
+
+    body = "".join(f"    {line}\n" for line in lines)
+    source = f"def plan(r):\n{body}    return {{{', '.join(entries)}}}\n"
+    namespace: Dict[str, Any] = {
+        "_mismatch": _mismatch,
+        "_SCALARS": _SCALAR_TYPES,
+        "_list": lambda value: _list_cell(value, list_policy, list_separator),
+    }
+    exec(compile(source, "<flatten-plan>", "exec"), namespace)
+    return namespace["plan"]
+
+
+class _PlanEntry:
+    __slots__ = ("plans", "misses")
+
+    def __init__(self) -> None:
+        self.plans: List[Callable[[Mapping[str, Any]], Dict[str, Any]]] = []
+        self.misses = 0
+
+
+class _PlanCache:
+    """LRU cache of flatten plans keyed by configuration and top-level key order."""
+
+    def __init__(self, maxsize: int = PLAN_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[tuple, _PlanEntry]" = OrderedDict()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def flatten(
+        self,
+        obj: Mapping[str, Any],
+        parent_key: str,
+        sep: str,
+        list_policy: str,
+        list_separator: str,
+        explode_paths: frozenset[str],
+        column_filter: ColumnFilter | None,
+    ) -> Dict[str, Any]:
+        if type(obj) is not dict:
+            return _flatten_mapping(obj, parent_key, sep, list_policy, list_separator, set(explode_paths), column_filter)
+
+        key = (tuple(obj), parent_key, sep, list_policy, list_separator, explode_paths, column_filter)
+        entry = self._entries.get(key)
+        if entry is None:
+            # First sighting: only remember the key set. Compiling a plan pays
+            # off once the shape repeats, not for one-off keys.
+            self._entries[key] = _PlanEntry()
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return _flatten_mapping(obj, parent_key, sep, list_policy, list_separator, set(explode_paths), column_filter)
+
+        self._entries.move_to_end(key)
+        for i, plan in enumerate(entry.plans):
+            try:
+                row = plan(obj)
+            except _ShapeMismatch:
+                continue
+            if i:
+                entry.plans.insert(0, entry.plans.pop(i))
+            return row
+        entry.misses += 1
+
+        if entry.misses <= _MAX_MISSES_PER_KEYS:
+            try:
+                plan = _compile_plan(obj, parent_key, sep, list_policy, list_separator, explode_paths, column_filter)
+            except _Unplannable:
+                entry.misses = _MAX_MISSES_PER_KEYS + 1
+            else:
+                entry.plans.insert(0, plan)
+                del entry.plans[_VARIANTS_PER_KEYS:]
+                return plan(obj)
+
+        return _flatten_mapping(obj, parent_key, sep, list_policy, list_separator, set(explode_paths), column_filter)
+
+
+_plan_cache = _PlanCache()
+
+
+def _flatten_single_object(
+    obj: Any, prefix: str, sep: str, column_filter: ColumnFilter | None = None
+) -> Dict[str, Any]:
     """Flatten a single object (dict or scalar) under a given prefix key."""
     if isinstance(obj, Mapping):
-        return _flatten_mapping(obj, parent_key=prefix, sep=sep)
+        if column_filter is not None:
+            decision = column_filter.descend(prefix)
+            if decision == SKIP:
+                return {}
+            if decision == KEEP_ALL:
+                column_filter = None
+        return _plan_cache.flatten(obj, prefix, sep, ListPolicy.JOIN, ";", frozenset(), column_filter)
     # Scalar
+    if column_filter is not None and not column_filter.keep(prefix):
+        return {}
     return {prefix: obj}
 
 
-def flatten_record(
+def _combinations(base: Dict[str, Any], expansions: List[List[Dict[str, Any]]], depth: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Yield base merged with each combination of expansions (cartesian product order).
+
+    Each level merges its part into the row built by the level above once, and
+    the deeper levels start from that shared row, so only the innermost level
+    copies per output row.
+    """
+    last = depth == len(expansions) - 1
+    for part in expansions[depth]:
+        combined = dict(base)
+        combined.update(part)
+        if last:
+            yield combined
+        else:
+            yield from _combinations(combined, expansions, depth + 1)
+
+
+def iter_flatten_record(
     record: Mapping[str, Any],
     *,
     sep: str = ".",
     list_policy: str = ListPolicy.JOIN,
     list_separator: str = ";",
     explode_paths: Iterable[str] | None = None,
-) -> List[Dict[str, Any]]:
+    column_filter: ColumnFilter | None = None,
+    max_rows: int | None = None,
+    overflow: str = ExplodeOverflow.ERROR,
+) -> Iterator[Dict[str, Any]]:
     """
-    Flatten a single record (dict) into one or more flat rows.
+    Flatten a single record (dict) into one or more flat rows, lazily.
 
     - Nested dicts are flattened using the provided separator.
     - Lists are joined or JSON-encoded depending on list_policy.
     - explode_paths: list of dotted key paths to arrays that should be exploded
       (creating multiple rows). Multiple explode paths will create a cartesian
-      product across their elements.
-
-    Returns a list of row dicts because explode can create multiple rows per record.
+      product across their elements, generated one row at a time: memory is
+      bounded by the exploded arrays, not by their product.
+    - column_filter: include/exclude filter applied to the produced columns.
+      With the default "." separator it is pushed down into flattening, so
+      dropped subtrees are never flattened.
+    - max_rows: limit on the rows of one record. Beyond it, overflow decides:
+      "error" raises ExplodeLimitError before any row is yielded, "truncate"
+      yields the first max_rows rows.
     """
+    if overflow not in (ExplodeOverflow.ERROR, ExplodeOverflow.TRUNCATE):
+        raise ValueError(f"Unknown explode overflow policy: {overflow!r} (expected 'error' or 'truncate')")
+    if column_filter is not None and not column_filter.active:
+        column_filter = None
+    if column_filter is not None and sep != ".":
+        # Prefix matching is defined on "." boundaries; filter the finished rows
+        rows = iter_flatten_record(
+            record,
+            sep=sep,
+            list_policy=list_policy,
+            list_separator=list_separator,
+            explode_paths=explode_paths,
+            max_rows=max_rows,
+            overflow=overflow,
+        )
+        for row in rows:
+            yield column_filter.filter_row(row)
+        return
+
     if not isinstance(record, Mapping):
         # Attempt to coerce into Mapping or wrap as value
-        return [
-            {"value": record}
-        ]
-
-    explode_set = set(explode_paths or [])
-
-    # First pass: flatten everything except explode paths
-    base_flat = _flatten_mapping(
-        record,
-        parent_key="",
-        sep=sep,
-        list_policy=list_policy,
-        list_separator=list_separator,
-        explode_paths=explode_set,
-    )
+        row = {"value": record}
+        if column_filter is not None:
+            row = column_filter.filter_row(row)
+        yield row
+        return
+
+    # Keep the caller's order so column order does not depend on set hashing
+    explode_order = list(dict.fromkeys(explode_paths or []))
+    explode_set = frozenset(explode_order)
+
+    # First pass: flatten everything except explode paths (through a cached
+    # plan when the record's shape has been seen before)
+    base_flat = _plan_cache.flatten(record, "", sep, list_policy, list_separator, explode_set, column_filter)
 
     # Collect expansions for each explode path
     expansions: List[List[Dict[str, Any]]] = []
-    for path in explode_set:
+    for path in explode_order:
         value = base_flat.pop(path, None)
         # If value wasn't present in base_flat, fetch from original record via traversal
         if value is None:
@@ -160,22 +421,59 @@ def flatten_record(
         if isinstance(value, list):
             rows_for_this_path: List[Dict[str, Any]] = []
             for item in value:
-                rows_for_this_path.append(_flatten_single_object(item, prefix=path, sep=sep))
+                rows_for_this_path.append(
+                    _flatten_single_object(item, prefix=path, sep=sep, column_filter=column_filter)
+                )
             if not rows_for_this_path:
                 rows_for_this_path = [{}]
             expansions.append(rows_for_this_path)
         else:
             # Value is scalar or mapping -> single expansion
-            expansions.append([_flatten_single_object(value, prefix=path, sep=sep)])
+            expansions.append([_flatten_single_object(value, prefix=path, sep=sep, column_filter=column_filter)])
 
     # Combine base_flat with cartesian product of expansions
     if not expansions:
-        return [base_flat]
-
-    combined_rows: List[Dict[str, Any]] = []
-    for combo in product(*expansions):
-        combined: Dict[str, Any] = dict(base_flat)
-        for part in combo:
-            combined.update(part)
-        combined_rows.append(combined)
-    return combined_rows
+        yield base_flat
+        return
+
+    combinations = _combinations(base_flat, expansions)
+    if max_rows is not None:
+        fan_out = prod(len(e) for e in expansions)
+        if fan_out > max_rows:
+            if overflow == ExplodeOverflow.ERROR:
+                sizes = " x ".join(f"{path} ({len(e):,})" for path, e in zip(explode_order, expansions))
+                raise ExplodeLimitError(
+                    f"A record explodes into {fan_out:,} rows ({sizes}), more than the limit of {max_rows:,}"
+                )
+            combinations = islice(combinations, max_rows)
+    yield from combinations
+
+
+def flatten_record(
+    record: Mapping[str, Any],
+    *,
+    sep: str = ".",
+    list_policy: str = ListPolicy.JOIN,
+    list_separator: str = ";",
+    explode_paths: Iterable[str] | None = None,
+    column_filter: ColumnFilter | None = None,
+    max_rows: int | None = None,
+    overflow: str = ExplodeOverflow.ERROR,
+) -> List[Dict[str, Any]]:
+    """
+    Flatten a single record into a list of rows; see iter_flatten_record.
+
+    Returns a list of row dicts because explode can create multiple rows per record.
+    """
+    return list(
+        iter_flatten_record(
+            record,
+            sep=sep,
+            list_policy=list_policy,
+            list_separator=list_separator,
+            explode_paths=explode_paths,
+            column_filter=column_filter,
+            max_rows=max_rows,
+            overflow=overflow,
+        )
+    )
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import mmap
+import re
+from contextlib import ExitStack
+from functools import partial
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, List, Optional, Tuple
+
+from .io_json import ByteCounter, NumberMode
+from .io_ndjson import DEFAULT_CHUNK_BYTES, Chunk, _chunk_bytes, _is_plain_file, _loads
+from .parallel import ordered_map
+
+_WHITESPACE = b" \t\r\n"
+# Every byte but quotes and brackets: deleted before nesting depth is counted
+_NOT_STRUCTURAL = bytes(b for b in range(256) if b not in b'"[]{}')
+# A whole string (escapes included) or a structural character
+_TOKENS = re.compile(rb'"[^"\\]*+(?:\\.[^"\\]*+)*+"|[\[\]{},]', re.DOTALL)
+
+_NOT_A_FILE = "Splitting needs an uncompressed JSON file (not stdin, a stream or compressed input)"
+_NOT_AN_ARRAY = "Splitting needs a JSON document whose top level is an array"
+
+
+def _balance(block: bytes) -> Tuple[bool, int]:
+    """
+    (ends inside a string, change of nesting depth) over block, which must start outside any string.
+
+    Only C-level bytes operations, no per-byte Python: escapes are dropped,
+    everything but quotes and brackets is deleted, and adjacent quote pairs
+    (with nothing structural between them) are removed, so only the few
+    strings that hold brackets are left to split off.
+    """
+    if b"\\" in block:
+        # Escaped backslashes first, so that \\" still closes its string
+        block = block.replace(b"\\\\", b"").replace(b'\\"', b"")
+    parts = block.translate(None, _NOT_STRUCTURAL).replace(b'""', b"").split(b'"')
+    outside = b"".join(parts[::2])
+    depth = outside.count(b"[") + outside.count(b"{") - outside.count(b"]") - outside.count(b"}")
+    return len(parts) % 2 == 0, depth
+
+
+def _opening_quote(block: bytes) -> int:
+    """Index of the last unescaped quote in block (which ends inside that string)."""
+    end = len(block)
+    while True:
+        index = block.rindex(b'"', 0, end)
+        start = index
+        while start and block[start - 1] == 0x5C:  # backslash
+            start -= 1
+        if (index - start) % 2 == 0:
+            return index
+        end = index
+
+
+def _next_boundary(mapped: mmap.mmap, position: int, depth: int, end: int) -> int:
+    """The first comma between two elements of the array at or after position (at depth), or end."""
+    for token in _TOKENS.finditer(mapped, position, end):
+        char = mapped[token.start()]
+        if char == 0x2C:  # ,
+            if depth == 1:
+                return token.start()
+        elif char == 0x5B or char == 0x7B:  # [ {
+            depth += 1
+        elif char != 0x22:  # ] }
+            depth -= 1
+    return end
+
+
+def _array_bounds(mapped: mmap.mmap) -> Tuple[int, int]:
+    """(first byte after the opening "[", index of the closing "]") of a top-level array."""
+    size = len(mapped)
+    start = 0
+    while start < size and mapped[start] in _WHITESPACE:
+        start += 1
+    end = size - 1
+    while end > start and mapped[end] in _WHITESPACE:
+        end -= 1
+    if end <= start or mapped[start] != 0x5B or mapped[end] != 0x5D:
+        raise ValueError(_NOT_AN_ARRAY)
+    return start + 1, end
+
+
+def _array_chunks(path: str, mapped: mmap.mmap, chunk_bytes: int, counter: Optional[ByteCounter]) -> Iterator[Chunk]:
+    start, end = _array_bounds(mapped)
+    while True:
+        cut = end
+        if start + chunk_bytes < end:
+            block = mapped[start : start + chunk_bytes]
+            in_string, depth = _balance(block)
+            # Brackets in a string cut off at the end of block were not counted
+            position = start + (_opening_quote(block) if in_string else len(block))
+            cut = _next_boundary(mapped, position, 1 + depth, end)
+        if counter is not None:
+            counter.bytes_read = cut
+        yield Chunk(start, cut, path)
+        if cut == end:
+            return
+        start = cut + 1
+
+
+def check_splittable(source: str | Path | BinaryIO) -> None:
+    """Raise ValueError unless source is an uncompressed file holding a top-level array."""
+    if not _is_plain_file(source):
+        raise ValueError(_NOT_A_FILE)
+    with open(source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:  # type: ignore[arg-type]
+        _array_bounds(mapped)
+
+
+def iter_array_chunks(
+    source: str | Path | BinaryIO,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    counter: Optional[ByteCounter] = None,
+) -> Iterator[Chunk]:
+    """
+    Cut the top-level array of a JSON file into chunks of whole elements of about chunk_bytes.
+
+    The file is memory-mapped and scanned once, tracking string and escape
+    state, for the nesting depth at each target cut; the chunk then ends at
+    the next comma between two elements. Each chunk is the byte range of one
+    or more complete elements, without the separating commas. Only plain
+    files can be split (see check_splittable). A counter tracks the end of
+    the last chunk handed out.
+    """
+    if not _is_plain_file(source):
+        raise ValueError(_NOT_A_FILE)
+    with ExitStack() as stack:
+        path = str(source)
+        f = stack.enter_context(open(path, "rb"))
+        mapped = stack.enter_context(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        yield from _array_chunks(path, mapped, chunk_bytes, counter)
+
+
+def parse_array_chunk(chunk: Chunk, number_mode: str = NumberMode.DECIMAL) -> List[Any]:
+    """
+    Decode the elements of a chunk from iter_array_chunks, in order.
+
+    Raises ValueError naming the chunk's byte range if it is not valid JSON.
+    """
+    try:
+        return _loads(number_mode)(b"[" + _chunk_bytes(chunk) + b"]")
+    except ValueError as exc:  # orjson.JSONDecodeError and json.JSONDecodeError included
+        raise ValueError(f"Invalid JSON in bytes {chunk.start}-{chunk.end} of the top-level array: {exc}") from exc
+
+
+def iter_array_items(
+    source: str | Path | BinaryIO,
+    number_mode: str = NumberMode.DECIMAL,
+    *,
+    workers: int = 1,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    counter: Optional[ByteCounter] = None,
+) -> Iterator[Any]:
+    """
+    Stream the elements of a JSON file's top-level array, parsed chunk by chunk.
+
+    Numbers follow number_mode as in iter_items. With workers > 1, chunks are
+    decoded on a process pool and yielded in document order. counter is
+    passed to iter_array_chunks.
+    """
+    if number_mode not in (NumberMode.DECIMAL, NumberMode.FLOAT, NumberMode.STRING):
+        raise ValueError(f"Unknown number mode: {number_mode!r} (expected decimal, float or string)")
+    chunks = iter_array_chunks(source, chunk_bytes, counter)
+    if workers > 1:
+        for records in ordered_map(partial(parse_array_chunk, number_mode=number_mode), chunks, workers=workers):
+            yield from records
+        return
+    for chunk in chunks:
+        yield from parse_array_chunk(chunk, number_mode)
@@ -1,9 +1,332 @@
 from __future__ import annotations
 
+import io
+import queue
+import sys
+import threading
+from contextlib import ExitStack
+from decimal import Decimal
+from itertools import chain
 from pathlib import Path
-from typing import Iterable, Iterator, Optional
+from types import ModuleType
+from typing import Any, BinaryIO, Dict, Generator, Iterable, Iterator, Optional
 
 import ijson
+import orjson
+
+from .filters import CHECK, KEEP_ALL, RecordProjection
+
+
+class NumberMode:
+	DECIMAL = "decimal"
+	FLOAT = "float"
+	STRING = "string"
+
+
+class ParserMode:
+	"""How a JSON input is parsed (see use_memory_parser; SPLIT is io_array's)."""
+
+	AUTO = "auto"
+	STREAM = "stream"
+	MEMORY = "memory"
+	SPLIT = "split"
+
+
+# Largest input parsed in memory by ParserMode.AUTO; parsed documents take
+# roughly 8-10x their size in Python objects
+DEFAULT_MEMORY_PARSE_LIMIT = 32 << 20
+
+
+# ijson backends, fastest first
+BACKEND_PREFERENCE = ("yajl2_c", "yajl2_cffi", "yajl2", "python")
+PURE_PYTHON_BACKEND = "python"
+
+
+def select_backend(name: str | None = None) -> tuple[str, ModuleType]:
+	"""
+	Resolve an ijson backend, returning (name, module).
+
+	With no name, the fastest available backend in BACKEND_PREFERENCE is used.
+	An explicitly requested backend that cannot be loaded raises ValueError.
+	"""
+	if name:
+		try:
+			return name, ijson.get_backend(name)
+		except ImportError as exc:
+			raise ValueError(f"ijson backend {name!r} is not available: {exc}") from exc
+	for candidate in BACKEND_PREFERENCE:
+		try:
+			return candidate, ijson.get_backend(candidate)
+		except ImportError:
+			continue
+	# The pure-Python backend always imports; kept for type checkers
+	return PURE_PYTHON_BACKEND, ijson.get_backend(PURE_PYTHON_BACKEND)
+
+
+def _reject_constant(name: str) -> Any:
+	raise ValueError(f"{name} is not valid JSON")
+
+
+def _stringify_numbers(value: Any) -> Any:
+	"""Replace parsed numbers by their text (Decimal keeps the source digits)."""
+	if isinstance(value, dict):
+		return {k: _stringify_numbers(v) for k, v in value.items()}
+	if isinstance(value, list):
+		return [_stringify_numbers(v) for v in value]
+	if isinstance(value, (int, Decimal)) and not isinstance(value, bool):
+		return str(value)
+	return value
+
+
+STDIN = "-"
+
+# Chunk size read from decompressors, and how many chunks may wait in the queue
+DECOMPRESS_CHUNK_SIZE = 1 << 20
+DECOMPRESS_QUEUE_CHUNKS = 8
+# Bytes a non-seekable stream may buffer while the root is located (see iter_items)
+PROBE_REPLAY_LIMIT = 64 << 20
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_BZ2_MAGIC = b"BZh"
+_XZ_MAGIC = b"\xfd7zXZ\x00"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_COMPRESSED_MAGIC = (_GZIP_MAGIC, _BZ2_MAGIC, _XZ_MAGIC, _ZSTD_MAGIC)
+
+_EOF = object()
+
+
+class _ThreadedReader(io.RawIOBase):
+	"""
+	Read a (decompressing) stream on a background thread.
+
+	Chunks of DECOMPRESS_CHUNK_SIZE bytes are handed over through a bounded
+	queue, so decompression (which releases the GIL) overlaps with parsing while
+	memory stays capped at a few chunks.
+	"""
+
+	def __init__(
+		self,
+		stream: BinaryIO,
+		raw: Optional[BinaryIO] = None,
+		chunk_size: int = DECOMPRESS_CHUNK_SIZE,
+		max_chunks: int = DECOMPRESS_QUEUE_CHUNKS,
+	) -> None:
+		super().__init__()
+		self._stream = stream
+		# Underlying file the decompressor reads from; decompressors do not close it
+		self._raw = raw
+		self._chunk_size = chunk_size
+		self._queue: "queue.Queue[object]" = queue.Queue(maxsize=max_chunks)
+		self._stop = threading.Event()
+		self._view = memoryview(b"")
+		self._eof = False
+		self._thread = threading.Thread(target=self._pump, name="json-decompress", daemon=True)
+		self._thread.start()
+
+	def _put(self, item: object) -> bool:
+		while not self._stop.is_set():
+			try:
+				self._queue.put(item, timeout=0.1)
+				return True
+			except queue.Full:
+				continue
+		return False
+
+	def _pump(self) -> None:
+		try:
+			while not self._stop.is_set():
+				chunk = self._stream.read(self._chunk_size)
+				if not chunk:
+					break
+				if not self._put(chunk):
+					return
+			self._put(_EOF)
+		except BaseException as exc:  # re-raised in the reading thread
+			self._put(exc)
+
+	def readable(self) -> bool:
+		return True
+
+	def readinto(self, b: Any) -> int:
+		if not len(b):
+			return 0
+		while not self._view:
+			if self._eof:
+				return 0
+			item = self._queue.get()
+			if item is _EOF:
+				self._eof = True
+				return 0
+			if isinstance(item, BaseException):
+				self._eof = True
+				raise item
+			self._view = memoryview(item)  # type: ignore[arg-type]
+		n = min(len(b), len(self._view))
+		b[:n] = self._view[:n]
+		self._view = self._view[n:]
+		return n
+
+	def close(self) -> None:
+		if not self.closed:
+			self._stop.set()
+			self._thread.join()
+			self._stream.close()
+			if self._raw is not None:
+				self._raw.close()
+		super().close()
+
+
+class _ReplayReader(io.RawIOBase):
+	"""
+	Record what is read from a non-seekable stream so it can be read again once.
+
+	Used to locate the root with a cheap event scan and then restart the native
+	item builder from the beginning. Recording stops (and rewind() fails) once
+	more than limit bytes have been read.
+	"""
+
+	def __init__(self, stream: BinaryIO, limit: int = PROBE_REPLAY_LIMIT) -> None:
+		super().__init__()
+		self._stream = stream
+		self._limit = limit
+		self._recorded: Optional[bytearray] = bytearray()
+		self._replay: Optional[io.BytesIO] = None
+
+	def readable(self) -> bool:
+		return True
+
+	def readinto(self, b: Any) -> int:
+		if not len(b):
+			return 0
+		if self._replay is not None:
+			n = self._replay.readinto(b)
+			if n:
+				return n
+			self._replay = None
+		data = self._stream.read(len(b))
+		n = len(data)
+		b[:n] = data
+		if self._recorded is not None:
+			if len(self._recorded) + n > self._limit:
+				self._recorded = None
+			else:
+				self._recorded += data
+		return n
+
+	def rewind(self) -> bool:
+		"""Replay everything read so far; False if too much was read to replay."""
+		if self._recorded is None:
+			return False
+		self._replay = io.BytesIO(bytes(self._recorded))
+		self._recorded = None
+		return True
+
+
+class ByteCounter:
+	"""
+	Position reached in an input's raw bytes (before decompression).
+
+	Updated by the reading layer once per buffer read (see open_input and
+	io_ndjson.iter_chunks) and polled from other threads, e.g. for progress.
+	"""
+
+	__slots__ = ("bytes_read",)
+
+	def __init__(self) -> None:
+		self.bytes_read = 0
+
+
+class _CountingReader(io.RawIOBase):
+	"""Pass reads (and seeks, when supported) through to raw, tracking the position in counter."""
+
+	def __init__(self, raw: BinaryIO, counter: ByteCounter) -> None:
+		super().__init__()
+		self._raw = raw
+		self._counter = counter
+
+	def readable(self) -> bool:
+		return True
+
+	def readinto(self, b: Any) -> int:
+		n = self._raw.readinto(b)  # type: ignore[attr-defined]
+		if n:
+			self._counter.bytes_read += n
+		return n
+
+	def seekable(self) -> bool:
+		return self._raw.seekable()
+
+	def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+		position = self._raw.seek(offset, whence)
+		self._counter.bytes_read = position
+		return position
+
+	def tell(self) -> int:
+		return self._raw.tell()
+
+	def close(self) -> None:
+		if not self.closed:
+			self._raw.close()
+		super().close()
+
+
+def _open_zstd(raw: BinaryIO) -> BinaryIO:
+	try:
+		from compression import zstd  # type: ignore[import-not-found]  # Python 3.14+
+
+		return zstd.ZstdFile(raw)  # type: ignore[no-any-return]
+	except ImportError:
+		pass
+	try:
+		import zstandard  # type: ignore[import-not-found]
+	except ImportError as exc:
+		raise ValueError(
+			"Input is zstd-compressed, which requires the 'zstandard' package "
+			"(pip install 'json-to-excel-converter[zstd]')"
+		) from exc
+	return zstandard.ZstdDecompressor().stream_reader(raw, read_size=DECOMPRESS_CHUNK_SIZE)  # type: ignore[no-any-return]
+
+
+def open_input(source: str | Path, counter: Optional[ByteCounter] = None) -> BinaryIO:
+	"""
+	Open a JSON input for binary streaming.
+
+	- "-" reads standard input.
+	- gzip, bz2, xz and zstd input is detected by its magic bytes (not by file
+	  extension) and decompressed on a background thread (_ThreadedReader).
+	- With a counter, the bytes read from the underlying file or pipe are
+	  tracked in it (compressed bytes for compressed input).
+
+	The caller owns the returned stream and must close it.
+	"""
+	if str(source) == STDIN:
+		raw: BinaryIO = sys.stdin.buffer
+	else:
+		path = Path(source)
+		if not path.exists():
+			raise FileNotFoundError(f"Input JSON file not found: {path}")
+		raw = path.open("rb", buffering=0 if counter is not None else DECOMPRESS_CHUNK_SIZE)
+
+	if counter is not None:
+		raw = io.BufferedReader(_CountingReader(raw, counter), DECOMPRESS_CHUNK_SIZE)  # type: ignore[arg-type]
+	if not hasattr(raw, "peek"):
+		raw = io.BufferedReader(raw)  # type: ignore[arg-type]
+	magic = raw.peek(6)[:6]  # type: ignore[attr-defined]
+	if magic.startswith(_GZIP_MAGIC):
+		import gzip
+
+		return _ThreadedReader(gzip.GzipFile(fileobj=raw), raw)  # type: ignore[arg-type]
+	if magic.startswith(_BZ2_MAGIC):
+		import bz2
+
+		return _ThreadedReader(bz2.BZ2File(raw), raw)  # type: ignore[arg-type]
+	if magic.startswith(_XZ_MAGIC):
+		import lzma
+
+		return _ThreadedReader(lzma.LZMAFile(raw), raw)  # type: ignore[arg-type]
+	if magic.startswith(_ZSTD_MAGIC):
+		return _ThreadedReader(_open_zstd(raw), raw)
+	return raw
 
 
 def _normalize_root_path_to_ijson_prefix(root_path: str | None) -> str:
@@ -27,10 +350,284 @@ def _normalize_root_path_to_ijson_prefix(root_path: str | None) -> str:
 	return ".".join(segments)
 
 
+def _probe_root(events: Iterator[tuple], prefix: str) -> Optional[tuple]:
+	"""
+	Consume parse events up to the start of the container at prefix.
+
+	Returns that ("<prefix>", "start_map" | "start_array", None) event, or None when
+	the prefix never opens a container. The events iterator is left positioned
+	right after the returned event.
+	"""
+	for event in events:
+		if event[0] == prefix and event[1] in ("start_map", "start_array"):
+			return event
+	return None
+
+
+# ---------------------------------------------------------------------------
+# Projected records
+#
+# With a RecordProjection, records are built from the parse events instead of
+# by the backend's item builder, and subtrees no kept column can come from are
+# skipped as they stream past: they are tokenized but never materialized.
+# ---------------------------------------------------------------------------
+
+_STARTS = ("start_map", "start_array")
+
+
+def _skip_value(events: Iterator[tuple]) -> None:
+	"""Consume the rest of a container whose start event was just read."""
+	depth = 1
+	for _prefix, event, _value in events:
+		if event == "start_map" or event == "start_array":
+			depth += 1
+		elif event == "end_map" or event == "end_array":
+			depth -= 1
+			if not depth:
+				return
+
+
+def _build_value(events: Iterator[tuple], event: str, value: Any) -> Any:
+	"""The complete value whose first event is (event, value)."""
+	if event == "start_map":
+		obj: Dict[str, Any] = {}
+		for _prefix, event, key in events:
+			if event == "end_map":
+				break
+			_prefix, event, value = next(events)
+			obj[key] = _build_value(events, event, value) if event in _STARTS else value
+		return obj
+	if event == "start_array":
+		arr: list = []
+		for _prefix, event, value in events:
+			if event == "end_array":
+				break
+			arr.append(_build_value(events, event, value) if event in _STARTS else value)
+		return arr
+	return value
+
+
+def _build_projected_map(
+	events: Iterator[tuple],
+	parent: str,
+	projection: RecordProjection,
+	explode: frozenset[str],
+) -> Dict[str, Any]:
+	"""An object (start_map already read) at dotted path parent, without the parts projection drops."""
+	obj: Dict[str, Any] = {}
+	for _prefix, event, key in events:
+		if event == "end_map":
+			break
+		path = f"{parent}.{key}" if parent else key
+		_prefix, event, value = next(events)
+		if event == "start_map":
+			decision = projection.descend(path)
+			if decision == KEEP_ALL:
+				obj[key] = _build_value(events, event, value)
+				continue
+			if decision == CHECK:
+				obj[key] = _build_projected_map(events, path, projection, explode)
+				continue
+			_skip_value(events)
+		elif event == "start_array":
+			if path in explode:
+				obj[key] = _build_exploded(events, path, projection)
+				continue
+			if projection.keep(path):
+				obj[key] = _build_value(events, event, value)
+				continue
+			_skip_value(events)
+		elif projection.keep(path):
+			obj[key] = value
+			continue
+		# Dropped; a duplicate key must not leave an earlier value behind
+		obj.pop(key, None)
+	return obj
+
+
+def _build_exploded(events: Iterator[tuple], path: str, projection: RecordProjection) -> list:
+	"""
+	An exploded list (start_array already read): every element is kept, so the
+	row count does not change, but each is projected under path.
+	"""
+	arr: list = []
+	for _prefix, event, value in events:
+		if event == "end_array":
+			break
+		if event == "start_map":
+			decision = projection.descend(path)
+			if decision == KEEP_ALL:
+				arr.append(_build_value(events, event, value))
+			elif decision == CHECK:
+				# Elements are flattened without explode paths of their own
+				arr.append(_build_projected_map(events, path, projection, frozenset()))
+			else:
+				_skip_value(events)
+				arr.append({})
+		elif event == "start_array":
+			if projection.keep(path):
+				arr.append(_build_value(events, event, value))
+			else:
+				_skip_value(events)
+				arr.append(None)
+		else:
+			arr.append(value)
+	return arr
+
+
+def _build_record(events: Iterator[tuple], event: str, value: Any, projection: RecordProjection) -> Any:
+	if event == "start_map":
+		return _build_projected_map(events, "", projection, projection.explode)
+	# Not an object: becomes a single "value" column, kept whole
+	return _build_value(events, event, value)
+
+
+def _iter_projected(
+	events: Iterator[tuple],
+	root_event: tuple,
+	prefix: str,
+	projection: RecordProjection,
+) -> Iterator[Any]:
+	"""
+	Projected records of every container at prefix with root_event's type
+	(array elements, or object values with object_values), like the item
+	builders: the rest of the document is still parsed, and so validated.
+	"""
+	kind = root_event[1]
+	event_tuple: Optional[tuple] = root_event
+	while event_tuple is not None:
+		if event_tuple[1] != kind:
+			_skip_value(events)
+		elif kind == "start_array":
+			for _prefix, event, value in events:
+				if event == "end_array":
+					break
+				yield _build_record(events, event, value, projection)
+		else:
+			for _prefix, event, _key in events:
+				if event == "end_map":
+					break
+				_prefix, event, value = next(events)
+				yield _build_record(events, event, value, projection)
+		event_tuple = _probe_root(events, prefix)
+
+
+# ---------------------------------------------------------------------------
+# In-memory parsing
+#
+# Inputs that fit comfortably in memory are parsed in one call (orjson, or the
+# json module's C scanner when numbers must stay exact) and the root is found
+# by navigating the document, which is several times faster than building
+# records from a stream of parse events.
+# ---------------------------------------------------------------------------
+
+
+def _plain_file_size(json_file: str | Path | BinaryIO) -> Optional[int]:
+	"""Size of an uncompressed regular input file, or None (streams, stdin, compressed or missing files)."""
+	if hasattr(json_file, "read") or str(json_file) == STDIN:
+		return None
+	path = Path(json_file)  # type: ignore[arg-type]
+	try:
+		if not path.is_file():
+			return None
+		with path.open("rb") as f:
+			magic = f.read(6)
+		return None if magic.startswith(_COMPRESSED_MAGIC) else path.stat().st_size
+	except OSError:
+		return None
+
+
+def use_memory_parser(
+	json_file: str | Path | BinaryIO,
+	parser: str = ParserMode.AUTO,
+	memory_limit: int = DEFAULT_MEMORY_PARSE_LIMIT,
+	projection: Optional[RecordProjection] = None,
+) -> bool:
+	"""
+	Whether iter_items parses json_file in memory.
+
+	ParserMode.MEMORY always does (stdin and compressed input are read fully
+	first); ParserMode.AUTO does for uncompressed files of at most memory_limit
+	bytes, unless a projection asks for subtrees to be skipped while streaming.
+	ParserMode.SPLIT inputs are read by io_array instead, never by iter_items.
+	"""
+	if parser not in (ParserMode.AUTO, ParserMode.STREAM, ParserMode.MEMORY, ParserMode.SPLIT):
+		raise ValueError(f"Unknown parser: {parser!r} (expected auto, stream, memory or split)")
+	if parser != ParserMode.AUTO:
+		return parser == ParserMode.MEMORY
+	if projection is not None:
+		return False
+	size = _plain_file_size(json_file)
+	return size is not None and size <= memory_limit
+
+
+def _load_document(json_file: str | Path | BinaryIO, number_mode: str, counter: Optional[ByteCounter]) -> Any:
+	"""Parse a whole JSON input; raises ValueError if it is not valid JSON (or has integers orjson cannot hold)."""
+	import json
+	import mmap
+
+	def loads(data: Any) -> Any:
+		if number_mode == NumberMode.FLOAT:
+			# ints and floats, like the ijson backends with use_float
+			return orjson.loads(data)
+		decoder = json.JSONDecoder(parse_float=Decimal, parse_constant=_reject_constant)
+		return decoder.decode(str(data, "utf-8"))
+
+	size = _plain_file_size(json_file)
+	if not size:
+		if hasattr(json_file, "read"):
+			return loads(json_file.read())  # type: ignore[union-attr]
+		with open_input(json_file, counter) as f:  # type: ignore[arg-type]
+			return loads(f.read())
+	with open(json_file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:  # type: ignore[arg-type]
+		with memoryview(mapped) as view:
+			document = loads(view)
+	if counter is not None:
+		counter.bytes_read = size
+	return document
+
+
+def _containers_at(document: Any, segments: list[str]) -> Iterator[Any]:
+	"""
+	Values at a root path in document order, matched like ijson prefixes: a
+	segment names an object key, and "item" also steps into every array element.
+	"""
+	if not segments:
+		yield document
+		return
+	head, rest = segments[0], segments[1:]
+	if isinstance(document, dict):
+		if head in document:
+			yield from _containers_at(document[head], rest)
+	elif isinstance(document, list) and head == "item":
+		for element in document:
+			yield from _containers_at(element, rest)
+
+
+def _document_records(document: Any, prefix: str) -> tuple[Optional[str], Iterator[Any]]:
+	"""
+	(kind, records) at prefix, as the streaming path finds them: the first
+	container decides between array elements ("start_array") and object values
+	("start_map"), and every container of that kind at prefix contributes.
+	"""
+	containers = [c for c in _containers_at(document, prefix.split(".") if prefix else []) if isinstance(c, (dict, list))]
+	if not containers:
+		return None, iter(())
+	if isinstance(containers[0], list):
+		return "start_array", chain.from_iterable(c for c in containers if isinstance(c, list))
+	return "start_map", chain.from_iterable(c.values() for c in containers if isinstance(c, dict))
+
+
 def iter_items(
-	json_file: str | Path,
+	json_file: str | Path | BinaryIO,
 	root_path: Optional[str] = None,
 	allow_object_values: bool = False,
+	number_mode: str = NumberMode.DECIMAL,
+	backend: str | None = None,
+	counter: Optional[ByteCounter] = None,
+	projection: Optional[RecordProjection] = None,
+	parser: str = ParserMode.AUTO,
+	memory_limit: int = DEFAULT_MEMORY_PARSE_LIMIT,
 ) -> Iterator[dict]:
 	"""
 	Stream JSON records from a large file without loading into memory.
@@ -38,56 +635,120 @@ def iter_items(
 	- If the root points to an array (recommended), yields each element of the array.
 	- If allow_object_values is True and the root points to an object, yields each value.
 
+	The root's type is detected from the event stream, so the input is tokenized
+	once. Inputs are probed only up to the root's opening bracket and then re-read
+	by the backend's native item builder: seekable files are rewound, pipes
+	replay the few bytes read so far (see _ReplayReader).
+
 	Parameters:
-	- json_file: Path to input JSON file
+	- json_file: Path to input JSON file ("-" for stdin; gzip/bz2/xz/zstd input is
+	  decompressed transparently, see open_input), or a binary file object (not
+	  closed here)
 	- root_path: Dotted path or JSON Pointer to the array/object to iterate
 	- allow_object_values: If True, when root points to an object, iterate over its values
+	- number_mode: "decimal" (exact, default), "float" (parsed natively, fastest) or
+	  "string" (numbers kept as text)
+	- backend: ijson backend name; defaults to the fastest available (see select_backend)
+	- counter: ByteCounter tracking the bytes read when json_file is a path (see open_input)
+	- projection: build records from the parse events, leaving out the subtrees
+	  projection drops (see RecordProjection) instead of materializing them
+	- parser / memory_limit: parse the whole input in memory instead of streaming
+	  it (see use_memory_parser); invalid JSON falls back to the streaming
+	  parser for its error, when the input can be read again (ParserMode.SPLIT
+	  streams here: split inputs are read by io_array.iter_array_items)
 
 	Raises ValueError with helpful guidance when nothing is found at the provided root.
 	"""
-	json_path = Path(json_file)
-	if not json_path.exists():
-		raise FileNotFoundError(f"Input JSON file not found: {json_path}")
-
+	if number_mode not in (NumberMode.DECIMAL, NumberMode.FLOAT, NumberMode.STRING):
+		raise ValueError(f"Unknown number mode: {number_mode!r} (expected decimal, float or string)")
+	convert = _stringify_numbers if number_mode == NumberMode.STRING else None
 	prefix_base = _normalize_root_path_to_ijson_prefix(root_path)
+
+	if use_memory_parser(json_file, parser, memory_limit, projection):
+		try:
+			document = _load_document(json_file, number_mode, counter)
+		except ValueError:
+			if _plain_file_size(json_file) is None:
+				raise
+			# Read it again with the streaming parser, which reports where the
+			# error is (or handles integers too large for orjson)
+		else:
+			kind, records = _document_records(document, prefix_base)
+			if kind == "start_map" and not allow_object_values:
+				kind, records = None, iter(())
+			del document  # records keep the parts still needed
+			if (yield from _yield_records(kind, records, convert)):
+				return
+			raise _no_items_error(root_path)
+
+	_name, backend_module = select_backend(backend)
+	use_float = number_mode == NumberMode.FLOAT
 	# Determine ijson prefix for array items
 	items_prefix = "item" if prefix_base == "" else f"{prefix_base}.item"
 
-	with json_path.open("rb") as f:
-		# Try as array first
-		yielded_any = False
-		for obj in ijson.items(f, items_prefix):
-			yielded_any = True
-			yield obj  # type: ignore[misc]
+	with ExitStack() as stack:
+		if hasattr(json_file, "read"):
+			f = json_file
+		else:
+			f = stack.enter_context(open_input(json_file, counter))  # type: ignore[arg-type]
+
+		seekable = f.seekable()
+		if seekable:
+			start = f.tell()
+		else:
+			f = _ReplayReader(f)
+		events = backend_module.parse(f, use_float=use_float)
+		root_event = _probe_root(events, prefix_base)
+		kind = root_event[1] if root_event else None
+
+		if kind == "start_map" and not allow_object_values:
+			kind = None
 
-		if yielded_any:
+		records: Iterable[Any] = ()
+		if kind is not None and projection is not None:
+			# Projected records are built from these same events: nothing is read twice
+			records = _iter_projected(events, root_event, prefix_base, projection)  # type: ignore[arg-type]
+		elif kind is not None:
+			# Native builders reading the stream directly are much faster than
+			# builders fed with Python-level events, so restart from the beginning:
+			# only the bytes before the root's opening bracket are read twice.
+			source: Any = f
+			parse_kwargs: Dict[str, Any] = {"use_float": use_float}
+			if seekable:
+				f.seek(start)
+			elif not f.rewind():  # type: ignore[attr-defined]
+				# Root starts too deep into a pipe to replay: continue from the events
+				source = chain([root_event], events)
+				parse_kwargs = {}
+			if kind == "start_array":
+				records = backend_module.items(source, items_prefix, **parse_kwargs)
+			else:
+				# For objects, use kvitems to get values under the object root
+				records = (value for _key, value in backend_module.kvitems(source, prefix_base, **parse_kwargs))
+
+		if (yield from _yield_records(kind, records, convert)):
 			return
+	raise _no_items_error(root_path)
+
+
+def _yield_records(kind: Optional[str], records: Iterable[Any], convert: Optional[Any]) -> Generator[dict, None, int]:
+	"""Yield records as iter_items does (object values that are not objects wrapped); returns the count."""
+	count = 0
+	for obj in records:
+		count += 1
+		if convert is not None:
+			obj = convert(obj)
+		if kind == "start_array" or isinstance(obj, dict):
+			yield obj
+		else:
+			# Produce dict for scalar object values to keep a consistent interface
+			yield {"value": obj}
+	return count
 
-		# If no items yielded, consider object values when allowed
-		if allow_object_values:
-			# For objects, use kvitems to get values under the object root
-			f.seek(0)
-			object_prefix = prefix_base
-			if not object_prefix:
-				# top-level object
-				object_prefix = ""
-			values_iter = (
-				value
-				for _key, value in ijson.kvitems(f, object_prefix)  # type: ignore[arg-type]
-			)
-			count = 0
-			for value in values_iter:
-				count += 1
-				if isinstance(value, dict):
-					yield value
-				else:
-					# Produce dict for scalar values to keep a consistent interface
-					yield {"value": value}
-			if count:
-				return
 
+def _no_items_error(root_path: Optional[str]) -> ValueError:
 	# Neither array items nor object values were found
-	raise ValueError(
+	return ValueError(
 		"No items found at the given root path. "
 		"Ensure the root points to an array (recommended), or pass allow_object_values=True for objects. "
 		f"Root provided: {root_path!r}"
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import io
+import json
+import mmap
+from contextlib import ExitStack
+from decimal import Decimal
+from functools import partial
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, List, NamedTuple, Optional
+
+import orjson
+
+from .io_json import STDIN, ByteCounter, NumberMode, _ReplayReader, _reject_constant, _stringify_numbers, open_input
+from .parallel import ordered_map
+
+
+class InputFormat:
+    AUTO = "auto"
+    JSON = "json"
+    NDJSON = "ndjson"
+
+
+# File extensions (before any compression suffix) that mean one JSON value per line
+NDJSON_SUFFIXES = frozenset({".ndjson", ".jsonl", ".ldjson"})
+# Suffixes of the compressed inputs open_input understands
+COMPRESSION_SUFFIXES = frozenset({".gz", ".bz2", ".xz", ".zst"})
+
+# Bytes of input inspected by content sniffing
+SNIFF_BYTES = 1 << 16
+# Target size of the line-aligned chunks parsed per task
+DEFAULT_CHUNK_BYTES = 4 << 20
+
+
+class Chunk(NamedTuple):
+    """
+    A run of complete lines of NDJSON input.
+
+    File chunks are the byte range [start, end) of path and are read by whoever
+    parses them (so worker processes receive a few integers, not the data);
+    stream chunks carry their bytes in data.
+    """
+
+    start: int
+    end: int
+    path: Optional[str] = None
+    data: Optional[bytes] = None
+
+
+def _sniff(head: bytes) -> str:
+    """NDJSON if the first line is a complete JSON object followed by more data."""
+    text = head.lstrip()
+    if not text.startswith(b"{"):
+        return InputFormat.JSON
+    newline = text.find(b"\n")
+    if newline < 0 or not text[newline:].strip():
+        return InputFormat.JSON
+    try:
+        orjson.loads(text[:newline])
+    except orjson.JSONDecodeError:
+        # e.g. a pretty-printed document whose first line is just "{"
+        return InputFormat.JSON
+    return InputFormat.NDJSON
+
+
+def _read_head(stream: BinaryIO, size: int = SNIFF_BYTES) -> bytes:
+    parts: List[bytes] = []
+    remaining = size
+    while remaining > 0:
+        data = stream.read(remaining)
+        if not data:
+            break
+        parts.append(data)
+        remaining -= len(data)
+        if b"\n" in data:
+            break
+    return b"".join(parts)
+
+
+def sniff_input_format(stream: BinaryIO) -> tuple[str, BinaryIO]:
+    """
+    Guess the format of an open binary stream from its first bytes.
+
+    Returns (format, stream), where stream still yields the sniffed bytes:
+    seekable streams are rewound, others are wrapped in a replaying reader.
+    """
+    if stream.seekable():
+        start = stream.tell()
+        head = _read_head(stream)
+        stream.seek(start)
+        return _sniff(head), stream
+    replay = _ReplayReader(stream)
+    head = _read_head(replay)  # type: ignore[arg-type]
+    replay.rewind()
+    return _sniff(head), io.BufferedReader(replay)  # type: ignore[return-value]
+
+
+def detect_input_format(source: str | Path) -> str:
+    """
+    Guess whether a file holds one JSON document or NDJSON (JSON Lines).
+
+    The extension decides when it is known (.ndjson, .jsonl, .ldjson, optionally
+    followed by a compression suffix); otherwise the first line is inspected.
+    """
+    path = Path(source)
+    suffixes = [s.lower() for s in path.suffixes]
+    if suffixes and suffixes[-1] in COMPRESSION_SUFFIXES:
+        suffixes.pop()
+    if suffixes and suffixes[-1] in NDJSON_SUFFIXES:
+        return InputFormat.NDJSON
+    with open_input(path) as stream:
+        return _sniff(_read_head(stream))
+
+
+def _loads(number_mode: str):
+    """Per-line decoder matching iter_items' number handling."""
+    if number_mode == NumberMode.FLOAT:
+        # orjson produces ints and floats, like ijson with use_float
+        return orjson.loads
+    # One decoder for the whole chunk: json.loads would build a new one per call
+    decode = json.JSONDecoder(parse_float=Decimal, parse_constant=_reject_constant).decode
+
+    def decimal_loads(line: bytes) -> Any:
+        return decode(line.decode("utf-8"))
+
+    if number_mode == NumberMode.STRING:
+        return lambda line: _stringify_numbers(decimal_loads(line))
+    return decimal_loads
+
+
+def _chunk_bytes(chunk: Chunk) -> bytes:
+    if chunk.data is not None:
+        return chunk.data
+    with open(chunk.path, "rb") as f:  # type: ignore[arg-type]
+        f.seek(chunk.start)
+        return f.read(chunk.end - chunk.start)
+
+
+def parse_chunk(chunk: Chunk, number_mode: str = NumberMode.DECIMAL) -> List[Any]:
+    """
+    Decode every non-blank line of a chunk, in order.
+
+    Raises ValueError naming the byte offset of the first invalid line.
+    """
+    loads = _loads(number_mode)
+    records: List[Any] = []
+    offset = chunk.start
+    for line in _chunk_bytes(chunk).splitlines(keepends=True):
+        if line.strip():
+            try:
+                records.append(loads(line))
+            except ValueError as exc:  # orjson.JSONDecodeError and json.JSONDecodeError included
+                raise ValueError(f"Invalid JSON line at byte offset {offset} of NDJSON input: {exc}") from exc
+        offset += len(line)
+    return records
+
+
+def _file_chunks(path: str, mapped: mmap.mmap, chunk_bytes: int, counter: Optional[ByteCounter]) -> Iterator[Chunk]:
+    size = len(mapped)
+    start = 0
+    while start < size:
+        end = start + chunk_bytes
+        if end >= size:
+            end = size
+        else:
+            newline = mapped.find(b"\n", end)
+            end = size if newline < 0 else newline + 1
+        if counter is not None:
+            counter.bytes_read = end
+        yield Chunk(start, end, path)
+        start = end
+
+
+def _stream_chunks(stream: BinaryIO, chunk_bytes: int) -> Iterator[Chunk]:
+    start = 0
+    pending = b""
+    while True:
+        data = stream.read(chunk_bytes)
+        if not data:
+            break
+        data = pending + data
+        cut = data.rfind(b"\n") + 1
+        if not cut:
+            pending = data
+            continue
+        pending = data[cut:]
+        yield Chunk(start, start + cut, data=data[:cut])
+        start += cut
+    if pending:
+        yield Chunk(start, start + len(pending), data=pending)
+
+
+def _is_plain_file(source: str | Path | BinaryIO) -> bool:
+    """True for on-disk, uncompressed, non-empty files, which are memory-mapped."""
+    if hasattr(source, "read") or str(source) == STDIN:
+        return False
+    with open_input(source) as stream:  # type: ignore[arg-type]
+        return isinstance(stream, io.BufferedReader) and Path(source).stat().st_size > 0  # type: ignore[arg-type]
+
+
+def iter_chunks(
+    source: str | Path | BinaryIO,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    counter: Optional[ByteCounter] = None,
+) -> Iterator[Chunk]:
+    """
+    Cut NDJSON input into chunks of complete lines of about chunk_bytes.
+
+    Plain files are memory-mapped and split into byte ranges at newline
+    boundaries without being read; stdin and compressed input ("-" and
+    gzip/bz2/xz/zstd, see open_input) are read sequentially into chunks.
+    A counter tracks the input position of path sources: the end of the last
+    chunk handed out, or the bytes read (see open_input).
+    """
+    with ExitStack() as stack:
+        if _is_plain_file(source):
+            path = str(source)
+            f = stack.enter_context(open(path, "rb"))
+            mapped = stack.enter_context(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            yield from _file_chunks(path, mapped, chunk_bytes, counter)
+            return
+        if hasattr(source, "read"):
+            stream = source
+        else:
+            stream = stack.enter_context(open_input(source, counter))  # type: ignore[arg-type]
+        yield from _stream_chunks(stream, chunk_bytes)  # type: ignore[arg-type]
+
+
+def iter_ndjson(
+    source: str | Path | BinaryIO,
+    number_mode: str = NumberMode.DECIMAL,
+    *,
+    workers: int = 1,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    counter: Optional[ByteCounter] = None,
+) -> Iterator[Any]:
+    """
+    Stream the records of NDJSON (JSON Lines) input, one per non-blank line.
+
+    Numbers follow number_mode as in iter_items. With workers > 1, chunks are
+    decoded on a process pool and yielded in input order. counter is passed
+    to iter_chunks.
+    """
+    if number_mode not in (NumberMode.DECIMAL, NumberMode.FLOAT, NumberMode.STRING):
+        raise ValueError(f"Unknown number mode: {number_mode!r} (expected decimal, float or string)")
+    chunks = iter_chunks(source, chunk_bytes, counter)
+    if workers > 1:
+        for records in ordered_map(partial(parse_chunk, number_mode=number_mode), chunks, workers=workers):
+            yield from records
+        return
+    for chunk in chunks:
+        yield from parse_chunk(chunk, number_mode)
@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import re
+from collections import OrderedDict
+from itertools import chain, islice
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .io_table import COLUMNAR_SUFFIXES, DEFAULT_BATCH_ROWS, _collect_headers, _infer_column_types, _row_values, write_table
+
+# Open shard files kept at once; the least recently used one is closed beyond this
+DEFAULT_MAX_OPEN_FILES = 64
+# Rendered CSV buffered per shard before it is appended to disk
+SHARD_BLOCK_BYTES = 1 << 20
+# All shard buffers together; beyond this every buffer is written out
+SHARD_BUFFER_BUDGET = 64 << 20
+# Rows per pickled batch when partitions are spooled for non-CSV formats
+SPOOL_BATCH_ROWS = 1024
+
+_SIZE_UNITS = {"": 1, "B": 1, "K": 1 << 10, "KB": 1 << 10, "M": 1 << 20, "MB": 1 << 20, "G": 1 << 30, "GB": 1 << 30}
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]+")
+# Partition labels longer than this are cut and made unique with a hash
+_MAX_LABEL = 64
+
+
+def parse_size(text: str) -> int:
+    """'10MB', '1.5GB', '2048' (bytes) -> bytes."""
+    match = re.fullmatch(r"\s*([\d.]+)\s*([KMG]?B?)\s*", text.upper())
+    if not match:
+        raise ValueError(f"Invalid size: {text!r} (expected e.g. 500MB, 1.5GB or a number of bytes)")
+    number, unit = match.groups()
+    return int(float(number) * _SIZE_UNITS[unit])
+
+
+def shard_path(output_file: str | Path, index: Optional[int] = None, partition: Optional[str] = None) -> Path:
+    """out.csv -> out-00001.csv, out-<partition>.csv or out-<partition>-00001.csv."""
+    path = Path(output_file)
+    parts = [path.stem]
+    if partition is not None:
+        parts.append(partition)
+    if index is not None:
+        parts.append(f"{index:05d}")
+    return path.with_name("-".join(parts) + path.suffix)
+
+
+class _Labels:
+    """File-name-safe, distinct labels for partition values."""
+
+    def __init__(self) -> None:
+        self._by_value: Dict[Any, str] = {}
+        self._taken: set[str] = set()
+
+    def __call__(self, value: Any) -> str:
+        key = (value.__class__, value) if value.__hash__ is not None else repr(value)
+        label = self._by_value.get(key)
+        if label is None:
+            text = "null" if value is None else str(value)
+            label = _UNSAFE.sub("_", text).strip("._") or "_"
+            if label != text or len(label) > _MAX_LABEL or label in self._taken:
+                # Sanitized, cut or clashing: add a hash of the original value
+                digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:8]
+                label = f"{label[:_MAX_LABEL]}_{digest}"
+            self._taken.add(label)
+            self._by_value[key] = label
+        return label
+
+
+class _FilePool:
+    """At most max_open files open for appending; the least recently used is closed first."""
+
+    def __init__(self, max_open: int) -> None:
+        if max_open < 1:
+            raise ValueError("max_open_files must be at least 1")
+        self.max_open = max_open
+        self._open: "OrderedDict[Path, BinaryIO]" = OrderedDict()
+        self._created: set[Path] = set()
+
+    def append(self, path: Path, data: bytes) -> None:
+        f = self._open.get(path)
+        if f is None:
+            if len(self._open) >= self.max_open:
+                _path, oldest = self._open.popitem(last=False)
+                oldest.close()
+            # First open truncates, later ones append
+            f = path.open("ab" if path in self._created else "wb")
+            self._created.add(path)
+            self._open[path] = f
+        else:
+            self._open.move_to_end(path)
+        f.write(data)
+
+    def close(self) -> None:
+        while self._open:
+            self._open.popitem()[1].close()
+
+
+class _CsvShard:
+    """One CSV output file: rows are rendered into a buffer and appended to disk in blocks."""
+
+    def __init__(self, path: Path, headers: Sequence[str], encoding: str) -> None:
+        import csv
+
+        self.path = path
+        self.rows = 0
+        self.bytes = 0
+        self._encoding = encoding
+        self._buffer = io.StringIO()
+        self._writerow = csv.writer(self._buffer).writerow
+        self._writerow(headers)
+
+    @property
+    def buffered(self) -> int:
+        return self._buffer.tell()
+
+    def write(self, values: List[object]) -> None:
+        self._writerow(values)
+        self.rows += 1
+
+    def flush(self, pool: _FilePool) -> None:
+        if self._buffer.tell():
+            data = self._buffer.getvalue().encode(self._encoding)
+            pool.append(self.path, data)
+            self.bytes += len(data)
+            self._buffer.seek(0)
+            self._buffer.truncate()
+
+
+class _Router:
+    """Rows to shards: a new shard per partition and whenever the current one is full."""
+
+    def __init__(
+        self,
+        output_file: Path,
+        make_shard: Callable[[Path, int], Any],
+        pool: _FilePool,
+        *,
+        split_rows: Optional[int],
+        split_bytes: Optional[int],
+        partitioned: bool,
+    ) -> None:
+        self._output_file = output_file
+        self._make_shard = make_shard
+        self._pool = pool
+        self._split_rows = split_rows
+        self._split_bytes = split_bytes
+        self._numbered = split_rows is not None or split_bytes is not None
+        self._partitioned = partitioned
+        self._current: Dict[Optional[str], Any] = {}
+        self._count: Dict[Optional[str], int] = {}
+        self._buffered = 0
+        self.shards: List[Any] = []
+
+    def _full(self, shard: Any) -> bool:
+        if self._split_rows is not None and shard.rows >= self._split_rows:
+            return True
+        return self._split_bytes is not None and shard.bytes + shard.buffered >= self._split_bytes
+
+    def shard(self, partition: Optional[str]) -> Any:
+        """The shard the next row of partition goes to."""
+        shard = self._current.get(partition)
+        if shard is not None:
+            if not self._full(shard):
+                return shard
+            self._buffered -= shard.buffered
+            shard.flush(self._pool)
+        index = self._count[partition] = self._count.get(partition, 0) + 1
+        path = shard_path(
+            self._output_file,
+            index if self._numbered else None,
+            partition if self._partitioned else None,
+        )
+        shard = self._current[partition] = self._make_shard(path, len(self.shards))
+        self.shards.append(shard)
+        return shard
+
+    def write(self, shard: Any, values: List[object]) -> None:
+        before = shard.buffered
+        shard.write(values)
+        self._buffered += shard.buffered - before
+        if shard.buffered >= SHARD_BLOCK_BYTES:
+            self._buffered -= shard.buffered
+            shard.flush(self._pool)
+        elif self._buffered >= SHARD_BUFFER_BUDGET:
+            self.flush()
+
+    def flush(self) -> None:
+        for shard in self._current.values():
+            shard.flush(self._pool)
+        self._buffered = 0
+
+
+class _SpoolShard:
+    """Rows of one partition, pickled in batches to a temporary file until they are written."""
+
+    def __init__(self, path: Path, spool: Path) -> None:
+        import pickle
+
+        self._pickle = pickle
+        self.path = path
+        self.spool = spool
+        self.rows = 0
+        self.bytes = 0
+        self._batch: List[List[object]] = []
+        self._pending = b""
+
+    @property
+    def buffered(self) -> int:
+        return len(self._pending)
+
+    def write(self, values: List[object]) -> None:
+        self._batch.append(values)
+        self.rows += 1
+        if len(self._batch) >= SPOOL_BATCH_ROWS:
+            self._pending += self._pickle.dumps(self._batch, self._pickle.HIGHEST_PROTOCOL)
+            self._batch = []
+
+    def flush(self, pool: _FilePool) -> None:
+        if self._batch:
+            self._pending += self._pickle.dumps(self._batch, self._pickle.HIGHEST_PROTOCOL)
+            self._batch = []
+        if self._pending:
+            pool.append(self.spool, self._pending)
+            self._pending = b""
+
+    def read(self, headers: Sequence[str]) -> Iterator[Dict[str, object]]:
+        with self.spool.open("rb") as f:
+            while True:
+                try:
+                    batch = self._pickle.load(f)
+                except EOFError:
+                    return
+                for values in batch:
+                    yield dict(zip(headers, values))
+
+
+def write_split(
+    rows: Iterable[Dict[str, object]],
+    output_file: str | Path,
+    *,
+    split_rows: Optional[int] = None,
+    split_bytes: Optional[int] = None,
+    partition_by: Optional[str] = None,
+    max_open_files: int = DEFAULT_MAX_OPEN_FILES,
+    sheet_name: str = "Sheet1",
+    xlsx_engine: str = "openpyxl",
+    batch_rows: Optional[int] = None,
+    max_sample: int = 1000,
+    pre_headers: Sequence[str] | None = None,
+    encoding: str = "utf-8",
+    header_order: str = "stable",
+    include_prefixes: Sequence[str] | None = None,
+    headers: Sequence[str] | None = None,
+) -> List[Path]:
+    """
+    Write rows to several files next to output_file, each with the full header row.
+
+    - split_rows / split_bytes: start a new shard once the current one has that
+      many data rows / bytes (bytes: CSV only, checked per row against the
+      rendered size, so shards end on row boundaries at or just past the limit).
+    - partition_by: one shard (or one numbered series) per value of that column.
+
+    Headers are collected once, as by write_table, and shared by every shard;
+    so are the column types of Parquet and Arrow shards.
+    Shards are named by shard_path. CSV shards are rendered into per-shard
+    buffers appended to disk in blocks through at most max_open_files open
+    handles, so any number of partitions can be interleaved. Other formats are
+    written one shard at a time with write_table; partitioned rows are first
+    spooled per partition to temporary files. Returns the shard paths in the
+    order they were started.
+    """
+    if split_rows is None and split_bytes is None and partition_by is None:
+        raise ValueError("Pass split_rows, split_bytes or partition_by")
+    if split_rows is not None and split_rows < 1:
+        raise ValueError("split_rows must be at least 1")
+    if split_bytes is not None and split_bytes < 1:
+        raise ValueError("split_bytes must be at least 1")
+    out_path = Path(output_file)
+    suffix = out_path.suffix.lower()
+    if split_bytes is not None and suffix != ".csv":
+        raise ValueError("Splitting by size is only supported for CSV output; use split_rows")
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    header_list, _buf, chained = _collect_headers(
+        rows,
+        max_sample=max_sample,
+        pre_headers=pre_headers,
+        order=header_order,
+        include_prefixes=include_prefixes,
+        known_headers=headers,
+    )
+    table_options: Dict[str, Any] = dict(sheet_name=sheet_name, xlsx_engine=xlsx_engine, headers=header_list)
+    if batch_rows is not None:
+        table_options["batch_rows"] = batch_rows
+    if suffix in COLUMNAR_SUFFIXES:
+        # Typed once, like the headers, so that every shard has the same schema
+        sample = list(islice(chained, max(max_sample, batch_rows or DEFAULT_BATCH_ROWS)))
+        table_options["column_types"] = _infer_column_types(sample, header_list)
+        chained = chain(sample, chained)
+
+    if suffix != ".csv" and partition_by is None:
+        # One shard at a time, each a complete write_table run
+        paths: List[Path] = []
+        remaining = iter(chained)
+        while True:
+            first = next(remaining, None)
+            if first is None and paths:
+                return paths
+            path = shard_path(out_path, len(paths) + 1)
+            shard_rows = iter(()) if first is None else chain([first], islice(remaining, split_rows - 1))  # type: ignore[operator]
+            write_table(shard_rows, path, **table_options)
+            paths.append(path)
+
+    import tempfile
+
+    labels = _Labels()
+    pool = _FilePool(max_open_files)
+    csv_output = suffix == ".csv"
+    with tempfile.TemporaryDirectory(prefix="json-to-excel-spool-") as spool_dir:
+        if csv_output:
+            make_shard: Callable[[Path, int], Any] = lambda path, _n: _CsvShard(path, header_list, encoding)  # noqa: E731
+        else:
+            make_shard = lambda path, n: _SpoolShard(path, Path(spool_dir) / f"{n}.pickle")  # noqa: E731
+        router = _Router(
+            out_path,
+            make_shard,
+            pool,
+            split_rows=split_rows,
+            split_bytes=split_bytes,
+            partitioned=partition_by is not None,
+        )
+        try:
+            if partition_by is None:
+                # Created up front so that empty input still gets a header-only file
+                router.shard(None)
+            for row in chained:
+                shard = router.shard(None if partition_by is None else labels(row.get(partition_by)))
+                # CSV shards hold rendered cells; spooled ones the values write_table will render
+                router.write(shard, _row_values(row, header_list) if csv_output else list(map(row.get, header_list)))
+            router.flush()
+        finally:
+            pool.close()
+
+        if not csv_output:
+            for shard in router.shards:
+                write_table(shard.read(header_list), shard.path, **table_options)
+    return [shard.path for shard in router.shards]
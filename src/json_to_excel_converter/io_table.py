@@ -1,53 +1,57 @@
 from __future__ import annotations
 
+import os
+from itertools import chain, islice
 from pathlib import Path
-from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
 
 import orjson
-from openpyxl import Workbook
 from decimal import Decimal
 
+from .schema import _type_name
+from .xlsx_stream import EXCEL_MAX_ROWS, StreamingWorkbook, rollover_sheet_name
 
-def _collect_headers(
-    rows: Iterable[Dict[str, object]],
-    max_sample: int = 1000,
+
+# Rows per Arrow record batch (and Parquet row group)
+DEFAULT_BATCH_ROWS = 65_536
+
+COLUMNAR_SUFFIXES = frozenset({".parquet", ".arrow", ".feather"})
+TABLE_SUFFIXES = frozenset({".csv", ".xlsx"}) | COLUMNAR_SUFFIXES
+
+
+class XlsxEngine:
+    OPENPYXL = "openpyxl"
+    # Native writer that streams worksheet XML to disk; memory stays flat
+    STREAM = "stream"
+
+
+def _order_headers(
+    keys: Iterable[str],
     pre_headers: Sequence[str] | None = None,
     order: str = "stable",
     include_prefixes: Sequence[str] | None = None,
-) -> tuple[List[str], List[Dict[str, object]], Iterator[Dict[str, object]]]:
+) -> List[str]:
     """
-    Look ahead up to max_sample rows to build a header list and return
-    a generator that yields first the buffered rows then the rest.
+    Build the final header list from discovered keys (in first-seen order).
 
     order:
-    - "stable": preserve first-seen key order across sampled rows
+    - "stable": preserve first-seen key order
     - "alpha": alphabetical after pre_headers
     """
     pre_headers = list(pre_headers or [])
-    buffer: List[Dict[str, object]] = []
-
-    it = iter(rows)
-    for _ in range(max_sample):
-        try:
-            row = next(it)
-        except StopIteration:
-            break
-        buffer.append(row)
 
     if order == "alpha":
         header_set: set[str] = set(pre_headers)
-        for r in buffer:
-            header_set.update(r.keys())
+        header_set.update(keys)
         discovered = sorted(h for h in header_set if h not in pre_headers)
         headers = pre_headers + discovered
     else:
         seen: set[str] = set(pre_headers)
         headers: List[str] = list(pre_headers)
-        for r in buffer:
-            for k in r.keys():
-                if k not in seen:
-                    seen.add(k)
-                    headers.append(k)
+        for k in keys:
+            if k not in seen:
+                seen.add(k)
+                headers.append(k)
 
     # Reorder headers after pre_headers according to include_prefixes order, if provided
     if include_prefixes:
@@ -78,6 +82,42 @@ def _collect_headers(
         tail = [h for h in remaining if h not in seen_sel]
         headers = pinned + selected + tail
 
+    return headers
+
+
+def _collect_headers(
+    rows: Iterable[Dict[str, object]],
+    max_sample: int = 1000,
+    pre_headers: Sequence[str] | None = None,
+    order: str = "stable",
+    include_prefixes: Sequence[str] | None = None,
+    known_headers: Sequence[str] | None = None,
+) -> tuple[List[str], List[Dict[str, object]], Iterator[Dict[str, object]]]:
+    """
+    Look ahead up to max_sample rows to build a header list and return
+    a generator that yields first the buffered rows then the rest.
+
+    When known_headers is given (e.g. from a full-schema pass), no rows are
+    buffered: the known columns are ordered and rows stream through untouched.
+    """
+    buffer: List[Dict[str, object]] = []
+    it = iter(rows)
+
+    if known_headers is not None:
+        headers = _order_headers(known_headers, pre_headers, order, include_prefixes)
+        return headers, buffer, it
+
+    for _ in range(max_sample):
+        try:
+            row = next(it)
+        except StopIteration:
+            break
+        buffer.append(row)
+
+    headers = _order_headers(
+        (k for r in buffer for k in r.keys()), pre_headers, order, include_prefixes
+    )
+
     def chained() -> Iterator[Dict[str, object]]:
         for r in buffer:
             yield r
@@ -105,6 +145,15 @@ def _normalize_cell(value: object) -> object:
         return str(value)
 
 
+# Cell types _normalize_cell returns unchanged; checked inline to skip the call
+_PASSTHROUGH_TYPES = frozenset({str, int, float, bool})
+
+
+def _row_values(row: Dict[str, object], headers: Sequence[str]) -> List[object]:
+    """Normalized cell values of row, positioned by header index."""
+    return [v if v.__class__ in _PASSTHROUGH_TYPES else _normalize_cell(v) for v in map(row.get, headers)]
+
+
 def write_csv(
     rows: Iterable[Dict[str, object]],
     output_file: str | Path,
@@ -115,6 +164,7 @@ def write_csv(
     encoding: str = "utf-8",
     header_order: str = "stable",
     include_prefixes: Sequence[str] | None = None,
+    headers: Sequence[str] | None = None,
 ) -> None:
     import csv
 
@@ -122,16 +172,20 @@ def write_csv(
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
     headers, _buf, chained = _collect_headers(
-        rows, max_sample=max_sample, pre_headers=pre_headers, order=header_order, include_prefixes=include_prefixes
+        rows,
+        max_sample=max_sample,
+        pre_headers=pre_headers,
+        order=header_order,
+        include_prefixes=include_prefixes,
+        known_headers=headers,
     )
 
     with out_path.open("w", newline="", encoding=encoding) as f:
-        writer = csv.DictWriter(f, fieldnames=headers, extrasaction="ignore")
+        writer = csv.writer(f)
         if include_headers:
-            writer.writeheader()
-        for row in chained:
-            normalized = {k: _normalize_cell(row.get(k)) for k in headers}
-            writer.writerow(normalized)
+            writer.writerow(headers)
+        # Rows become header-aligned lists once; csv consumes them in C
+        writer.writerows(_row_values(row, headers) for row in chained)
 
 
 def write_xlsx(
@@ -144,25 +198,323 @@ def write_xlsx(
     pre_headers: Sequence[str] | None = None,
     header_order: str = "stable",
     include_prefixes: Sequence[str] | None = None,
+    engine: str = XlsxEngine.OPENPYXL,
+    max_rows_per_sheet: int = EXCEL_MAX_ROWS,
+    headers: Sequence[str] | None = None,
 ) -> None:
+    """
+    Write rows to an XLSX workbook.
+
+    engine:
+    - "openpyxl": build the workbook in memory with openpyxl, then save
+    - "stream": write worksheet XML to disk as rows arrive (constant memory)
+
+    When a sheet reaches max_rows_per_sheet (Excel's limit by default, header
+    included), writing continues on a new sheet named "<sheet_name>_2",
+    "<sheet_name>_3", ... that repeats the header row.
+    """
+    if engine not in (XlsxEngine.OPENPYXL, XlsxEngine.STREAM):
+        raise ValueError(f"Unknown XLSX engine: {engine!r} (expected 'openpyxl' or 'stream')")
+    if max_rows_per_sheet < (2 if include_headers else 1):
+        raise ValueError("max_rows_per_sheet must leave room for at least one data row")
+
     out_path = Path(output_file)
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
     headers, _buf, chained = _collect_headers(
-        rows, max_sample=max_sample, pre_headers=pre_headers, order=header_order, include_prefixes=include_prefixes
+        rows,
+        max_sample=max_sample,
+        pre_headers=pre_headers,
+        order=header_order,
+        include_prefixes=include_prefixes,
+        known_headers=headers,
     )
 
+    if engine == XlsxEngine.STREAM:
+        with StreamingWorkbook(out_path) as book:
+            sheet_idx = 1
+            book.add_sheet(sheet_name)
+            if include_headers:
+                book.append(headers)
+            for row in chained:
+                if book.row_count >= max_rows_per_sheet:
+                    sheet_idx += 1
+                    book.add_sheet(rollover_sheet_name(sheet_name, sheet_idx))
+                    if include_headers:
+                        book.append(headers)
+                book.append(_row_values(row, headers))
+        return
+
+    # openpyxl is the slowest import of all; only the openpyxl engine loads it
+    from openpyxl import Workbook
+
     wb = Workbook()
     ws = wb.active
     ws.title = sheet_name
+    sheet_idx = 1
 
-    row_idx = 1
+    row_idx = 0
     if include_headers:
         ws.append(headers)
         row_idx += 1
 
     for row in chained:
-        ws.append([_normalize_cell(row.get(k)) for k in headers])
+        if row_idx >= max_rows_per_sheet:
+            sheet_idx += 1
+            ws = wb.create_sheet(rollover_sheet_name(sheet_name, sheet_idx))
+            row_idx = 0
+            if include_headers:
+                ws.append(headers)
+                row_idx += 1
+        ws.append(_row_values(row, headers))
         row_idx += 1
 
     wb.save(out_path)
+
+
+def require_pyarrow() -> Any:
+    try:
+        import pyarrow
+    except ImportError as exc:
+        raise ValueError(
+            "Parquet and Arrow output require the 'pyarrow' package "
+            "(pip install 'json-to-excel-converter[parquet]')"
+        ) from exc
+    return pyarrow
+
+
+class ColumnTypeError(ValueError):
+    """A value does not fit the type a columnar output column was given."""
+
+
+def _infer_column_types(rows: Sequence[Dict[str, object]], headers: Sequence[str]) -> Dict[str, str]:
+    """
+    Column type names (as in schema.discover_schema) from sample rows.
+
+    Integers widen to "number" when floats/decimals are also seen; any other
+    mix of types, and columns that are always null, become "string".
+    """
+    seen: Dict[str, set[str]] = {h: set() for h in headers}
+    for row in rows:
+        for key, value in row.items():
+            if value is not None and key in seen:
+                seen[key].add(_type_name(value))
+
+    types: Dict[str, str] = {}
+    for header, names in seen.items():
+        if names in ({"boolean"}, {"integer"}, {"number"}):
+            types[header] = names.pop()
+        elif names == {"integer", "number"}:
+            types[header] = "number"
+        else:
+            types[header] = "string"
+    return types
+
+
+def _to_number(value: object) -> object:
+    return float(value) if isinstance(value, Decimal) else value  # type: ignore[arg-type]
+
+
+def _to_string(value: object) -> object:
+    if value is None or value.__class__ is str:
+        return value
+    return str(_normalize_cell(value))
+
+
+class _ColumnarWriter:
+    """Turn row dicts into typed Arrow record batches of one fixed schema."""
+
+    def __init__(self, headers: Sequence[str], types: Dict[str, str], max_sample: int) -> None:
+        pa = require_pyarrow()
+        self._pa = pa
+        self._headers = list(headers)
+        self._types = [types[h] for h in self._headers]
+        arrow_types = {"boolean": pa.bool_(), "integer": pa.int64(), "number": pa.float64(), "string": pa.string()}
+        self.schema = pa.schema([(h, arrow_types[t]) for h, t in zip(self._headers, self._types)])
+        convert: Dict[str, Optional[Callable[[object], object]]] = {
+            "boolean": None, "integer": None, "number": _to_number, "string": _to_string
+        }
+        self._converters = [convert[t] for t in self._types]
+        self._max_sample = max_sample
+
+    def batch(self, rows: Sequence[Dict[str, object]]) -> Any:
+        pa = self._pa
+        arrays = []
+        for header, arrow_type, type_name, conv in zip(self._headers, self.schema.types, self._types, self._converters):
+            values = [row.get(header) for row in rows]
+            if conv is not None:
+                values = [conv(v) for v in values]
+            try:
+                arrays.append(pa.array(values, type=arrow_type))
+            except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError) as exc:
+                raise ColumnTypeError(
+                    f"Column {header!r} was inferred as {type_name} from the first {self._max_sample:,} rows "
+                    f"but later holds an incompatible value ({exc}). Increase --sample-headers so the "
+                    "sample covers it."
+                ) from exc
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+def _write_columnar(
+    open_writer: Callable[[Any, Any], Any],
+    rows: Iterable[Dict[str, object]],
+    output_file: str | Path,
+    *,
+    batch_rows: int,
+    max_sample: int,
+    pre_headers: Sequence[str] | None,
+    header_order: str,
+    include_prefixes: Sequence[str] | None,
+    headers: Sequence[str] | None,
+    column_types: Dict[str, str] | None,
+) -> None:
+    if batch_rows < 1:
+        raise ValueError("batch_rows must be at least 1")
+    pa = require_pyarrow()
+
+    out_path = Path(output_file)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    headers, _buf, chained = _collect_headers(
+        rows,
+        max_sample=max_sample,
+        pre_headers=pre_headers,
+        order=header_order,
+        include_prefixes=include_prefixes,
+        known_headers=headers,
+    )
+
+    # Types come from the header sample or the first batch, whichever is larger
+    sample_size = max(max_sample, batch_rows)
+    sample = list(islice(chained, sample_size))
+    if column_types is None:
+        column_types = _infer_column_types(sample, headers)
+    columns = _ColumnarWriter(headers, column_types, sample_size)
+
+    # Written next to the output and renamed on success: closing a writer
+    # after an error would still leave a valid file holding only some rows
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    try:
+        with pa.OSFile(str(tmp_path), "wb") as sink, open_writer(sink, columns.schema) as writer:
+            remaining = chain(sample, chained)
+            while batch := list(islice(remaining, batch_rows)):
+                writer.write_batch(columns.batch(batch))
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, out_path)
+
+
+def write_parquet(
+    rows: Iterable[Dict[str, object]],
+    output_file: str | Path,
+    *,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    compression: str = "zstd",
+    max_sample: int = 1000,
+    pre_headers: Sequence[str] | None = None,
+    header_order: str = "stable",
+    include_prefixes: Sequence[str] | None = None,
+    headers: Sequence[str] | None = None,
+    column_types: Dict[str, str] | None = None,
+) -> None:
+    """
+    Write rows to a Parquet file, one row group per batch_rows rows.
+
+    Requires pyarrow. Column types (boolean, int64, float64, else string) are
+    inferred from the first max(max_sample, batch_rows) rows unless given as
+    column_types (type names per header, as from _infer_column_types); only one batch
+    is held in memory at a time. A later value that does not fit its column
+    raises ColumnTypeError. The file is written under a temporary name and
+    only renamed to output_file once complete, so a failed run leaves none.
+    """
+    require_pyarrow()
+    import pyarrow.parquet as pq
+
+    def open_writer(sink: Any, schema: Any) -> Any:
+        return pq.ParquetWriter(sink, schema, compression=compression)
+
+    _write_columnar(
+        open_writer,
+        rows,
+        output_file,
+        batch_rows=batch_rows,
+        max_sample=max_sample,
+        pre_headers=pre_headers,
+        header_order=header_order,
+        include_prefixes=include_prefixes,
+        headers=headers,
+        column_types=column_types,
+    )
+
+
+def write_arrow(
+    rows: Iterable[Dict[str, object]],
+    output_file: str | Path,
+    *,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    max_sample: int = 1000,
+    pre_headers: Sequence[str] | None = None,
+    header_order: str = "stable",
+    include_prefixes: Sequence[str] | None = None,
+    headers: Sequence[str] | None = None,
+    column_types: Dict[str, str] | None = None,
+) -> None:
+    """
+    Write rows to an Arrow IPC file (Feather v2), one record batch per batch_rows rows.
+
+    Requires pyarrow; typing and memory behave as in write_parquet.
+    """
+    pa = require_pyarrow()
+    _write_columnar(
+        pa.ipc.new_file,
+        rows,
+        output_file,
+        batch_rows=batch_rows,
+        max_sample=max_sample,
+        pre_headers=pre_headers,
+        header_order=header_order,
+        include_prefixes=include_prefixes,
+        headers=headers,
+        column_types=column_types,
+    )
+
+
+def write_table(
+    rows: Iterable[Dict[str, object]],
+    output_file: str | Path,
+    *,
+    sheet_name: str = "Sheet1",
+    xlsx_engine: str = XlsxEngine.OPENPYXL,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    max_sample: int = 1000,
+    pre_headers: Sequence[str] | None = None,
+    header_order: str = "stable",
+    include_prefixes: Sequence[str] | None = None,
+    headers: Sequence[str] | None = None,
+    column_types: Dict[str, str] | None = None,
+) -> None:
+    """
+    Write rows with the writer matching the suffix of output_file (see TABLE_SUFFIXES).
+
+    Options that do not apply to the chosen format (e.g. sheet_name for CSV,
+    column_types for anything but Parquet and Arrow) are ignored.
+    """
+    suffix = Path(output_file).suffix.lower()
+    common: Dict[str, Any] = dict(
+        max_sample=max_sample,
+        pre_headers=pre_headers,
+        header_order=header_order,
+        include_prefixes=include_prefixes,
+        headers=headers,
+    )
+    if suffix == ".csv":
+        write_csv(rows, output_file, **common)
+    elif suffix == ".xlsx":
+        write_xlsx(rows, output_file, sheet_name=sheet_name, engine=xlsx_engine, **common)
+    elif suffix == ".parquet":
+        write_parquet(rows, output_file, batch_rows=batch_rows, column_types=column_types, **common)
+    elif suffix in COLUMNAR_SUFFIXES:
+        write_arrow(rows, output_file, batch_rows=batch_rows, column_types=column_types, **common)
+    else:
+        raise ValueError(f"Unsupported output format {suffix!r} (expected one of {', '.join(sorted(TABLE_SUFFIXES))})")
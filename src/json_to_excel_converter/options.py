@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import typer
+
+from .flatten import ExplodeOverflow
+from .io_json import NumberMode, ParserMode, select_backend
+from .io_ndjson import InputFormat
+from .io_split import parse_size
+from .io_table import XlsxEngine
+from .where import WhereSyntaxError, compile_where
+
+
+@dataclass(frozen=True)
+class CommonOptions:
+    """Parsing options shared by convert and convert-batch, validated and normalized."""
+
+    number_mode: str
+    parser: str
+    memory_limit: int
+    input_format: str
+    explode_overflow: str
+    xlsx_engine: str
+    backend_name: str
+
+    def read_options(self, root: Optional[str], allow_object_values: bool) -> Dict[str, Any]:
+        """iter_items' keyword arguments (see pipeline.iter_source_rows)."""
+        return dict(
+            root_path=root,
+            allow_object_values=allow_object_values,
+            number_mode=self.number_mode,
+            backend=self.backend_name,
+            parser=self.parser,
+            memory_limit=self.memory_limit,
+        )
+
+
+def check_common_options(
+    *,
+    root: Optional[str],
+    prune_while_parsing: bool,
+    number_mode: str,
+    parser: str,
+    memory_parse_limit: str,
+    input_format: str,
+    explode_overflow: str,
+    xlsx_engine: str,
+    where: Optional[str],
+    ijson_backend: Optional[str],
+) -> CommonOptions:
+    """Validate the options both commands take; raises typer.BadParameter."""
+    xlsx_engine = xlsx_engine.lower()
+    if xlsx_engine not in {XlsxEngine.OPENPYXL, XlsxEngine.STREAM}:
+        raise typer.BadParameter("--xlsx-engine must be 'openpyxl' or 'stream'")
+    number_mode = number_mode.lower()
+    if number_mode not in {NumberMode.DECIMAL, NumberMode.FLOAT, NumberMode.STRING}:
+        raise typer.BadParameter("--number-mode must be 'decimal', 'float' or 'string'")
+    parser = parser.lower()
+    if parser not in {ParserMode.AUTO, ParserMode.STREAM, ParserMode.MEMORY, ParserMode.SPLIT}:
+        raise typer.BadParameter("--parser must be 'auto', 'stream', 'memory' or 'split'")
+    if parser == ParserMode.SPLIT and root:
+        raise typer.BadParameter("--parser split reads the elements of a top-level array; --root does not apply", param_hint="--parser")
+    if parser == ParserMode.SPLIT and prune_while_parsing:
+        raise typer.BadParameter("--parser split parses whole elements; --prune-while-parsing does not apply", param_hint="--parser")
+    try:
+        memory_limit = parse_size(memory_parse_limit)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint="--memory-parse-limit") from exc
+    input_format = input_format.lower()
+    if input_format not in {InputFormat.AUTO, InputFormat.JSON, InputFormat.NDJSON}:
+        raise typer.BadParameter("--input-format must be 'auto', 'json' or 'ndjson'")
+    explode_overflow = explode_overflow.lower()
+    if explode_overflow not in {ExplodeOverflow.ERROR, ExplodeOverflow.TRUNCATE}:
+        raise typer.BadParameter("--explode-overflow must be 'error' or 'truncate'")
+    if where is not None:
+        try:
+            compile_where(where)
+        except WhereSyntaxError as exc:
+            raise typer.BadParameter(str(exc), param_hint="--where") from exc
+    try:
+        backend_name, _backend = select_backend(ijson_backend)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint="--ijson-backend") from exc
+    return CommonOptions(
+        number_mode=number_mode,
+        parser=parser,
+        memory_limit=memory_limit,
+        input_format=input_format,
+        explode_overflow=explode_overflow,
+        xlsx_engine=xlsx_engine,
+        backend_name=backend_name,
+    )
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Deque, Iterable, Iterator, List, TypeVar
+
+from .stats import StageStalls
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ProcessPoolExecutor
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Items per batch handed between threaded stages, and batches a queue may hold
+DEFAULT_STAGE_BATCH = 256
+DEFAULT_STAGE_QUEUE_BATCHES = 8
+
+_DONE = object()
+
+
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Create a process pool using the "spawn" start method.
+
+    Forking is avoided on purpose: the CLI runs a rich progress thread, and
+    forking a multi-threaded process can deadlock the children.
+    """
+    # Imported on first use: single-process runs never load multiprocessing
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def ordered_map(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    *,
+    workers: int,
+    prefetch: int = 2,
+) -> Iterator[R]:
+    """
+    Map fn over items on a process pool, yielding results in input order.
+
+    Unlike Executor.map, items are submitted lazily: at most workers * prefetch
+    tasks are in flight, so a huge input stream never piles up in memory.
+    """
+    pool = process_pool(workers)
+    pending: Deque[Future[R]] = deque()
+    window = max(1, workers * prefetch)
+    try:
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def unordered_map(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    *,
+    workers: int,
+    prefetch: int = 2,
+) -> Iterator[R]:
+    """
+    Like ordered_map, but yield results as soon as they complete.
+
+    A slow item does not hold back the results (or the submission) of the others.
+    """
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    pool = process_pool(workers)
+    pending: set[Future[R]] = set()
+    window = max(1, workers * prefetch)
+    try:
+        for item in items:
+            pending.add(pool.submit(fn, item))
+            if len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def threaded(
+    items: Iterable[T],
+    stalls: StageStalls,
+    producer: str,
+    consumer: str,
+    *,
+    batch_size: int = DEFAULT_STAGE_BATCH,
+    max_batches: int = DEFAULT_STAGE_QUEUE_BATCHES,
+) -> Iterator[T]:
+    """
+    Iterate items on a background thread (the producer stage), handing them
+    to the consumer stage (whoever iterates the result) in batches through a
+    bounded queue.
+
+    The queue bound is the backpressure: at most max_batches batches wait, so
+    a fast producer blocks instead of piling items up in memory. Time spent
+    waiting in put is charged to stalls.blocked[producer], time waiting in
+    get to stalls.starved[consumer]. An exception in the producer is
+    re-raised in the consumer; closing the result stops the producer and
+    closes items.
+    """
+    handoff: "queue.Queue[object]" = queue.Queue(maxsize=max_batches)
+    stop = threading.Event()
+
+    def put(item: object) -> bool:
+        start = time.perf_counter()
+        try:
+            while not stop.is_set():
+                try:
+                    handoff.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            stalls.blocked[producer] += time.perf_counter() - start
+
+    def produce() -> None:
+        batch: List[T] = []
+        try:
+            for item in items:
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    stalls.items[producer] += len(batch)
+                    if not put(batch):
+                        return
+                    batch = []
+            stalls.items[producer] += len(batch)
+            if batch and not put(batch):
+                return
+            put(_DONE)
+        except BaseException as exc:  # re-raised in the consumer
+            put(exc)
+        finally:
+            close = getattr(items, "close", None)
+            if close is not None:
+                close()
+            stalls.done(producer)
+
+    thread = threading.Thread(target=produce, name=f"stage-{producer}", daemon=True)
+    thread.start()
+    try:
+        while True:
+            start = time.perf_counter()
+            batch = handoff.get()
+            stalls.starved[consumer] += time.perf_counter() - start
+            if batch is _DONE:
+                return
+            if isinstance(batch, BaseException):
+                raise batch
+            yield from batch  # type: ignore[misc]
+    finally:
+        stop.set()
+        thread.join()
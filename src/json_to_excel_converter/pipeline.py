@@ -0,0 +1,372 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from itertools import batched, chain, islice
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .filters import ColumnFilter, RecordProjection
+from .flatten import ExplodeOverflow, ListPolicy, iter_flatten_record
+from .io_array import iter_array_chunks, iter_array_items, parse_array_chunk
+from .io_json import ByteCounter, NumberMode, ParserMode, iter_items
+from .io_ndjson import Chunk, InputFormat, iter_chunks, iter_ndjson, parse_chunk
+from .parallel import ordered_map, threaded
+from .stats import StageClock, StageStalls
+from .where import compile_where
+
+# Records per task sent to worker processes
+DEFAULT_BATCH_SIZE = 500
+
+
+@dataclass(frozen=True)
+class RowOptions:
+    """Record filter, flattening and column-filter settings applied to every record."""
+
+    sep: str = "."
+    list_policy: str = ListPolicy.JOIN
+    list_separator: str = ";"
+    explode: tuple[str, ...] = ()
+    includes: tuple[str, ...] = ()
+    excludes: tuple[str, ...] = ()
+    pinned_first_columns: tuple[str, ...] = ()
+    max_explode_rows: Optional[int] = None
+    explode_overflow: str = ExplodeOverflow.ERROR
+    where: Optional[str] = None
+    # --number-mode the records were parsed with: --where reads numbers from strings in "string" mode
+    number_mode: str = NumberMode.DECIMAL
+
+
+@lru_cache(maxsize=8)
+def compile_filter(options: RowOptions) -> ColumnFilter:
+    """Compile (once per options, per process) the column filter for options."""
+    return ColumnFilter(options.includes, options.excludes, options.pinned_first_columns)
+
+
+@lru_cache(maxsize=8)
+def compile_projection(options: RowOptions) -> Optional[RecordProjection]:
+    """
+    The parse-time projection matching options' column filter, or None when
+    nothing can be pruned (no include/exclude, or a separator other than ".",
+    with which columns are filtered only after flattening).
+    """
+    column_filter = compile_filter(options)
+    if not column_filter.active or options.sep != ".":
+        return None
+    # Fields tested by --where are read from the record before it is flattened
+    where_paths = compile_where(options.where).paths if options.where is not None else ()
+    return RecordProjection(column_filter, options.explode, where_paths)
+
+
+# Rows of a record rejected by --where (compared by identity, see MatchCount)
+_REJECTED: Iterator[Dict[str, Any]] = iter(())
+
+
+def iter_transform_record(record: Any, options: RowOptions) -> Iterator[Dict[str, Any]]:
+    """
+    Flatten one record lazily, applying the include/exclude column filters and
+    the explode limit. A record not matching options.where has no rows: it is
+    tested before anything is flattened.
+    """
+    if options.where is not None and not compile_where(options.where, options.number_mode == NumberMode.STRING)(record):
+        return _REJECTED
+    return iter_flatten_record(
+        record,
+        sep=options.sep,
+        list_policy=options.list_policy,
+        list_separator=options.list_separator,
+        explode_paths=options.explode,
+        column_filter=compile_filter(options),
+        max_rows=options.max_explode_rows,
+        overflow=options.explode_overflow,
+    )
+
+
+def transform_record(record: Any, options: RowOptions) -> List[Dict[str, Any]]:
+    """The rows of one record as a list (see iter_transform_record)."""
+    return list(iter_transform_record(record, options))
+
+
+def _transform_batch(records: Iterable[Any], options: RowOptions) -> List[List[Dict[str, Any]]]:
+    return [transform_record(rec, options) for rec in records]
+
+
+def iter_record_rows(
+    records: Iterable[Any],
+    options: RowOptions,
+    *,
+    workers: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[Iterable[Dict[str, Any]]]:
+    """
+    Yield the rows of each record, one iterable per record, in input order.
+
+    In-process, each record's rows are generated lazily, so an exploded record
+    never has all its rows in memory. With workers > 1, records are cut into
+    batches in this process and transformed on a process pool into lists;
+    results are re-sequenced so the output is identical to the
+    single-process run.
+    """
+    if workers <= 1:
+        for rec in records:
+            yield iter_transform_record(rec, options)
+        return
+
+    batches = batched(records, batch_size)
+    for result in ordered_map(partial(_transform_batch, options=options), batches, workers=workers):
+        yield from result
+
+
+def _transform_chunk(
+    chunk: Chunk, number_mode: str, options: RowOptions, parse: Callable[[Chunk, str], List[Any]] = parse_chunk
+) -> List[List[Dict[str, Any]]]:
+    return [transform_record(rec, options) for rec in parse(chunk, number_mode)]
+
+
+def iter_ndjson_record_rows(
+    source: str | Path | BinaryIO,
+    options: RowOptions,
+    *,
+    number_mode: str,
+    workers: int = 1,
+    counter: Optional[ByteCounter] = None,
+) -> Iterator[Iterable[Dict[str, Any]]]:
+    """
+    Like iter_record_rows, for NDJSON input (see io_ndjson).
+
+    With workers > 1, each worker decodes and flattens whole line-aligned
+    chunks, so records never cross a process boundary: only the chunk's byte
+    range goes in and the flattened rows come back.
+    """
+    if workers <= 1:
+        yield from iter_record_rows(iter_ndjson(source, number_mode, counter=counter), options)
+        return
+
+    task = partial(_transform_chunk, number_mode=number_mode, options=options)
+    for result in ordered_map(task, iter_chunks(source, counter=counter), workers=workers):
+        yield from result
+
+
+def iter_array_record_rows(
+    source: str | Path | BinaryIO,
+    options: RowOptions,
+    *,
+    number_mode: str,
+    workers: int = 1,
+    counter: Optional[ByteCounter] = None,
+) -> Iterator[Iterable[Dict[str, Any]]]:
+    """
+    Like iter_ndjson_record_rows, for the top-level array of a JSON file cut
+    into element-aligned chunks (see io_array).
+    """
+    if workers <= 1:
+        yield from iter_record_rows(iter_array_items(source, number_mode, counter=counter), options)
+        return
+
+    task = partial(_transform_chunk, number_mode=number_mode, options=options, parse=parse_array_chunk)
+    for result in ordered_map(task, iter_array_chunks(source, counter=counter), workers=workers):
+        yield from result
+
+
+def iter_rows(
+    records: Iterable[Any],
+    options: RowOptions,
+    *,
+    workers: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """Flattened, filtered rows for a stream of records."""
+    for rows in iter_record_rows(records, options, workers=workers, batch_size=batch_size):
+        yield from rows
+
+
+class RecordCursor:
+    """
+    Number of records whose rows have been started (including skipped ones).
+
+    Updated by iter_source_rows as the rows of each record begin, after any
+    worker re-sequencing; when it changes between two rows, every earlier
+    record has been fully consumed (see checkpoint.write_csv_checkpointed).
+    """
+
+    __slots__ = ("records",)
+
+    def __init__(self) -> None:
+        self.records = 0
+
+
+class MatchCount:
+    """Records tested against RowOptions.where by iter_source_rows, and how many matched."""
+
+    __slots__ = ("scanned", "kept")
+
+    def __init__(self) -> None:
+        self.scanned = 0
+        self.kept = 0
+
+
+def _count_matches(
+    record_rows: Iterable[Iterable[Dict[str, Any]]], matches: MatchCount
+) -> Iterator[Iterable[Dict[str, Any]]]:
+    # Every matching record has at least one row; workers return rejected ones as []
+    for rows in record_rows:
+        matches.scanned += 1
+        if rows is not _REJECTED and rows != []:
+            matches.kept += 1
+        yield rows
+
+
+def _track(record_rows: Iterable[Iterable[Dict[str, Any]]], cursor: RecordCursor) -> Iterator[Iterable[Dict[str, Any]]]:
+    for rows in record_rows:
+        cursor.records += 1
+        yield rows
+
+
+# Rows per piece handed between pipelined stages (see _row_pieces)
+_ROWS_PER_PIECE = 32
+
+# A piece: some rows of one record, and whether they are its last
+_Piece = tuple[List[Dict[str, Any]], bool]
+
+
+def _row_pieces(record_rows: Iterable[Iterable[Dict[str, Any]]]) -> Iterator[_Piece]:
+    """
+    Cut each record's rows into pieces of at most _ROWS_PER_PIECE rows. The
+    last piece of a record is flagged and may be empty; a record rejected by
+    --where (or without rows) is a single empty last piece.
+    """
+    for rows in record_rows:
+        rows = iter(rows)
+        while len(piece := list(islice(rows, _ROWS_PER_PIECE))) == _ROWS_PER_PIECE:
+            yield piece, False
+        yield piece, True
+
+
+def _join_pieces(pieces: Iterable[_Piece]) -> Iterator[Iterable[Dict[str, Any]]]:
+    """The per-record rows cut by _row_pieces, each read lazily from pieces."""
+    pieces = iter(pieces)
+
+    def rest() -> Iterator[Dict[str, Any]]:
+        for piece, last in pieces:
+            yield from piece
+            if last:
+                return
+
+    for first, last in pieces:
+        if last:
+            # [] for a rejected record, as _count_matches expects
+            yield first
+            continue
+        remaining = rest()
+        yield chain(first, remaining)
+        # Skip whatever the consumer left of this record
+        for _row in remaining:
+            pass
+
+
+def iter_source_records(
+    source: str | Path | BinaryIO,
+    input_format: str,
+    read_options: Dict[str, Any],
+    counter: Optional[ByteCounter] = None,
+    projection: Optional[RecordProjection] = None,
+) -> Iterator[Any]:
+    """
+    Parsed records of a JSON or NDJSON input (input_format must already be resolved).
+
+    projection applies to streamed JSON input only: NDJSON lines and split
+    arrays (read_options["parser"] == ParserMode.SPLIT, see io_array) are
+    decoded whole.
+    """
+    if input_format == InputFormat.NDJSON:
+        return iter_ndjson(source, read_options["number_mode"], counter=counter)
+    if read_options.get("parser") == ParserMode.SPLIT:
+        return iter_array_items(source, read_options["number_mode"], counter=counter)
+    return iter_items(source, **read_options, counter=counter, projection=projection)
+
+
+def iter_source_rows(
+    source: str | Path | BinaryIO,
+    input_format: str,
+    read_options: Dict[str, Any],
+    options: RowOptions,
+    workers: int = 1,
+    clock: Optional[StageClock] = None,
+    counter: Optional[ByteCounter] = None,
+    skip_records: int = 0,
+    cursor: Optional[RecordCursor] = None,
+    prune: bool = False,
+    matches: Optional[MatchCount] = None,
+    stalls: Optional[StageStalls] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Rows of a JSON or NDJSON input (input_format must already be resolved).
+
+    read_options are iter_items' keyword arguments; NDJSON input only uses
+    its number_mode. With a clock, time is charged to the "read" (parsing)
+    and "transform" (flattening and filtering) stages; the items counted for
+    the first stage are records. A counter tracks the bytes read from path
+    sources (streams are counted by whoever opened them, see open_input).
+
+    skip_records drops the first records before they are flattened (parsed
+    only, except for chunked input with workers, where chunks are processed whole);
+    cursor follows the records as their rows are consumed.
+
+    prune builds JSON records from the parse events without the subtrees the
+    column filter drops (see compile_projection and io_json.iter_items): the
+    rows are the same, but those subtrees are never materialized.
+
+    Records not matching options.where are dropped before they are
+    flattened; matches counts the records tested and kept.
+
+    NDJSON input and split JSON arrays (ParserMode.SPLIT) are cut into byte
+    ranges; with workers, each range is parsed and flattened by one worker.
+
+    With stalls, parsing ("read") and flattening ("transform") run on their
+    own threads, handing batches of records and of row pieces (a few rows
+    of one record, so exploded records stay lazy) on through bounded queues (see parallel.threaded), while the caller's
+    thread consumes the rows ("write"); stalls records how long each stage
+    waited. The clock times a single thread, so it must then be None.
+    """
+    if stalls is not None and clock is not None:
+        raise ValueError("Pass either a clock or stalls, not both")
+    split_array = input_format == InputFormat.JSON and read_options.get("parser") == ParserMode.SPLIT
+    chunked = workers > 1 and (input_format == InputFormat.NDJSON or split_array)
+    if chunked:
+        iter_chunk_record_rows = iter_array_record_rows if split_array else iter_ndjson_record_rows
+        # Workers parse and flatten whole chunks: the stages cannot be told apart here
+        record_rows: Iterable[Iterable[Dict[str, Any]]] = iter_chunk_record_rows(
+            source, options, number_mode=read_options["number_mode"], workers=workers, counter=counter
+        )
+        if skip_records:
+            record_rows = islice(record_rows, skip_records, None)
+        if clock is not None:
+            record_rows = clock.wrap("read+transform", record_rows)
+        if stalls is not None:
+            record_rows = threaded(record_rows, stalls, "read+transform", "write")
+    else:
+        projection = compile_projection(options) if prune else None
+        records = iter_source_records(source, input_format, read_options, counter, projection)
+        if skip_records:
+            records = islice(records, skip_records, None)
+        if clock is not None:
+            records = clock.wrap("read", records)
+        if stalls is not None:
+            records = threaded(records, stalls, "read", "transform")
+            # Handed over in pieces of a few rows and regrouped per record, so
+            # the cursor and match count below still follow what the writer
+            # has consumed, without holding an exploded record's rows at once
+            pieces = _row_pieces(iter_record_rows(records, options, workers=workers))
+            record_rows = _join_pieces(threaded(pieces, stalls, "transform", "write"))
+        else:
+            record_rows = iter_record_rows(records, options, workers=workers)
+
+    if matches is not None:
+        record_rows = _count_matches(record_rows, matches)
+    if cursor is not None:
+        cursor.records = skip_records
+        record_rows = _track(record_rows, cursor)
+    rows = chain.from_iterable(record_rows)
+    if clock is None or chunked:
+        return rows
+    return clock.wrap("transform", rows)
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from .io_json import ByteCounter
+
+# Seconds between progress refreshes
+REFRESH_INTERVAL = 0.25
+
+
+@contextmanager
+def byte_progress(
+    console: Any,
+    description: str,
+    counter: ByteCounter,
+    total: Optional[int],
+    interval: float = REFRESH_INTERVAL,
+) -> Iterator[None]:
+    """
+    Show a transient progress bar over the bytes of an input while the body runs.
+
+    The bar (percentage, MB read, MB/s and ETA; no percentage or ETA when
+    total is unknown, e.g. stdin) follows counter, which the reading layer
+    updates once per buffer. A background thread polls it every interval
+    seconds, so nothing is done per row.
+    """
+    from rich.progress import (
+        BarColumn,
+        DownloadColumn,
+        Progress,
+        TaskProgressColumn,
+        TextColumn,
+        TimeRemainingColumn,
+        TransferSpeedColumn,
+    )
+
+    progress = Progress(
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TaskProgressColumn(),
+        DownloadColumn(),
+        TransferSpeedColumn(),
+        TimeRemainingColumn(),
+        console=console,
+        transient=True,
+        auto_refresh=False,
+    )
+    stop = threading.Event()
+    with progress:
+        task = progress.add_task(description, total=total)
+
+        def poll() -> None:
+            while not stop.wait(interval):
+                progress.update(task, completed=counter.bytes_read)
+                progress.refresh()
+
+        progress.refresh()
+        thread = threading.Thread(target=poll, name="progress", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
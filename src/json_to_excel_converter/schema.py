@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping
+
+import orjson
+
+
+SCHEMA_VERSION = 1
+
+
+def _type_name(value: object) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, (float, Decimal)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    return "json"
+
+
+def discover_schema(rows: Iterable[Mapping[str, object]]) -> Dict[str, Dict[str, object]]:
+    """
+    Scan every row once and index its columns without keeping any row around.
+
+    Returns a mapping column -> {"first_seen": row index, "type": type name}
+    in first-seen order. The type is the one of the first non-null value; a
+    column that is only ever null keeps type "null".
+    """
+    columns: Dict[str, Dict[str, object]] = {}
+    untyped: set[str] = set()
+
+    for idx, row in enumerate(rows):
+        for key, value in row.items():
+            entry = columns.get(key)
+            if entry is None:
+                columns[key] = {"first_seen": idx, "type": _type_name(value)}
+                if value is None:
+                    untyped.add(key)
+            elif key in untyped and value is not None:
+                entry["type"] = _type_name(value)
+                untyped.discard(key)
+
+    return columns
+
+
+def save_schema(columns: Mapping[str, Mapping[str, object]], schema_file: str | Path) -> None:
+    """Persist a schema index as compact JSON."""
+    path = Path(schema_file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {"version": SCHEMA_VERSION, "columns": columns}
+    path.write_bytes(orjson.dumps(payload))
+
+
+def load_schema(schema_file: str | Path) -> Dict[str, Dict[str, object]]:
+    """Load a schema index written by save_schema."""
+    path = Path(schema_file)
+    try:
+        payload = orjson.loads(path.read_bytes())
+    except orjson.JSONDecodeError as exc:
+        raise ValueError(f"Invalid schema index {path}: {exc}") from exc
+
+    if not isinstance(payload, dict) or payload.get("version") != SCHEMA_VERSION:
+        raise ValueError(f"Unsupported schema index {path}: expected version {SCHEMA_VERSION}")
+    columns = payload.get("columns")
+    if not isinstance(columns, dict):
+        raise ValueError(f"Invalid schema index {path}: missing 'columns' mapping")
+    return columns
+
+
+def schema_headers(columns: Mapping[str, Mapping[str, object]]) -> List[str]:
+    """Column names in first-seen order."""
+    return sorted(columns, key=lambda c: columns[c].get("first_seen", 0))  # type: ignore[arg-type, return-value]
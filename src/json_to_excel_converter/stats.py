@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+
+class StageClock:
+    """
+    Exclusive wall time per stage of a chain of generators.
+
+    Time spent inside next() of a wrapped iterator is charged to its stage,
+    minus the time its upstream stages spent; whatever is not inside a
+    wrapped stage is charged to the root stage (the consumer, e.g. the writer).
+    Stages are listed in the order they were first entered, root first.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.items: Dict[str, int] = defaultdict(int)
+        self.seconds[root] = 0.0
+        self.root = root
+        self._stack = [root]
+        self._since = time.perf_counter()
+
+    def _switch(self, push: str | None) -> None:
+        now = time.perf_counter()
+        self.seconds[self._stack[-1]] += now - self._since
+        self._since = now
+        if push is None:
+            self._stack.pop()
+        else:
+            self._stack.append(push)
+
+    def call(self, stage: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Call fn, charging its time (minus wrapped upstream stages) to stage."""
+        self._switch(stage)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._switch(None)
+
+    def wrap(self, stage: str, iterable: Iterable[Any]) -> Iterator[Any]:
+        """Yield from iterable, charging the time spent producing items to stage."""
+        it = iter(iterable)
+        while True:
+            self._switch(stage)
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            finally:
+                self._switch(None)
+            self.items[stage] += 1
+            yield item
+
+    def stop(self) -> None:
+        """Close the root stage; call once the consumer is done."""
+        self._switch(None)
+
+
+class StageStalls:
+    """
+    Wall time and stalls of pipeline stages running on separate threads (see parallel.threaded).
+
+    starved is the time a stage waited for input from the stage before it,
+    blocked the time it waited for room in the queue to the stage after it;
+    the rest of its wall time is its own work (busy). The bottleneck is the
+    stage with the most busy time: the others end up waiting on it. Each
+    counter is only written by the thread running its stage.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.wall: Dict[str, float] = {}
+        self.starved: Dict[str, float] = defaultdict(float)
+        self.blocked: Dict[str, float] = defaultdict(float)
+        self.items: Dict[str, int] = defaultdict(int)
+
+    def done(self, stage: str) -> None:
+        """Record that stage has finished (its wall time runs from the pipeline's start)."""
+        self.wall[stage] = time.perf_counter() - self.started
+
+    def busy(self, stage: str) -> float:
+        return max(self.wall.get(stage, 0.0) - self.starved[stage] - self.blocked[stage], 0.0)
+
+    def bottleneck(self) -> Optional[str]:
+        """The finished stage that spent the most time on its own work."""
+        return max(self.wall, key=self.busy, default=None)
+
+    def summary(self) -> str:
+        """One line per run: each stage's waits, then the bottleneck."""
+        parts = [
+            f"{stage} {self.busy(stage):.2f}s busy, {self.starved[stage]:.2f}s waiting for input, "
+            f"{self.blocked[stage]:.2f}s waiting for room"
+            for stage in self.wall
+        ]
+        return "; ".join(parts) + f"; bottleneck: {self.bottleneck()}"
+
+
+def peak_rss_mb() -> Dict[str, Optional[float]]:
+    """Peak resident memory of this process and of its (finished) children, in MB."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return {"process": None, "children": None}
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    scale = 1 / 1e6 if sys.platform == "darwin" else 1024 / 1e6
+    return {
+        "process": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale, 1),
+    }
+
+
+def build_report(
+    clock: StageClock,
+    *,
+    records: int,
+    rows: int,
+    input_bytes: Optional[int],
+    seconds: float,
+    records_kept: Optional[int] = None,
+    stalls: Optional[StageStalls] = None,
+) -> Dict[str, Any]:
+    """
+    Summary of one conversion, as written by --stats-json; records_kept is set with --where.
+
+    With stalls (a pipelined run), the clock only timed the main thread
+    outside the pipeline: its root stage is replaced by the pipeline's stages,
+    which also report the seconds they were starved and blocked.
+    """
+    seconds = max(seconds, 1e-9)
+    stages: Dict[str, Dict[str, Any]] = {
+        stage: {"seconds": round(spent, 3), "share": round(spent / seconds, 3), "items": clock.items.get(stage)}
+        for stage, spent in clock.seconds.items()
+        if stalls is None or stage != clock.root
+    }
+    if stalls is not None:
+        for stage in stalls.wall:
+            busy = stalls.busy(stage)
+            stages[stage] = {
+                "seconds": round(busy, 3),
+                "share": round(busy / seconds, 3),
+                "items": stalls.items.get(stage),
+                "starved": round(stalls.starved[stage], 3),
+                "blocked": round(stalls.blocked[stage], 3),
+            }
+    # Fan-out is per record that produced rows
+    flattened = records if records_kept is None else records_kept
+    return {
+        "seconds": round(seconds, 3),
+        "records_in": records,
+        "records_kept": records_kept,
+        "rows_out": rows,
+        "fan_out": round(rows / flattened, 3) if flattened else None,
+        "input_bytes": input_bytes,
+        "rows_per_s": round(rows / seconds),
+        "mb_per_s": round(input_bytes / 1e6 / seconds, 2) if input_bytes is not None else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": stages,
+        "bottleneck": stalls.bottleneck() if stalls is not None else None,
+    }
+
+
+def print_report(console: Any, report: Dict[str, Any]) -> None:
+    """Render a report as rich tables."""
+    from rich.table import Table
+
+    pipelined = report.get("bottleneck") is not None
+    title = "Stages (busy time on their own threads)" if pipelined else "Stages (exclusive wall time)"
+    stages = Table(title=title, title_justify="left")
+    stages.add_column("stage")
+    stages.add_column("seconds", justify="right")
+    stages.add_column("share", justify="right")
+    stages.add_column("items", justify="right")
+    if pipelined:
+        stages.add_column("waiting for input", justify="right")
+        stages.add_column("waiting for room", justify="right")
+    for stage, entry in report["stages"].items():
+        items = entry["items"]
+        cells = [stage, f"{entry['seconds']:.3f}", f"{entry['share']:.0%}", "" if items is None else f"{items:,}"]
+        if pipelined:
+            cells += [f"{entry['starved']:.3f}", f"{entry['blocked']:.3f}"] if "starved" in entry else ["", ""]
+        stages.add_row(*cells)
+    console.print(stages)
+
+    totals = Table(show_header=False, title="Totals", title_justify="left")
+    totals.add_column("metric")
+    totals.add_column("value", justify="right")
+    totals.add_row("wall time", f"{report['seconds']:.3f} s")
+    if pipelined:
+        totals.add_row("bottleneck", report["bottleneck"])
+    totals.add_row("records in", f"{report['records_in']:,}")
+    if report["records_kept"] is not None:
+        totals.add_row("records kept (--where)", f"{report['records_kept']:,}")
+    totals.add_row("rows out", f"{report['rows_out']:,}")
+    if report["fan_out"] is not None:
+        totals.add_row("fan-out (rows/record)", f"{report['fan_out']:.2f}")
+    totals.add_row("rows/s", f"{report['rows_per_s']:,}")
+    if report["input_bytes"] is not None:
+        totals.add_row("input read", f"{report['input_bytes'] / 1e6:,.1f} MB")
+        totals.add_row("MB/s", f"{report['mb_per_s']:,.1f}")
+    for who, mb in report["peak_rss_mb"].items():
+        if mb:
+            totals.add_row(f"peak RSS ({who})", f"{mb:,.1f} MB")
+    console.print(totals)
+
+
+def write_report(report: Dict[str, Any], path: str | Path) -> None:
+    import orjson
+
+    Path(path).write_bytes(orjson.dumps(report, option=orjson.OPT_INDENT_2))
@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import re
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Tuple
+
+_MISSING = object()
+_NUMBER_TYPES = (int, float, Decimal)
+_KEYWORDS = frozenset({"and", "or", "not", "in", "exists", "true", "false", "null"})
+_COMPARISONS = frozenset({"==", "!=", "<", "<=", ">", ">="})
+
+_TOKEN = re.compile(
+    r"""
+    \s*(?:
+        (?P<number>-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)
+      | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<op>==|!=|<=|>=|<|>|\(|\)|\[|\]|,)
+      | (?P<name>(?:[A-Za-z_$@][\w$@-]*|`[^`]+`)(?:\.(?:[\w$@-]+|`[^`]+`))*)
+    )
+    """,
+    re.VERBOSE,
+)
+
+Record = Any
+Test = Callable[[Record], bool]
+
+
+class WhereSyntaxError(ValueError):
+    """A --where expression that cannot be parsed."""
+
+
+class _Literal:
+    """A literal compared with record values; numbers keep an exact and a float form."""
+
+    __slots__ = ("value", "as_float")
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+        # Floats (--number-mode float) are compared with the literal's float, others exactly
+        self.as_float = float(value) if isinstance(value, Decimal) else value
+
+    def is_number(self) -> bool:
+        return isinstance(self.value, _NUMBER_TYPES) and not isinstance(self.value, bool)
+
+
+def _getter(segments: Tuple[str, ...]) -> Callable[[Record], Any]:
+    """Value at a key path of a record, or _MISSING; non-object records read as {"value": record}."""
+    if len(segments) == 1:
+        key = segments[0]
+
+        def get_one(record: Record) -> Any:
+            if record.__class__ is not dict:
+                return record if key == "value" else _MISSING
+            return record.get(key, _MISSING)
+
+        return get_one
+
+    def get(record: Record) -> Any:
+        if record.__class__ is not dict:
+            return _MISSING
+        value = record
+        for key in segments:
+            if value.__class__ is not dict:
+                return _MISSING
+            value = value.get(key, _MISSING)
+            if value is _MISSING:
+                return _MISSING
+        return value
+
+    return get
+
+
+def _number_from_string(text: str) -> Any:
+    """The number a numeric string spells (--number-mode string), or _MISSING."""
+    try:
+        number = Decimal(text)
+    except InvalidOperation:
+        return _MISSING
+    return number if number.is_finite() else _MISSING
+
+
+def _equals(get: Callable[[Record], Any], literal: _Literal, numeric_strings: bool) -> Test:
+    value = literal.value
+    if value is None:
+        # A missing path compares like null
+        return lambda record: (x := get(record)) is None or x is _MISSING
+    if isinstance(value, bool):
+        return lambda record: get(record) is value
+    if isinstance(value, str):
+        return lambda record: get(record) == value
+    exact, as_float = value, literal.as_float
+
+    def number_equals(record: Record) -> bool:
+        x = get(record)
+        if x.__class__ is float:
+            return x == as_float
+        if x.__class__ is str:
+            return numeric_strings and _number_from_string(x) == exact
+        return x.__class__ is not bool and x == exact
+
+    return number_equals
+
+
+def _ordered(get: Callable[[Record], Any], op: str, literal: _Literal, numeric_strings: bool) -> Test:
+    compare = {
+        "<": lambda a, b: a < b,
+        "<=": lambda a, b: a <= b,
+        ">": lambda a, b: a > b,
+        ">=": lambda a, b: a >= b,
+    }[op]
+    value = literal.value
+    if isinstance(value, str):
+        return lambda record: (x := get(record)).__class__ is str and compare(x, value)
+    exact, as_float = value, literal.as_float
+
+    def number_compare(record: Record) -> bool:
+        x = get(record)
+        if x.__class__ is float:
+            return compare(x, as_float)
+        if x.__class__ is str and numeric_strings:
+            x = _number_from_string(x)
+        return isinstance(x, _NUMBER_TYPES) and x.__class__ is not bool and compare(x, exact)
+
+    return number_compare
+
+
+def _member(get: Callable[[Record], Any], literals: List[_Literal], numeric_strings: bool) -> Test:
+    strings = frozenset(lit.value for lit in literals if isinstance(lit.value, str))
+    # Equal int/float/Decimal values hash alike; floats also get the literal's float form
+    numbers = frozenset(lit.value for lit in literals if lit.is_number())
+    floats = frozenset(lit.as_float for lit in literals if lit.is_number())
+    flags = frozenset(lit.value for lit in literals if isinstance(lit.value, bool))
+    has_null = any(lit.value is None for lit in literals)
+
+    def member(record: Record) -> bool:
+        x = get(record)
+        cls = x.__class__
+        if cls is str:
+            return x in strings or (numeric_strings and bool(numbers) and _number_from_string(x) in numbers)
+        if cls is bool:
+            return x in flags
+        if cls is float:
+            return x in floats
+        if cls is int or cls is Decimal:
+            return x in numbers
+        if x is None or x is _MISSING:
+            return has_null
+        return False
+
+    return member
+
+
+def _fold(tests: List[Test], combine: Callable[[Test, Test], Test]) -> Test:
+    """Combine tests left to right into one closure (short-circuiting, no per-record loop)."""
+    test = tests[0]
+    for other in tests[1:]:
+        test = combine(test, other)
+    return test
+
+
+class _Parser:
+    """Recursive descent over the token list, producing a test closure."""
+
+    def __init__(self, text: str, numeric_strings: bool = False) -> None:
+        self.text = text
+        self.numeric_strings = numeric_strings
+        self.tokens: List[Tuple[str, str]] = []
+        self.paths: List[str] = []
+        position = 0
+        text = text.rstrip()
+        while position < len(text):
+            match = _TOKEN.match(text, position)
+            if match is None or match.end() == position:
+                raise WhereSyntaxError(f"Unexpected character {text[position:].lstrip()[:1]!r} in --where {self.text!r}")
+            kind = match.lastgroup
+            token = match.group(kind)  # type: ignore[arg-type]
+            if kind == "name" and token in _KEYWORDS:
+                kind = "keyword"
+            self.tokens.append((kind, token))  # type: ignore[arg-type]
+            position = match.end()
+        self.index = 0
+
+    def _error(self, expected: str) -> WhereSyntaxError:
+        found = repr(self.tokens[self.index][1]) if self.index < len(self.tokens) else "end of expression"
+        return WhereSyntaxError(f"Expected {expected}, found {found} in --where {self.text!r}")
+
+    def _peek(self) -> Tuple[Optional[str], Optional[str]]:
+        return self.tokens[self.index] if self.index < len(self.tokens) else (None, None)
+
+    def _accept(self, token: str) -> bool:
+        if self._peek()[1] == token and self._peek()[0] in ("keyword", "op"):
+            self.index += 1
+            return True
+        return False
+
+    def _expect(self, token: str) -> None:
+        if not self._accept(token):
+            raise self._error(repr(token))
+
+    def parse(self) -> Test:
+        test = self._or()
+        if self.index != len(self.tokens):
+            raise self._error("'and', 'or' or the end of the expression")
+        return test
+
+    def _or(self) -> Test:
+        tests = [self._and()]
+        while self._accept("or"):
+            tests.append(self._and())
+        return _fold(tests, lambda a, b: lambda record: a(record) or b(record))
+
+    def _and(self) -> Test:
+        tests = [self._not()]
+        while self._accept("and"):
+            tests.append(self._not())
+        return _fold(tests, lambda a, b: lambda record: a(record) and b(record))
+
+    def _not(self) -> Test:
+        if self._accept("not"):
+            test = self._not()
+            return lambda record: not test(record)
+        return self._primary()
+
+    def _path(self) -> Callable[[Record], Any]:
+        kind, token = self._peek()
+        if kind != "name":
+            raise self._error("a field path")
+        self.index += 1
+        segments = tuple(
+            part[1:-1] if part.startswith("`") else part for part in re.findall(r"`[^`]+`|[^.`]+", token)  # type: ignore[arg-type]
+        )
+        self.paths.append(".".join(segments))
+        return _getter(segments)
+
+    def _literal(self) -> _Literal:
+        kind, token = self._peek()
+        self.index += 1
+        if kind == "number":
+            if re.fullmatch(r"-?\d+", token):  # type: ignore[arg-type]
+                return _Literal(int(token))  # type: ignore[arg-type]
+            return _Literal(Decimal(token))  # type: ignore[arg-type]
+        if kind == "string":
+            import ast
+
+            return _Literal(ast.literal_eval(token))  # type: ignore[arg-type]
+        if kind == "keyword" and token in ("true", "false", "null"):
+            return _Literal({"true": True, "false": False, "null": None}[token])  # type: ignore[index]
+        self.index -= 1
+        raise self._error("a string, number, true, false or null")
+
+    def _list(self) -> List[_Literal]:
+        self._expect("[")
+        literals: List[_Literal] = []
+        if not self._accept("]"):
+            literals.append(self._literal())
+            while self._accept(","):
+                literals.append(self._literal())
+            self._expect("]")
+        return literals
+
+    def _primary(self) -> Test:
+        if self._accept("("):
+            test = self._or()
+            self._expect(")")
+            return test
+        if self._accept("exists"):
+            get = self._path()
+            return lambda record: get(record) is not _MISSING
+        get = self._path()
+        if self._accept("in"):
+            return _member(get, self._list(), self.numeric_strings)
+        if self._accept("not"):
+            self._expect("in")
+            test = _member(get, self._list(), self.numeric_strings)
+            return lambda record: not test(record)
+        kind, op = self._peek()
+        if kind != "op" or op not in _COMPARISONS:
+            raise self._error("a comparison (==, !=, <, <=, >, >=), 'in' or 'not in'")
+        self.index += 1
+        literal = self._literal()
+        if op in ("==", "!="):
+            test = _equals(get, literal, self.numeric_strings)
+            return test if op == "==" else (lambda record: not test(record))
+        if not (literal.is_number() or isinstance(literal.value, str)):
+            raise WhereSyntaxError(f"{op} needs a number or a string, not {literal.value!r}, in --where {self.text!r}")
+        return _ordered(get, op, literal, self.numeric_strings)
+
+
+class Where:
+    """
+    A compiled --where expression: call it with a parsed record.
+
+        status == "active" and (country in ["DE", "FR"] or exists vip)
+        total >= 100 and not customer.email == null
+
+    Paths are dotted object keys (quote a key containing dots or spaces with
+    backticks); a record that is not an object reads as {"value": record}.
+    A missing path compares like null, and `exists` tells them apart.
+    <, <=, > and >= hold only between two numbers or two strings, and
+    booleans only equal booleans. With numeric_strings (records parsed with
+    --number-mode string), number literals also compare with strings that
+    spell a number. paths lists every field path used.
+    """
+
+    def __init__(self, text: str, numeric_strings: bool = False) -> None:
+        parser = _Parser(text, numeric_strings)
+        self.text = text
+        self._test = parser.parse()
+        self.paths = tuple(dict.fromkeys(parser.paths))
+
+    def __call__(self, record: Record) -> bool:
+        return self._test(record)
+
+
+@lru_cache(maxsize=8)
+def compile_where(text: str, numeric_strings: bool = False) -> Where:
+    """Compile (once per expression, per process) a --where expression; raises WhereSyntaxError."""
+    return Where(text, numeric_strings)
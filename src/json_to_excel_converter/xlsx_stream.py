@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import math
+import queue
+import re
+import threading
+import zipfile
+from pathlib import Path
+from typing import IO, Iterable, List, Optional, Sequence
+
+
+# Same set openpyxl rejects with IllegalCharacterError; we drop them instead
+_ILLEGAL_XML_CHARS_RE = re.compile(r"[\000-\010]|[\013-\014]|[\016-\037]")
+
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_XML_DECL = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+_CONTENT_TYPES_HEAD = (
+    _XML_DECL
+    + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    + '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    + '<Default Extension="xml" ContentType="application/xml"/>'
+    + '<Override PartName="/xl/workbook.xml" '
+    + 'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    + '<Override PartName="/xl/styles.xml" '
+    + 'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+)
+
+_ROOT_RELS = (
+    _XML_DECL
+    + f'<Relationships xmlns="{_PKG_REL_NS}">'
+    + '<Relationship Id="rId1" '
+    + 'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    + 'Target="xl/workbook.xml"/>'
+    + "</Relationships>"
+)
+
+_STYLES = (
+    _XML_DECL
+    + f'<styleSheet xmlns="{_MAIN_NS}">'
+    + '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    + '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    + '<fill><patternFill patternType="gray125"/></fill></fills>'
+    + '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    + '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    + '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+    + '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    + "</styleSheet>"
+)
+
+_SHEET_HEAD = _XML_DECL + f'<worksheet xmlns="{_MAIN_NS}"><sheetData>'
+_SHEET_TAIL = "</sheetData></worksheet>"
+
+# Excel's hard limit on rows per worksheet (header row included)
+EXCEL_MAX_ROWS = 1_048_576
+EXCEL_MAX_SHEET_NAME = 31
+
+
+def rollover_sheet_name(base: str, index: int) -> str:
+    """Name of the index-th sheet (1-based): Sheet1, Sheet1_2, Sheet1_3, ..."""
+    if index <= 1:
+        return base
+    suffix = f"_{index}"
+    return base[: EXCEL_MAX_SHEET_NAME - len(suffix)] + suffix
+
+
+def _column_letter(index: int) -> str:
+    """Convert a 0-based column index to its Excel letter (0 -> A, 26 -> AA)."""
+    letters = ""
+    n = index + 1
+    while n:
+        n, rem = divmod(n - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+# xml.sax.saxutils.escape/quoteattr without their import cost (saxutils loads urllib)
+def _escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _quoteattr(text: str) -> str:
+    return '"' + _escape(text).replace('"', "&quot;") + '"'
+
+
+def _cell_xml(ref: str, value: object) -> str:
+    if value is None or value == "":
+        return ""
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, int):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    if isinstance(value, float):
+        if math.isfinite(value):
+            return f'<c r="{ref}"><v>{value!r}</v></c>'
+        value = str(value)
+    text = _ILLEGAL_XML_CHARS_RE.sub("", str(value))
+    space = ' xml:space="preserve"' if text[:1].isspace() or text[-1:].isspace() else ""
+    return f'<c r="{ref}" t="inlineStr"><is><t{space}>{_escape(text)}</t></is></c>'
+
+
+class _ArchiveWriter(threading.Thread):
+    """
+    Background thread that owns the zip archive.
+
+    The producer renders XML and hands encoded chunks over a bounded queue; this
+    thread deflates them into the current zip entry. Compression of a finished
+    sheet therefore overlaps with rendering of the next one, and the queue bound
+    keeps memory capped when compression is the slower side.
+    """
+
+    _STOP = object()
+
+    def __init__(self, archive: zipfile.ZipFile, max_pending: int = 16) -> None:
+        super().__init__(name="xlsx-writer", daemon=True)
+        self._zip = archive
+        self._queue: "queue.Queue[tuple[str, object]]" = queue.Queue(maxsize=max_pending)
+        self._handle: Optional[IO[bytes]] = None
+        self.error: Optional[BaseException] = None
+
+    def run(self) -> None:
+        while True:
+            op, arg = self._queue.get()
+            if self.error is not None:
+                if op == "stop":
+                    return
+                continue
+            try:
+                if op == "open":
+                    self._handle = self._zip.open(str(arg), "w", force_zip64=True)
+                elif op == "data":
+                    assert self._handle is not None
+                    self._handle.write(arg)  # type: ignore[arg-type]
+                elif op == "close":
+                    if self._handle is not None:
+                        self._handle.close()
+                        self._handle = None
+                elif op == "stop":
+                    return
+            except BaseException as exc:  # surfaced to the producer on next submit
+                self.error = exc
+                if self._handle is not None:
+                    try:
+                        self._handle.close()
+                    except Exception:
+                        pass
+                    self._handle = None
+
+    def submit(self, op: str, arg: object = None) -> None:
+        if self.error is not None:
+            raise self.error
+        self._queue.put((op, arg))
+
+    def finish_quietly(self) -> None:
+        """Stop the thread after a producer-side failure, ignoring writer errors."""
+        self._queue.put(("close", None))
+        self._queue.put(("stop", None))
+        self.join()
+
+    def finish(self) -> None:
+        self._queue.put(("close", None))
+        self._queue.put(("stop", None))
+        self.join()
+        if self.error is not None:
+            raise self.error
+
+
+class StreamingWorkbook:
+    """
+    Minimal XLSX writer that streams worksheet XML straight into the zip archive.
+
+    Rows are rendered to XML as they arrive and written through a deflate stream,
+    so memory use does not grow with the number of rows. Strings are stored inline
+    (no shared strings table) to avoid keeping any per-row state. Deflating runs
+    on a dedicated writer thread (see _ArchiveWriter).
+    """
+
+    def __init__(self, output_file: str | Path, *, flush_rows: int = 1000) -> None:
+        self._path = Path(output_file)
+        self._zip = zipfile.ZipFile(self._path, "w", compression=zipfile.ZIP_DEFLATED)
+        self._writer = _ArchiveWriter(self._zip)
+        self._writer.start()
+        self._flush_rows = flush_rows
+        self._sheet_names: List[str] = []
+        self._sheet_open = False
+        self._pending: List[str] = []
+        self._row_idx = 0
+        self._letters: List[str] = []
+
+    @property
+    def row_count(self) -> int:
+        """Rows written to the current sheet."""
+        return self._row_idx
+
+    def add_sheet(self, name: str) -> None:
+        """Finish the current sheet (if any) and start a new one."""
+        self._close_sheet()
+        self._sheet_names.append(name)
+        part = f"xl/worksheets/sheet{len(self._sheet_names)}.xml"
+        self._writer.submit("open", part)
+        self._writer.submit("data", _SHEET_HEAD.encode("utf-8"))
+        self._sheet_open = True
+        self._row_idx = 0
+
+    def append(self, values: Sequence[object]) -> None:
+        if not self._sheet_open:
+            raise RuntimeError("add_sheet() must be called before append()")
+        self._row_idx += 1
+        r = self._row_idx
+        if len(values) > len(self._letters):
+            self._letters.extend(_column_letter(i) for i in range(len(self._letters), len(values)))
+        letters = self._letters
+        cells = "".join(_cell_xml(f"{letters[i]}{r}", v) for i, v in enumerate(values))
+        self._pending.append(f'<row r="{r}">{cells}</row>')
+        if len(self._pending) >= self._flush_rows:
+            self._flush()
+
+    def append_rows(self, rows: Iterable[Sequence[object]]) -> None:
+        for values in rows:
+            self.append(values)
+
+    def _flush(self) -> None:
+        if self._pending and self._sheet_open:
+            self._writer.submit("data", "".join(self._pending).encode("utf-8"))
+            self._pending.clear()
+
+    def _close_sheet(self) -> None:
+        if not self._sheet_open:
+            return
+        self._flush()
+        self._writer.submit("data", _SHEET_TAIL.encode("utf-8"))
+        self._writer.submit("close")
+        self._sheet_open = False
+
+    def close(self) -> None:
+        """Finish the last sheet and write the workbook-level parts."""
+        self._close_sheet()
+        if not self._sheet_names:
+            self.add_sheet("Sheet1")
+            self._close_sheet()
+        self._writer.finish()
+
+        overrides = "".join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for i in range(1, len(self._sheet_names) + 1)
+        )
+        sheets = "".join(
+            f'<sheet name={_quoteattr(name)} sheetId="{i}" r:id="rId{i}"/>'
+            for i, name in enumerate(self._sheet_names, start=1)
+        )
+        rels = "".join(
+            f'<Relationship Id="rId{i}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            f'Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, len(self._sheet_names) + 1)
+        )
+        styles_id = len(self._sheet_names) + 1
+        rels += (
+            f'<Relationship Id="rId{styles_id}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+            'Target="styles.xml"/>'
+        )
+
+        self._zip.writestr("[Content_Types].xml", _CONTENT_TYPES_HEAD + overrides + "</Types>")
+        self._zip.writestr("_rels/.rels", _ROOT_RELS)
+        self._zip.writestr(
+            "xl/workbook.xml",
+            _XML_DECL
+            + f'<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}"><sheets>{sheets}</sheets></workbook>',
+        )
+        self._zip.writestr(
+            "xl/_rels/workbook.xml.rels",
+            _XML_DECL + f'<Relationships xmlns="{_PKG_REL_NS}">{rels}</Relationships>',
+        )
+        self._zip.writestr("xl/styles.xml", _STYLES)
+        self._zip.close()
+
+    def __enter__(self) -> "StreamingWorkbook":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._writer.finish_quietly()
+            self._zip.close()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+
+from typer.testing import CliRunner
+from json_to_excel_converter.batch import batch_app
+from json_to_excel_converter.cli import app
+
+
+def project_root() -> Path:
+    return Path(__file__).resolve().parents[2]
+
+
+def _inputs(tmp_path: Path) -> Path:
+    orders = json.loads((project_root() / "sample.json").read_text(encoding="utf-8"))["orders"]
+    src = tmp_path / "in"
+    (src / "sub").mkdir(parents=True)
+    (src / "a.json").write_text(json.dumps(orders[:2]), encoding="utf-8")
+    (src / "sub" / "b.jsonl").write_text("".join(json.dumps(o) + "\n" for o in orders[2:]), encoding="utf-8")
+    (src / "sub" / "c.json.gz").write_bytes(gzip.compress(json.dumps(orders).encode()))
+    (src / "notes.txt").write_text("ignored", encoding="utf-8")
+    return src
+
+
+def test_batch_out_dir_mirrors_inputs(tmp_path: Path):
+    src = _inputs(tmp_path)
+    out = tmp_path / "out"
+    runner = CliRunner()
+
+    result = runner.invoke(
+        batch_app,
+        [str(src / "a.json"), str(src / "sub"), "--out-dir", str(out), "--workers", "2", "--explode", "items"],
+    )
+    assert result.exit_code == 0, result.output
+    assert "3/3 files" in result.output
+    assert sorted(p.relative_to(out).as_posix() for p in out.rglob("*.csv")) == ["a.csv", "sub/b.csv", "sub/c.csv"]
+
+    # Each output matches a single-file conversion
+    expected = tmp_path / "expected.csv"
+    result = runner.invoke(app, [str(src / "sub" / "c.json.gz"), str(expected), "--explode", "items"])
+    assert result.exit_code == 0, result.output
+    assert (out / "sub" / "c.csv").read_bytes() == expected.read_bytes()
+
+
+def test_batch_merge_and_failures(tmp_path: Path):
+    src = _inputs(tmp_path)
+    (src / "broken.json").write_text('[{"id": 1}, {"id": ', encoding="utf-8")
+    merged = tmp_path / "merged.csv"
+    runner = CliRunner()
+
+    args = [str(src / "*.json"), str(src / "sub/*.jsonl"), "--merge", str(merged), "--workers", "1"]
+    result = runner.invoke(batch_app, args)
+    assert result.exit_code == 1
+    assert "Failed:" in result.output and "broken.json" in result.output
+    # No partial merge is left behind
+    assert "merged output not written" in result.output
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["in"]
+
+    (src / "broken.json").unlink()
+    result = runner.invoke(batch_app, [*args[:-1], "2"])
+    assert result.exit_code == 0, result.output
+    expected = tmp_path / "expected.csv"
+    result = runner.invoke(app, [str(project_root() / "sample.json"), str(expected), "--root", "orders"])
+    assert result.exit_code == 0, result.output
+    assert merged.read_bytes() == expected.read_bytes()
+
+
+def test_batch_rejects_inputs_with_the_same_output(tmp_path: Path):
+    src = tmp_path / "in"
+    src.mkdir()
+    (src / "data.json").write_text('[{"a": 1}]', encoding="utf-8")
+    (src / "data.jsonl").write_text('{"a": 2}\n', encoding="utf-8")
+    (src / "other.json").write_text('[{"a": 3}]', encoding="utf-8")
+    out = tmp_path / "out"
+
+    result = CliRunner().invoke(batch_app, [str(src), "--out-dir", str(out), "--workers", "1"])
+    assert result.exit_code == 2
+    assert "data.json, data.jsonl" in result.output
+    assert not out.exists()
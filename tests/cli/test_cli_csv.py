@@ -95,3 +95,302 @@ def test_csv_include_and_exclude(tmp_path: Path):
     assert not any(c.startswith("details.") for c in cols)
     # Exclusion of a subset under summary should be respected
     assert not any(c.startswith("summary.internal") for c in cols)
+
+
+def test_csv_full_schema_and_saved_index(tmp_path: Path):
+    runner = CliRunner()
+    src = tmp_path / "late.json"
+    # "late" only appears after the sampling window
+    src.write_text('[{"id": 1}, {"id": 2}, {"id": 3, "late": "x"}]', encoding="utf-8")
+    index = tmp_path / "schema.json"
+
+    sampled = tmp_path / "sampled.csv"
+    result = runner.invoke(app, [str(src), str(sampled), "--sample-headers", "1"])
+    assert result.exit_code == 0, result.output
+    assert sampled.read_text(encoding="utf-8").splitlines()[0] == "id"
+
+    full = tmp_path / "full.csv"
+    result = runner.invoke(app, [str(src), str(full), "--sample-headers", "1", "--schema", str(index)])
+    assert result.exit_code == 0, result.output
+    assert full.read_text(encoding="utf-8").splitlines() == ["id,late", "1,", "2,", "3,x"]
+    assert index.exists()
+
+    # A saved index is reused as-is: the discovery pass is skipped
+    src.write_text('[{"id": 4}]', encoding="utf-8")
+    reused = tmp_path / "reused.csv"
+    result = runner.invoke(app, [str(src), str(reused), "--schema", str(index)])
+    assert result.exit_code == 0, result.output
+    assert reused.read_text(encoding="utf-8").splitlines() == ["id,late", "4,"]
+
+
+def test_csv_workers_output_is_identical(tmp_path: Path):
+    runner = CliRunner()
+    src = project_root() / "sample.json"
+    args = ["--root", "orders", "--explode", "items", "--exclude", "customer.address"]
+
+    single = tmp_path / "single.csv"
+    multi = tmp_path / "multi.csv"
+    result = runner.invoke(app, [str(src), str(single), *args])
+    assert result.exit_code == 0, result.output
+    result = runner.invoke(app, [str(src), str(multi), *args, "--workers", "2"])
+    assert result.exit_code == 0, result.output
+
+    assert multi.read_bytes() == single.read_bytes()
+
+
+def test_csv_prune_while_parsing_output_is_identical(tmp_path: Path):
+    runner = CliRunner()
+    src = project_root() / "sample.json"
+    args = ["--root", "orders", "--explode", "items", "--include", "order_id", "--include", "items.product", "--exclude", "customer"]
+
+    full = tmp_path / "full.csv"
+    pruned = tmp_path / "pruned.csv"
+    result = runner.invoke(app, [str(src), str(full), *args])
+    assert result.exit_code == 0, result.output
+    result = runner.invoke(app, [str(src), str(pruned), *args, "--prune-while-parsing"])
+    assert result.exit_code == 0, result.output
+
+    assert pruned.read_bytes() == full.read_bytes()
+    assert full.read_text(encoding="utf-8").splitlines()[0] == "order_id,items.product"
+
+
+def test_csv_from_gzipped_stdin(tmp_path: Path):
+    import gzip
+
+    runner = CliRunner()
+    src = project_root() / "sample.json"
+    dst = tmp_path / "out.csv"
+
+    result = runner.invoke(app, ["-", str(dst), "--root", "orders"], input=gzip.compress(src.read_bytes()))
+    assert result.exit_code == 0, result.output
+
+    expected = tmp_path / "expected.csv"
+    result = runner.invoke(app, [str(src), str(expected), "--root", "orders"])
+    assert result.exit_code == 0, result.output
+    assert dst.read_bytes() == expected.read_bytes()
+
+
+def test_csv_ndjson_input_matches_json(tmp_path: Path):
+    import json
+
+    runner = CliRunner()
+    src = project_root() / "sample.json"
+    orders = json.loads(src.read_text(encoding="utf-8"))["orders"]
+    lines = "".join(json.dumps(o) + "\n" for o in orders).encode()
+    ndjson = tmp_path / "orders.jsonl"
+    ndjson.write_bytes(lines)
+
+    expected = tmp_path / "expected.csv"
+    result = runner.invoke(app, [str(src), str(expected), "--root", "orders", "--explode", "items"])
+    assert result.exit_code == 0, result.output
+
+    dst = tmp_path / "out.csv"
+    result = runner.invoke(app, [str(ndjson), str(dst), "--explode", "items"])
+    assert result.exit_code == 0, result.output
+    assert dst.read_bytes() == expected.read_bytes()
+
+    # Auto-detected from content on stdin
+    piped = tmp_path / "piped.csv"
+    result = runner.invoke(app, ["-", str(piped), "--explode", "items"], input=lines)
+    assert result.exit_code == 0, result.output
+    assert piped.read_bytes() == expected.read_bytes()
+
+
+def test_csv_stats_json(tmp_path: Path):
+    import json
+
+    runner = CliRunner()
+    src = project_root() / "sample.json"
+    dst = tmp_path / "out.csv"
+    report_file = tmp_path / "stats.json"
+
+    result = runner.invoke(
+        app, [str(src), str(dst), "--root", "orders", "--explode", "items", "--stats-json", str(report_file)]
+    )
+    assert result.exit_code == 0, result.output
+    assert "rows out" in result.output
+
+    report = json.loads(report_file.read_text(encoding="utf-8"))
+    assert report["records_in"] == 3
+    assert report["rows_out"] == len(dst.read_text(encoding="utf-8").splitlines()) - 1 == 6
+    assert report["fan_out"] == 2.0
+    assert report["input_bytes"] == src.stat().st_size
+    assert set(report["stages"]) == {"read", "transform", "write"}
+
+
+def test_csv_quiet(tmp_path: Path):
+    runner = CliRunner()
+    src = project_root() / "sample.json"
+    dst = tmp_path / "out.csv"
+
+    result = runner.invoke(app, [str(src), str(dst), "--root", "orders", "--full-schema", "--quiet"])
+    assert result.exit_code == 0, result.output
+    assert result.output == ""
+    assert len(dst.read_text(encoding="utf-8").splitlines()) == 4
+
+
+def test_csv_where(tmp_path: Path):
+    import json
+
+    runner = CliRunner()
+    src = project_root() / "sample.json"
+    dst = tmp_path / "out.csv"
+    stats = tmp_path / "stats.json"
+    args = ["--root", "orders", "--explode", "items", "--include", "order_id", "--include", "items.product"]
+    where = 'order_id in ["ORD001", "ORD003"] and customer.address.country == "USA"'
+
+    for extra in ([], ["--prune-while-parsing"], ["--workers", "2"]):
+        result = runner.invoke(app, [str(src), str(dst), *args, "--where", where, "--stats-json", str(stats), *extra])
+        assert result.exit_code == 0, result.output
+        lines = dst.read_text(encoding="utf-8").splitlines()
+        assert [line.split(",")[0] for line in lines[1:]] == ["ORD001"] * 2 + ["ORD003"] * 3
+        report = json.loads(stats.read_text())
+        assert (report["records_in"], report["records_kept"], report["rows_out"]) == (3, 2, 5)
+
+    # Numbers read as text still compare as numbers
+    for mode in ("decimal", "float", "string"):
+        result = runner.invoke(app, [str(src), str(dst), "--root", "orders", "--number-mode", mode, "--where", "payment.total > 1000"])
+        assert result.exit_code == 0, result.output
+        assert [line.split(",")[0] for line in dst.read_text(encoding="utf-8").splitlines()[1:]] == ["ORD001"]
+
+    result = runner.invoke(app, [str(src), str(dst), "--root", "orders", "--where", "order_id = 1"])
+    assert result.exit_code != 0
+    assert "Unexpected character" in result.output
+
+
+def test_csv_parser_modes_are_identical(tmp_path: Path):
+    runner = CliRunner()
+    src = project_root() / "sample.json"
+    args = ["--root", "orders", "--explode", "items"]
+
+    outputs = []
+    for parser, message in (("stream", "ijson"), ("memory", "in memory"), ("auto", "in memory")):
+        dst = tmp_path / f"{parser}.csv"
+        result = runner.invoke(app, [str(src), str(dst), *args, "--parser", parser])
+        assert result.exit_code == 0, result.output
+        assert f"JSON parser: {message}" in result.output
+        outputs.append(dst.read_bytes())
+    assert outputs[0] == outputs[1] == outputs[2]
+
+    result = runner.invoke(app, [str(src), str(tmp_path / "x.csv"), *args, "--memory-parse-limit", "10"])
+    assert result.exit_code == 0, result.output
+    assert "JSON parser: ijson" in result.output
+
+    result = runner.invoke(app, [str(src), str(tmp_path / "x.csv"), "--parser", "fast"])
+    assert result.exit_code == 2
+    assert "--parser" in result.output
+
+
+def test_csv_parser_split(tmp_path: Path):
+    import json
+
+    runner = CliRunner()
+    src = tmp_path / "orders.json"
+    src.write_text(json.dumps(json.loads((project_root() / "sample.json").read_text())["orders"] * 50))
+    expected = tmp_path / "expected.csv"
+    args = ["--explode", "items", "--where", 'order_id != "ORD002"']
+
+    result = runner.invoke(app, [str(src), str(expected), *args, "--parser", "stream"])
+    assert result.exit_code == 0, result.output
+    for extra in ([], ["--workers", "2"]):
+        dst = tmp_path / "out.csv"
+        result = runner.invoke(app, [str(src), str(dst), *args, "--parser", "split", *extra])
+        assert result.exit_code == 0, result.output
+        assert "split into byte ranges" in result.output
+        assert dst.read_bytes() == expected.read_bytes()
+
+    result = runner.invoke(app, [str(project_root() / "sample.json"), str(tmp_path / "x.csv"), "--parser", "split"])
+    assert result.exit_code == 2
+    assert "Splitting needs a JSON document" in result.output
+
+
+def test_csv_pipeline(tmp_path: Path):
+    import json
+
+    runner = CliRunner()
+    src = project_root() / "sample.json"
+    expected = tmp_path / "expected.csv"
+    dst = tmp_path / "out.csv"
+    stats = tmp_path / "stats.json"
+    args = ["--root", "orders", "--explode", "items", "--where", 'order_id != "ORD002"']
+
+    result = runner.invoke(app, [str(src), str(expected), *args])
+    assert result.exit_code == 0, result.output
+    result = runner.invoke(app, [str(src), str(dst), *args, "--pipeline", "--stats-json", str(stats)])
+    assert result.exit_code == 0, result.output
+    assert "bottleneck" in result.output
+    assert dst.read_bytes() == expected.read_bytes()
+
+    report = json.loads(stats.read_text())
+    assert list(report["stages"]) == ["read", "transform", "write"]
+    assert report["bottleneck"] in report["stages"]
+    assert (report["records_in"], report["records_kept"], report["rows_out"]) == (3, 2, 5)
+    assert {"starved", "blocked"} <= set(report["stages"]["transform"])
+
+
+def test_csv_max_explode_rows(tmp_path: Path):
+    runner = CliRunner()
+    src = project_root() / "sample.json"
+    dst = tmp_path / "out.csv"
+    args = [str(src), str(dst), "--root", "orders", "--explode", "items", "--explode", "tags", "--max-explode-rows", "2"]
+
+    result = runner.invoke(app, args)
+    assert result.exit_code == 1
+    assert "explodes into 4 rows" in result.output
+    assert not dst.exists()
+
+    result = runner.invoke(app, args + ["--explode-overflow", "truncate"])
+    assert result.exit_code == 0, result.output
+    # Orders fan out to 4, 1 and 6 rows; each is cut to at most 2
+    assert len(dst.read_text(encoding="utf-8").splitlines()) - 1 == 2 + 1 + 2
+
+
+def test_csv_checkpoint_and_resume_errors(tmp_path: Path):
+    runner = CliRunner()
+    src = project_root() / "sample.json"
+    expected = tmp_path / "expected.csv"
+    dst = tmp_path / "out.csv"
+    checkpoint = tmp_path / "out.checkpoint"
+
+    result = runner.invoke(app, [str(src), str(expected), "--root", "orders", "--explode", "items"])
+    assert result.exit_code == 0, result.output
+    args = [str(src), str(dst), "--root", "orders", "--explode", "items", "--checkpoint", str(checkpoint)]
+    result = runner.invoke(app, args + ["--checkpoint-interval", "0"])
+    assert result.exit_code == 0, result.output
+    assert dst.read_bytes() == expected.read_bytes()
+    # Removed once the output is complete
+    assert not checkpoint.exists()
+
+    result = runner.invoke(app, args + ["--resume"])
+    assert result.exit_code == 2
+    assert "No checkpoint" in result.output
+
+    result = runner.invoke(app, [str(src), str(tmp_path / "out.xlsx"), "--checkpoint", str(checkpoint)])
+    assert result.exit_code == 2
+    assert "only CSV output can be resumed" in result.output
+
+
+def test_csv_partition_by(tmp_path: Path):
+    runner = CliRunner()
+    src = project_root() / "sample.json"
+    dst = tmp_path / "out.csv"
+
+    result = runner.invoke(
+        app, [str(src), str(dst), "--root", "orders", "--explode", "items", "--partition-by", "order_id"]
+    )
+    assert result.exit_code == 0, result.output
+    shards = sorted(tmp_path.glob("out-*.csv"))
+    assert [s.name for s in shards] == ["out-ORD001.csv", "out-ORD002.csv", "out-ORD003.csv"]
+    assert not dst.exists()
+    headers = {s.read_text(encoding="utf-8").splitlines()[0] for s in shards}
+    assert len(headers) == 1
+    assert sum(len(s.read_text(encoding="utf-8").splitlines()) - 1 for s in shards) == 6
+
+    result = runner.invoke(app, [str(src), str(tmp_path / "out.xlsx"), "--root", "orders", "--split-bytes", "1MB"])
+    assert result.exit_code == 2
+    assert "needs CSV output" in result.output
+
+    for size in ("0", "0.5"):
+        result = runner.invoke(app, [str(src), str(dst), "--root", "orders", "--split-bytes", size])
+        assert result.exit_code == 2
+        assert "at least 1 byte" in result.output
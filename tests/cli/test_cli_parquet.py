@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+from json_to_excel_converter.cli import app
+
+pa = pytest.importorskip("pyarrow")
+
+
+def project_root() -> Path:
+    return Path(__file__).resolve().parents[2]
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+def test_columnar_output_matches_csv_rows(tmp_path: Path, suffix: str):
+    import csv
+
+    import pyarrow.parquet as pq
+
+    runner = CliRunner()
+    src = project_root() / "sample.json"
+    args = ["--root", "orders", "--explode", "items", "--first-column", "order_id"]
+
+    csv_out = tmp_path / "out.csv"
+    result = runner.invoke(app, [str(src), str(csv_out), *args])
+    assert result.exit_code == 0, result.output
+
+    dst = tmp_path / f"out{suffix}"
+    result = runner.invoke(app, [str(src), str(dst), *args, "--batch-rows", "2"])
+    assert result.exit_code == 0, result.output
+
+    table = pq.read_table(dst) if suffix == ".parquet" else pa.ipc.open_file(dst).read_all()
+    with csv_out.open(newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        expected = list(reader)
+
+    assert table.column_names == header
+    assert table.schema.field("items.quantity").type == pa.int64()
+    assert table.schema.field("items.price").type == pa.float64()
+    got = [["" if v is None else str(v) for v in row.values()] for row in table.to_pylist()]
+    assert got == expected
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+def test_columnar_type_change_leaves_no_output(tmp_path: Path, suffix: str):
+    import json
+
+    runner = CliRunner()
+    src = tmp_path / "drift.json"
+    src.write_text(json.dumps([{"n": i} for i in range(5)] + [{"n": "five"}]))
+    dst = tmp_path / f"out{suffix}"
+
+    result = runner.invoke(app, [str(src), str(dst), "--sample-headers", "2", "--batch-rows", "1"])
+    assert result.exit_code == 1
+    assert "Error:" in result.output and "Column 'n'" in result.output
+    assert list(tmp_path.iterdir()) == [src]
@@ -57,3 +57,27 @@ def test_xlsx_include_and_order(tmp_path: Path):
     assert header[0] == "id"
     assert all(c == "id" or str(c).startswith("summary.") or str(c).startswith("details.") for c in header)
     assert str(header[1]).startswith("summary.")
+
+
+def test_xlsx_stream_engine(tmp_path: Path):
+    runner = CliRunner()
+    src = project_root() / "sample.json"
+    dst = tmp_path / "out.xlsx"
+
+    result = runner.invoke(
+        app,
+        [str(src), str(dst), "--root", "orders", "--sheet-name", "Orders", "--first-column", "order_id", "--xlsx-engine", "stream"],
+    )
+    assert result.exit_code == 0, result.output
+
+    wb = openpyxl.load_workbook(dst)
+    ws = wb.active
+    assert ws.title == "Orders"
+    rows = list(ws.iter_rows(values_only=True))
+    header = list(rows[0])
+    assert header[0] == "order_id"
+    assert len(rows) == 4
+    assert rows[1][0] == "ORD001"
+    # Numbers stay numeric in the streamed sheet
+    total = rows[1][header.index("payment.total")]
+    assert isinstance(total, float)
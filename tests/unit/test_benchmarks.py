@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+
+def project_root() -> Path:
+    return Path(__file__).resolve().parents[2]
+
+
+# The benchmark scripts import each other as top-level modules
+sys.path.insert(0, str(project_root() / "benchmarks"))
+
+import bench_suite  # noqa: E402
+import generate  # noqa: E402
+
+
+@pytest.mark.parametrize("shape", sorted(generate.GENERATORS))
+def test_generate_is_deterministic(tmp_path: Path, shape: str):
+    first, again, other = tmp_path / "first.json", tmp_path / "again.json", tmp_path / "other.json"
+    count = generate.generate(shape, first, 20_000, seed=1)
+    assert generate.generate(shape, again, 20_000, seed=1) == count
+    generate.generate(shape, other, 20_000, seed=2)
+
+    assert first.read_bytes() == again.read_bytes()
+    assert first.read_bytes() != other.read_bytes()
+    # Records are written until the size is reached, and the file is valid JSON
+    assert 20_000 <= first.stat().st_size < 20_000 + 10_000
+    document = json.loads(first.read_bytes())
+    records = list(document["data"].values()) if shape == "object-root" else document
+    assert len(records) == count
+    assert [r.get("id", i) for i, r in enumerate(records)] == list(range(count))
+
+
+def test_generate_writes_at_least_one_record(tmp_path: Path):
+    assert generate.generate("wide", tmp_path / "tiny.json", 1) == 1
+
+
+def test_sizes_parse_like_the_cli():
+    # --size names the cached inputs (<shape>-<bytes>-<seed>.json), so units must not drift
+    assert bench_suite.parse_size("10MB") == 10 * 2**20
+    assert bench_suite.parse_size("1gb") == 2**30
+    with pytest.raises(ValueError):
+        bench_suite.parse_size("ten")
+
+
+def _report(**rows_per_s: int) -> dict:
+    return {"results": [{"shape": shape, "writer": "csv", "rows_per_s": rate} for shape, rate in rows_per_s.items()]}
+
+
+def test_compare_flags_slowdowns_past_the_tolerance():
+    baseline = _report(wide=1000, deep=1000, arrays=1000)
+    report = _report(wide=800, deep=700, arrays=1500, extra=1)
+
+    regressions = bench_suite.compare(report, baseline, tolerance=0.25)
+    assert len(regressions) == 1 and regressions[0].startswith("deep/csv: 700 rows/s")
+    # Runs without a baseline entry are not compared
+    assert [r.get("vs_baseline") for r in report["results"]] == [0.8, 0.7, 1.5, None]
+    assert bench_suite.compare(report, baseline, tolerance=0.5) == []
+
+    # Only runs with the same JSON parser are compared
+    for result in baseline["results"]:
+        result["parser"] = "memory"
+    assert bench_suite.compare(report, baseline, tolerance=0.25) == []
+
+
+@pytest.mark.parametrize("shape, writer", [("arrays", "csv"), ("object-root", "xlsx-stream")])
+def test_run_one_reports_every_stage(tmp_path: Path, shape: str, writer: str):
+    source = tmp_path / "in.json"
+    records = generate.generate(shape, source, 20_000)
+
+    result = bench_suite.run_one(shape, writer, source, tmp_path)
+    assert (result["shape"], result["writer"], result["records"]) == (shape, writer, records)
+    # Small files are parsed in memory unless streaming is asked for
+    assert result["parser"] == "memory"
+    assert bench_suite.run_one(shape, writer, source, tmp_path, parser="stream")["parser"] == "stream"
+    # Both shapes explode their line items: more rows than records
+    assert result["rows"] > records
+    assert list(result["stages"]) == list(bench_suite.STAGES)
+    assert all(stage["seconds"] >= 0 for stage in result["stages"].values())
+    assert result["output_mb"] > 0
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import orjson
+import pytest
+
+from json_to_excel_converter.checkpoint import load_checkpoint, write_csv_checkpointed
+from json_to_excel_converter.io_ndjson import InputFormat
+from json_to_excel_converter.io_table import write_csv
+from json_to_excel_converter.pipeline import RecordCursor, RowOptions, iter_source_rows
+
+
+class Crash(Exception):
+    pass
+
+
+def _crash_after(rows, n: int):
+    for i, row in enumerate(rows):
+        if i == n:
+            raise Crash
+        yield row
+
+
+def test_resume_after_crash_matches_uninterrupted_run(tmp_path: Path):
+    records = [{"id": i, "items": [{"n": j} for j in range(i % 4)], "extra": {"late": i} if i > 40 else None} for i in range(100)]
+    src = tmp_path / "in.json"
+    src.write_bytes(orjson.dumps(records))
+    options = RowOptions(explode=("items",))
+    read_options = dict(root_path=None, allow_object_values=False, number_mode="decimal", backend=None)
+
+    expected = tmp_path / "expected.csv"
+    write_csv(iter_source_rows(src, InputFormat.JSON, read_options, options), expected, max_sample=10)
+
+    out = tmp_path / "out.csv"
+    checkpoint = tmp_path / "out.checkpoint"
+    cursor = RecordCursor()
+    rows = iter_source_rows(src, InputFormat.JSON, read_options, options, cursor=cursor)
+    with pytest.raises(Crash):
+        write_csv_checkpointed(
+            _crash_after(rows, 120), out, checkpoint, cursor=cursor, fingerprint="f", interval=0, max_sample=10
+        )
+    state = load_checkpoint(checkpoint)
+    assert 0 < state.records < 100
+    # Rows after the checkpoint were written but are not covered by it
+    out.write_bytes(out.read_bytes() + b"garbage,that,is,dropped\r\n")
+
+    cursor = RecordCursor()
+    rows = iter_source_rows(src, InputFormat.JSON, read_options, options, skip_records=state.records, cursor=cursor)
+    final = write_csv_checkpointed(rows, out, checkpoint, cursor=cursor, fingerprint="f", resume=state, interval=0)
+
+    assert out.read_bytes() == expected.read_bytes()
+    assert final.records == 100
+    assert final.rows == len(expected.read_text(encoding="utf-8").splitlines()) - 1
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from json_to_excel_converter.filters import CHECK, KEEP_ALL, SKIP, ColumnFilter
+from json_to_excel_converter.flatten import flatten_record
+
+
+def test_column_filter_prefix_matching():
+    f = ColumnFilter(includes=["summary", "details.name"], excludes=["summary.internal"], pinned=["id"])
+
+    assert f.keep("id")
+    assert f.keep("summary")
+    assert f.keep("summary.color")
+    assert not f.keep("summary.internal.cost")
+    assert not f.keep("summaryx")  # prefixes only match on dotted boundaries
+    assert f.keep("details.name")
+    assert not f.keep("details.email")
+
+    assert f.descend("details") == CHECK
+    assert f.descend("summary") == CHECK  # an exclude lives below it
+    assert f.descend("summary.color") == KEEP_ALL
+    assert f.descend("summary.internal") == SKIP
+    assert f.descend("metrics") == SKIP
+
+
+def test_flatten_record_pushes_filter_down():
+    record = {
+        "id": 1,
+        "summary": {"color": "red", "internal": {"cost": 3}},
+        "details": {"name": "n", "email": "e"},
+        "tags": [{"k": 1}, {"k": 2}],
+    }
+    f = ColumnFilter(includes=["summary", "tags"], excludes=["summary.internal"], pinned=["id"])
+
+    rows = flatten_record(record, explode_paths=["tags"], column_filter=f)
+    assert rows == [
+        {"id": 1, "summary.color": "red", "tags.k": 1},
+        {"id": 1, "summary.color": "red", "tags.k": 2},
+    ]
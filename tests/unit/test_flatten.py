@@ -28,3 +28,47 @@ def test_flatten_basics_and_lists():
 
     # Decimal is preserved at this stage (writers normalize for CSV/XLSX)
     assert row["price"] == Decimal("12.34")
+
+
+def test_flatten_plans_follow_shape_changes():
+    # Same top-level keys, different nested shapes: cached plans must not leak
+    # one shape's columns into another record
+    records = [
+        {"id": 1, "a": {"b": 1, "c": [1, 2]}},
+        {"id": 2, "a": {"b": 2, "c": [3]}},
+        {"id": 3, "a": {"b": {"deep": True}, "c": "x"}},
+        {"id": 4, "a": "flat"},
+        {"id": 5, "a": {"b": 5, "c": []}},
+    ]
+    # Two passes: the first learns plans, the second runs through them
+    first = [flatten_record(r)[0] for r in records]
+    second = [flatten_record(r)[0] for r in records]
+
+    assert first == second == [
+        {"id": 1, "a.b": 1, "a.c": "1;2"},
+        {"id": 2, "a.b": 2, "a.c": "3"},
+        {"id": 3, "a.b.deep": True, "a.c": "x"},
+        {"id": 4, "a": "flat"},
+        {"id": 5, "a.b": 5, "a.c": ""},
+    ]
+
+
+def test_iter_flatten_record_is_lazy_and_limited():
+    import pytest
+
+    from json_to_excel_converter.flatten import ExplodeLimitError, ExplodeOverflow, iter_flatten_record
+
+    record = {"id": 1, "a": list(range(1000)), "b": [{"x": i} for i in range(1000)]}
+    rows = iter_flatten_record(record, explode_paths=["a", "b"])
+    first = [next(rows) for _ in range(3)]
+    assert first == [{"id": 1, "a": 0, "b.x": 0}, {"id": 1, "a": 0, "b.x": 1}, {"id": 1, "a": 0, "b.x": 2}]
+    # Product order, one fresh dict per row
+    assert next(rows) is not first[0]
+    assert sum(1 for _ in rows) == 1000 * 1000 - 4
+
+    small = {"id": 2, "a": [1, 2], "b": [{"x": 1}, {"x": 2}]}
+    assert flatten_record(small, explode_paths=["a", "b"], max_rows=4) == flatten_record(small, explode_paths=["a", "b"])
+    with pytest.raises(ExplodeLimitError, match="1,000,000 rows"):
+        next(iter_flatten_record(record, explode_paths=["a", "b"], max_rows=10))
+    truncated = flatten_record(record, explode_paths=["a", "b"], max_rows=10, overflow=ExplodeOverflow.TRUNCATE)
+    assert len(truncated) == 10 and truncated[-1] == {"id": 1, "a": 0, "b.x": 9}
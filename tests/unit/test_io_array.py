@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import gzip
+import json
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from json_to_excel_converter.io_array import check_splittable, iter_array_chunks, iter_array_items
+from json_to_excel_converter.io_json import NumberMode, iter_items
+
+# Quotes, escapes, brackets and commas inside strings must not move the cuts
+_TRICKY = [
+    {"id": 1, "s": 'a "quoted" [x], {y}', "nested": {"list": [1, [2, {"k": "]},"}]]}},
+    "\\",
+    'ends with a backslash \\',
+    {"\\\"key\"": ["\\\\", "\\\"", "]", "}", ","]},
+    [],
+    {},
+    None,
+    -1.5,
+    "multi\nline é ☃",
+]
+
+
+@pytest.mark.parametrize("chunk_bytes", [1, 7, 64, 1 << 20])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_iter_array_items_matches_streaming(tmp_path: Path, chunk_bytes: int, indent):
+    src = tmp_path / "in.json"
+    src.write_text("\n " + json.dumps(_TRICKY * 20, indent=indent, ensure_ascii=False) + " \n", encoding="utf-8")
+
+    chunks = list(iter_array_chunks(src, chunk_bytes=chunk_bytes))
+    # Element-aligned ranges, separated by exactly one comma
+    assert all(src.read_bytes()[a.end : b.start] == b"," for a, b in zip(chunks, chunks[1:]))
+    for mode in (NumberMode.DECIMAL, NumberMode.FLOAT, NumberMode.STRING):
+        expected = list(iter_items(src, number_mode=mode, parser="stream"))
+        assert list(iter_array_items(src, mode, chunk_bytes=chunk_bytes)) == expected
+
+
+def test_iter_array_items_empty_and_errors(tmp_path: Path):
+    empty = tmp_path / "empty.json"
+    empty.write_text("[ ]")
+    assert list(iter_array_items(empty)) == []
+
+    numbers = tmp_path / "numbers.json"
+    numbers.write_text("[1.10, 2, 3]")
+    assert list(iter_array_items(numbers, chunk_bytes=2)) == [Decimal("1.10"), 2, 3]
+
+    obj = tmp_path / "obj.json"
+    obj.write_text('{"items": [1, 2]}')
+    with pytest.raises(ValueError, match="top level is an array"):
+        check_splittable(obj)
+
+    gz = tmp_path / "in.json.gz"
+    gz.write_bytes(gzip.compress(b"[1, 2]"))
+    with pytest.raises(ValueError, match="uncompressed"):
+        list(iter_array_items(gz))
+
+    bad = tmp_path / "bad.json"
+    bad.write_text('[{"a": 1}, {"a": 2,}, {"a": 3}]')
+    with pytest.raises(ValueError, match="Invalid JSON in bytes"):
+        list(iter_array_items(bad, chunk_bytes=4))
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import io
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from json_to_excel_converter.io_json import ByteCounter, NumberMode, iter_items, select_backend
+
+
+def _write(tmp_path: Path, text: str) -> Path:
+    path = tmp_path / "in.json"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize(
+    "mode, expected",
+    [
+        (NumberMode.DECIMAL, {"i": 7, "x": Decimal("1.50")}),
+        (NumberMode.FLOAT, {"i": 7, "x": 1.5}),
+        (NumberMode.STRING, {"i": "7", "x": "1.50"}),
+    ],
+)
+def test_iter_items_number_modes(tmp_path: Path, mode: str, expected: dict):
+    src = _write(tmp_path, '[{"i": 7, "x": 1.50}]')
+    [item] = list(iter_items(src, number_mode=mode))
+    assert item == expected
+    assert type(item["x"]) is type(expected["x"])
+
+
+def test_select_backend():
+    name, _module = select_backend()
+    assert name
+    assert select_backend("python")[0] == "python"
+    with pytest.raises(ValueError):
+        select_backend("no_such_backend")
+
+
+class _Pipe(io.RawIOBase):
+    """Read-only, non-seekable byte stream (like stdin or a pipe)."""
+
+    def __init__(self, data: bytes) -> None:
+        self._buf = io.BytesIO(data)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def readinto(self, b) -> int:
+        chunk = self._buf.read(len(b))
+        b[: len(chunk)] = chunk
+        return len(chunk)
+
+
+@pytest.mark.parametrize("seekable", [True, False])
+def test_iter_items_detects_root_type_in_one_pass(seekable: bool):
+    data = b'{"meta": {"n": 2}, "rows": [{"a": 1}, {"a": 2}], "by_id": {"x": {"a": 3}, "y": 4}}'
+
+    def source():
+        return io.BytesIO(data) if seekable else _Pipe(data)
+
+    assert list(iter_items(source(), "rows")) == [{"a": 1}, {"a": 2}]
+    assert list(iter_items(source(), "/by_id", allow_object_values=True)) == [{"a": 3}, {"value": 4}]
+    with pytest.raises(ValueError):
+        list(iter_items(source(), "by_id"))
+    with pytest.raises(ValueError):
+        list(iter_items(source(), "missing"))
+
+
+@pytest.mark.parametrize("codec", ["gzip", "bz2", "lzma"])
+def test_iter_items_decompresses_by_magic_bytes(tmp_path: Path, codec: str):
+    module = __import__(codec)
+    # Extension deliberately says nothing about the compression
+    src = tmp_path / "in.json"
+    src.write_bytes(module.compress(b'{"rows": [' + b",".join(b'{"i": %d}' % i for i in range(5000)) + b"]}"))
+
+    items = list(iter_items(src, "rows"))
+    assert len(items) == 5000
+    assert items[-1] == {"i": 4999}
+
+
+def test_byte_counter_tracks_raw_input(tmp_path: Path):
+    import gzip
+
+    from json_to_excel_converter.io_ndjson import iter_ndjson
+
+    data = b'{"rows": [' + b",".join(b'{"i": %d}' % i for i in range(20000)) + b"]}"
+    plain = tmp_path / "in.json"
+    plain.write_bytes(data)
+    compressed = tmp_path / "in.json.gz"
+    compressed.write_bytes(gzip.compress(data))
+    lines = tmp_path / "in.jsonl"
+    lines.write_bytes(b"".join(b'{"i": %d}\n' % i for i in range(20000)))
+
+    for src in (plain, compressed):
+        counter = ByteCounter()
+        assert len(list(iter_items(src, "rows", counter=counter))) == 20000
+        # Compressed input counts compressed bytes, so it can be compared with the file size
+        assert counter.bytes_read == src.stat().st_size
+
+    counter = ByteCounter()
+    assert len(list(iter_ndjson(lines, chunk_bytes=4096, counter=counter))) == 20000
+    assert counter.bytes_read == lines.stat().st_size
+
+
+def test_iter_items_projection_skips_dropped_subtrees():
+    from json_to_excel_converter.filters import ColumnFilter, RecordProjection
+    from json_to_excel_converter.flatten import flatten_record
+
+    data = (
+        b'{"rows": [{"id": 1, "blob": {"big": [1, 2, 3]}, "meta": {"a": 1, "b": {"c": 2}},'
+        b' "items": [{"sku": "x", "price": 1}, {"price": 2}, 5], "tags": ["t"]},'
+        b' {"id": 2, "meta": 7, "items": []}, 3]}'
+    )
+    column_filter = ColumnFilter(includes=["id", "meta.b", "items.sku"])
+    projection = RecordProjection(column_filter, ["items"])
+
+    for stream in (io.BytesIO(data), _Pipe(data)):
+        records = list(iter_items(stream, "rows", projection=projection))
+        assert records == [
+            {"id": 1, "meta": {"b": {"c": 2}}, "items": [{"sku": "x"}, {}, 5]},
+            {"id": 2, "items": []},
+            3,
+        ]
+    # Same rows as flattening the complete records
+    full = list(iter_items(io.BytesIO(data), "rows"))
+    for projected, record in zip(records, full):
+        kwargs = dict(explode_paths=["items"], column_filter=column_filter)
+        assert flatten_record(projected, **kwargs) == flatten_record(record, **kwargs)
+
+    by_id = b'{"by_id": {"x": {"a": 1, "b": 2}, "y": 4}}'
+    projection = RecordProjection(ColumnFilter(excludes=["b"]))
+    assert list(iter_items(io.BytesIO(by_id), "by_id", True, projection=projection)) == [{"a": 1}, {"value": 4}]
+
+
+@pytest.mark.parametrize("mode", [NumberMode.DECIMAL, NumberMode.FLOAT, NumberMode.STRING])
+@pytest.mark.parametrize(
+    "text, root, allow_object_values",
+    [
+        ('{"data": {"rows": [{"id": 1, "x": 1.25, "n": -12345678901234}, 2, "s", null]}}', "data.rows", False),
+        ('[[{"a": 1}, {"a": 2}], [{"a": 3}]]', "item", False),
+        ('{"by_id": {"x": {"a": -0.5}, "y": 4}}', "by_id", True),
+        ('{"a": 1, "b": [true, false]}', None, True),
+    ],
+)
+def test_memory_parser_matches_stream(tmp_path: Path, mode: str, text: str, root, allow_object_values: bool):
+    src = _write(tmp_path, text)
+    args = (src, root, allow_object_values, mode)
+    memory = list(iter_items(*args, parser="memory"))
+    assert memory == list(iter_items(*args, parser="stream"))
+    assert [type(v) for r in memory if isinstance(r, dict) for v in r.values()] == [
+        type(v) for r in iter_items(*args, parser="stream") if isinstance(r, dict) for v in r.values()
+    ]
+
+
+def test_memory_parser_selection_and_fallback(tmp_path: Path):
+    from json_to_excel_converter.io_json import use_memory_parser
+
+    src = _write(tmp_path, '{"rows": [{"a": 1}, {"a": 2}]}')
+    assert use_memory_parser(src)
+    assert not use_memory_parser(src, memory_limit=8)
+    assert not use_memory_parser(io.BytesIO(b"[]"))
+    assert use_memory_parser(io.BytesIO(b"[]"), "memory")
+    with pytest.raises(ValueError, match="parser"):
+        use_memory_parser(src, "fast")
+
+    # NaN is rejected by both parsers; the streaming fallback reports it at its position
+    bad = _write(tmp_path, '{"rows": [{"a": 1}, {"a": NaN}]}')
+    with pytest.raises(Exception):
+        list(iter_items(bad, "rows", parser="memory"))
+    with pytest.raises(ValueError, match="No items"):
+        list(iter_items(io.BytesIO(b'{"other": []}'), "rows", parser="memory"))
+
+    # Exact decimals come from the stdlib parser, which also keeps integers of any size
+    big = _write(tmp_path, '[{"n": 123456789012345678901234567890, "x": 0.1}]')
+    assert list(iter_items(big, parser="memory")) == [{"n": 123456789012345678901234567890, "x": Decimal("0.1")}]
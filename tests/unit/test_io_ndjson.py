@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import gzip
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from json_to_excel_converter.io_json import NumberMode
+from json_to_excel_converter.io_ndjson import InputFormat, detect_input_format, iter_chunks, iter_ndjson
+
+
+def _lines(n: int) -> bytes:
+    return b"".join(b'{"id": %d, "x": 1.50, "s": "a\\nb"}\n' % i for i in range(n))
+
+
+def test_detect_input_format(tmp_path: Path):
+    lines = tmp_path / "data.json"
+    lines.write_bytes(_lines(2))
+    assert detect_input_format(lines) == InputFormat.NDJSON
+
+    pretty = tmp_path / "pretty.json"
+    pretty.write_text('{\n  "items": [1, 2]\n}\n')
+    assert detect_input_format(pretty) == InputFormat.JSON
+
+    array = tmp_path / "array.json"
+    array.write_text('[{"id": 1},\n{"id": 2}]\n')
+    assert detect_input_format(array) == InputFormat.JSON
+
+    # Extension wins, also behind a compression suffix
+    single = tmp_path / "one.jsonl.gz"
+    single.write_bytes(gzip.compress(b'{"id": 1}\n'))
+    assert detect_input_format(single) == InputFormat.NDJSON
+
+
+def test_iter_ndjson_chunks_split_on_line_boundaries(tmp_path: Path):
+    src = tmp_path / "in.ndjson"
+    # Blank lines and a missing final newline are tolerated
+    src.write_bytes(_lines(500) + b"\n  \n" + b'{"id": 500}')
+
+    chunks = list(iter_chunks(src, chunk_bytes=1000))
+    assert len(chunks) > 10
+    assert chunks[0].start == 0 and chunks[-1].end == src.stat().st_size
+    assert all(a.end == b.start for a, b in zip(chunks, chunks[1:]))
+
+    records = list(iter_ndjson(src, chunk_bytes=1000))
+    assert [r["id"] for r in records] == list(range(501))
+    assert records[0] == {"id": 0, "x": Decimal("1.50"), "s": "a\nb"}
+
+    gz = tmp_path / "in.ndjson.gz"
+    gz.write_bytes(gzip.compress(src.read_bytes()))
+    assert list(iter_ndjson(gz, chunk_bytes=1000)) == records
+
+
+@pytest.mark.parametrize(
+    "mode, expected",
+    [
+        (NumberMode.DECIMAL, Decimal("1.50")),
+        (NumberMode.FLOAT, 1.5),
+        (NumberMode.STRING, "1.50"),
+    ],
+)
+def test_iter_ndjson_number_modes(tmp_path: Path, mode: str, expected: object):
+    src = tmp_path / "in.ndjson"
+    src.write_bytes(_lines(1))
+    [record] = list(iter_ndjson(src, mode))
+    assert record["x"] == expected
+    assert type(record["x"]) is type(expected)
+
+
+def test_iter_ndjson_reports_offset_of_invalid_line(tmp_path: Path):
+    src = tmp_path / "in.ndjson"
+    src.write_bytes(b'{"id": 1}\n{"id": \n')
+    with pytest.raises(ValueError, match="byte offset 10"):
+        list(iter_ndjson(src))
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import csv
+import re
+from pathlib import Path
+
+import openpyxl
+import pytest
+
+from json_to_excel_converter.io_split import parse_size, shard_path, write_split
+from json_to_excel_converter.io_table import write_csv
+
+
+def _read_csv(path: Path) -> list[list[str]]:
+    with path.open(newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+def _rows(n: int) -> list[dict]:
+    return [{"id": i, "region": ["eu", "us", "a/b"][i % 3], "note": "x" * (i % 7)} for i in range(n)]
+
+
+def test_split_rows_and_bytes_reassemble_to_single_file(tmp_path: Path):
+    single = tmp_path / "single.csv"
+    write_csv(_rows(100), single)
+    header, *body = _read_csv(single)
+
+    shards = write_split(_rows(100), tmp_path / "out.csv", split_rows=30)
+    assert [p.name for p in shards] == [f"out-0000{i}.csv" for i in range(1, 5)]
+    parts = [_read_csv(p) for p in shards]
+    assert all(part[0] == header for part in parts)
+    assert [len(part) - 1 for part in parts] == [30, 30, 30, 10]
+    assert [r for part in parts for r in part[1:]] == body
+
+    shards = write_split(_rows(100), tmp_path / "sized.csv", split_bytes=500)
+    sizes = [p.stat().st_size for p in shards]
+    # Each shard ends on the first row boundary at or past the limit
+    assert len(shards) > 2 and all(size < 500 + 40 for size in sizes)
+    assert [r for p in shards for r in _read_csv(p)[1:]] == body
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".xlsx"])
+def test_partition_by_with_few_open_files(tmp_path: Path, suffix: str):
+    shards = write_split(_rows(50), tmp_path / f"out{suffix}", partition_by="region", split_rows=7, max_open_files=1)
+    names = sorted(p.name for p in shards)
+    # "a/b" is not file-name safe: sanitized and made unique with a hash
+    assert re.fullmatch(rf"out-a_b_[0-9a-f]{{8}}-00001{suffix}", names[0])
+    assert f"out-eu-00003{suffix}" in names and f"out-us-00001{suffix}" in names
+
+    def read(path: Path) -> list[list]:
+        if suffix == ".csv":
+            return [[int(r[0]), r[1]] for r in _read_csv(path)[1:]]
+        return [[r[0], r[1]] for r in openpyxl.load_workbook(path).active.iter_rows(min_row=2, values_only=True)]
+
+    by_region: dict[str, list] = {}
+    for path in shards:
+        rows = read(path)
+        assert 0 < len(rows) <= 7
+        by_region.setdefault(rows[0][1], []).extend(rows)
+    for region, rows in by_region.items():
+        assert {r[1] for r in rows} == {region}
+        # Input order is kept within a partition
+        assert [r[0] for r in rows] == [i for i in range(50) if _rows(50)[i]["region"] == region]
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+@pytest.mark.parametrize("partition_by", [None, "region"])
+def test_columnar_shards_share_one_schema(tmp_path: Path, suffix: str, partition_by: str | None):
+    pa = pytest.importorskip("pyarrow")
+    # Alone, the first shard would type "amount" as int64 and "flag" as null-only string
+    rows = [{"region": "eu", "amount": 1}, {"region": "eu", "amount": 2}]
+    rows += [{"region": "us", "amount": 2.5, "flag": True}, {"region": "us", "amount": 3, "flag": False}]
+    shards = write_split(rows, tmp_path / f"out{suffix}", split_rows=2, partition_by=partition_by)
+    assert len(shards) == 2
+
+    def read(path: Path):
+        if suffix == ".parquet":
+            import pyarrow.parquet as pq
+
+            return pq.read_table(path)
+        return pa.ipc.open_file(str(path)).read_all()
+
+    tables = [read(path) for path in shards]
+    assert tables[0].schema == tables[1].schema
+    assert tables[0].schema.field("amount").type == pa.float64()
+    assert tables[0].schema.field("flag").type == pa.bool_()
+    assert tables[0].column("amount").to_pylist() == [1.0, 2.0]
+
+
+def test_parse_size_and_shard_path():
+    assert parse_size("1.5KB") == 1536 and parse_size("2g") == 2 << 30 and parse_size("100") == 100
+    with pytest.raises(ValueError):
+        parse_size("lots")
+    assert shard_path("dir/out.csv", 2, "eu") == Path("dir/out-eu-00002.csv")
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import openpyxl
+import pytest
+
+from json_to_excel_converter.io_table import XlsxEngine, write_xlsx
+
+
+@pytest.mark.parametrize("engine", [XlsxEngine.OPENPYXL, XlsxEngine.STREAM])
+def test_xlsx_rollover_repeats_header(tmp_path: Path, engine: str):
+    rows = [{"id": i, "name": f"n{i}"} for i in range(7)]
+    dst = tmp_path / "out.xlsx"
+
+    write_xlsx(rows, dst, sheet_name="Sheet1", engine=engine, max_rows_per_sheet=4)
+
+    wb = openpyxl.load_workbook(dst)
+    assert wb.sheetnames == ["Sheet1", "Sheet1_2", "Sheet1_3"]
+    sheets = [list(wb[name].iter_rows(values_only=True)) for name in wb.sheetnames]
+    # Every sheet starts with the header, data rows fill the rest
+    assert all(s[0] == ("id", "name") for s in sheets)
+    assert [len(s) for s in sheets] == [4, 4, 2]
+    ids = [r[0] for s in sheets for r in s[1:]]
+    assert ids == list(range(7))
+
+
+def test_parquet_batches_and_inferred_types(tmp_path: Path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from decimal import Decimal
+
+    from json_to_excel_converter.io_table import write_parquet
+
+    rows = [
+        {"id": i, "price": Decimal("1.5") if i % 2 else 2, "ok": i % 3 == 0, "note": None if i else {"a": 1}}
+        for i in range(10)
+    ]
+    dst = tmp_path / "out.parquet"
+    write_parquet(rows, dst, batch_rows=4, max_sample=2)
+
+    meta = pq.ParquetFile(dst).metadata
+    assert meta.num_row_groups == 3
+    table = pq.read_table(dst)
+    assert [str(t) for t in table.schema.types] == ["int64", "double", "bool", "string"]
+    assert table.column("price").to_pylist()[:2] == [2.0, 1.5]
+    assert table.column("note").to_pylist()[:2] == ['{"a":1}', None]
+
+
+def test_columnar_type_drift_after_sample_is_reported(tmp_path: Path):
+    pytest.importorskip("pyarrow")
+    from json_to_excel_converter.io_table import write_arrow
+
+    rows = [{"id": 1}, {"id": 2}, {"id": "three"}]
+    with pytest.raises(ValueError, match="--sample-headers"):
+        write_arrow(rows, tmp_path / "out.arrow", batch_rows=1, max_sample=1)
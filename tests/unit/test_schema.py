@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from pathlib import Path
+
+from json_to_excel_converter.schema import discover_schema, load_schema, save_schema, schema_headers
+
+
+def test_discover_schema_first_seen_and_types(tmp_path: Path):
+    rows = [
+        {"id": 1, "note": None},
+        {"id": 2, "note": "hi", "price": Decimal("1.5")},
+        {"flag": True},
+    ]
+
+    columns = discover_schema(rows)
+    assert schema_headers(columns) == ["id", "note", "price", "flag"]
+    assert columns["price"] == {"first_seen": 1, "type": "number"}
+    # Type comes from the first non-null value
+    assert columns["note"]["type"] == "string"
+    assert columns["flag"]["type"] == "boolean"
+
+    index = tmp_path / "schema.json"
+    save_schema(columns, index)
+    assert load_schema(index) == columns
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Loaded only by the code paths that need them (see docs/tech.md, "Start-up")
+LAZY_MODULES = ("openpyxl", "rich.progress", "csv", "multiprocessing", "pyarrow", "xml.sax")
+
+# Generous ceilings on `python -X importtime` cumulative times, in microseconds:
+# they catch a heavy module creeping back onto the import path, not noise.
+# Wall-clock checks, so only run with JSON_TO_EXCEL_BENCHMARKS=1 set.
+CLI_IMPORT_BUDGET_US = 600_000
+OWN_MODULES_BUDGET_US = 100_000
+
+benchmark = pytest.mark.skipif(
+    not os.environ.get("JSON_TO_EXCEL_BENCHMARKS"), reason="timing budget; set JSON_TO_EXCEL_BENCHMARKS=1 to run"
+)
+
+
+def _import_times(module: str) -> dict[str, tuple[int, int]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "self [us]" not in line:
+            self_us, cumulative_us, name = line[len("import time:") :].split("|")
+            times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def test_package_import_does_not_load_cli():
+    times = _import_times("json_to_excel_converter")
+    assert "typer" not in times
+    assert "json_to_excel_converter.cli" not in times
+
+
+def test_cli_import_is_lazy():
+    times = _import_times("json_to_excel_converter.cli")
+    loaded = [m for m in LAZY_MODULES if m in times]
+    assert not loaded, f"imported eagerly by the CLI: {loaded}"
+
+
+@benchmark
+def test_cli_import_is_within_budget():
+    times = _import_times("json_to_excel_converter.cli")
+    assert times["json_to_excel_converter.cli"][1] < CLI_IMPORT_BUDGET_US
+    own = sum(self_us for name, (self_us, _cum) in times.items() if name.startswith("json_to_excel_converter"))
+    assert own < OWN_MODULES_BUDGET_US
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from json_to_excel_converter.parallel import threaded
+from json_to_excel_converter.stats import StageClock, StageStalls
+
+
+def test_stage_clock_charges_exclusive_time():
+    def slow(n: int, delay: float):
+        for i in range(n):
+            time.sleep(delay)
+            yield i
+
+    started = time.perf_counter()
+    clock = StageClock("write")
+    parsed = clock.wrap("read", slow(5, 0.01))
+    doubled = clock.wrap("transform", (x for i in parsed for x in (i, i) if time.sleep(0.002) is None))
+    for _ in doubled:
+        time.sleep(0.001)
+    clock.stop()
+    elapsed = time.perf_counter() - started
+
+    assert clock.items == {"read": 5, "transform": 10}
+    assert list(clock.seconds) == ["write", "transform", "read"]
+    # Sleeps last at least as long as asked, however loaded the machine is
+    assert clock.seconds["read"] >= 0.05
+    assert clock.seconds["transform"] >= 0.02
+    assert clock.seconds["write"] >= 0.01
+    # Exclusive: no time is charged to two stages, so the stages add up to at most the wall time
+    assert sum(clock.seconds.values()) <= elapsed
+
+
+def test_threaded_stages_keep_order_and_report_stalls():
+    produced = []
+
+    def source(n: int):
+        for i in range(n):
+            produced.append(i)
+            yield i
+
+    stalls = StageStalls()
+    records = threaded(source(1000), stalls, "read", "transform", batch_size=10, max_batches=2)
+    rows = threaded((x * 2 for x in records), stalls, "transform", "write", batch_size=10, max_batches=2)
+    first = next(rows)
+    time.sleep(0.05)
+    # Backpressure: the reader stops once the queues and batches in hand are full
+    assert len(produced) < 100
+    assert [first, *rows] == [x * 2 for x in range(1000)]
+    stalls.done("write")
+
+    assert list(stalls.wall) == ["read", "transform", "write"]
+    assert stalls.items == {"read": 1000, "transform": 1000}
+    # The reader produced far more than the queues hold, so it must have waited for room
+    assert stalls.blocked["read"] > 0
+    assert all(stalls.busy(stage) >= 0 and stalls.starved[stage] >= 0 for stage in stalls.wall)
+    assert stalls.bottleneck() in stalls.wall
+
+
+def test_threaded_stage_errors_and_early_close():
+    def failing():
+        yield 1
+        raise KeyError("boom")
+
+    with pytest.raises(KeyError, match="boom"):
+        list(threaded(failing(), StageStalls(), "read", "write", batch_size=1))
+
+    closed = []
+
+    def endless():
+        try:
+            while True:
+                yield 0
+        finally:
+            closed.append(True)
+
+    stalls = StageStalls()
+    rows = threaded(endless(), stalls, "read", "write", batch_size=4, max_batches=1)
+    assert next(rows) == 0
+    rows.close()
+    # The producer thread stopped and closed its source
+    assert closed == [True]
+    assert "read" in stalls.wall
+
+
+def test_pipelined_rows_match_and_follow_records(tmp_path):
+    import json
+
+    from json_to_excel_converter.pipeline import MatchCount, RecordCursor, RowOptions, iter_source_rows
+
+    # Exploded records longer than, equal to and shorter than a hand-off piece, and rejected ones
+    records = [{"id": i, "keep": i % 3 != 1, "items": [{"n": n} for n in range(size)]} for i, size in enumerate([70, 32, 1, 5, 64])]
+    src = tmp_path / "in.json"
+    src.write_text(json.dumps(records), encoding="utf-8")
+    read_options = dict(root_path=None, allow_object_values=False)
+    options = RowOptions(explode=("items",), where="keep == true")
+
+    expected = list(iter_source_rows(src, "json", read_options, options))
+    cursor, matches = RecordCursor(), MatchCount()
+    rows = iter_source_rows(src, "json", read_options, options, stalls=StageStalls(), cursor=cursor, matches=matches)
+    seen = []
+    for row in rows:
+        seen.append((row, cursor.records))
+    assert [row for row, _ in seen] == expected
+    # Each row is consumed while the cursor is at its own record
+    assert [(row["id"], records_seen) for row, records_seen in seen] == [(row["id"], row["id"] + 1) for row in expected]
+    assert (matches.scanned, matches.kept) == (5, 3)
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+import pytest
+
+from json_to_excel_converter.where import WhereSyntaxError, compile_where
+
+RECORD = {
+    "status": "active",
+    "country": "DE",
+    "total": Decimal("150.50"),
+    "ratio": 0.1,
+    "vip": True,
+    "note": None,
+    "customer": {"email": "a@example.com", "a.b": 1},
+    "tags": ["x"],
+}
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ('status == "active"', True),
+        ("status != 'active'", False),
+        ('country in ["DE", "FR"]', True),
+        ('country not in ["DE"]', False),
+        ("total >= 100 and total < 200", True),
+        ("total > 150.5", False),
+        ("ratio == 0.1 and ratio in [0.1]", True),
+        ("vip == true", True),
+        # Booleans only equal booleans
+        ("vip == 1 or vip in [1]", False),
+        ("note == null and missing == null", True),
+        ("exists note and not exists missing", True),
+        ('customer.email == "a@example.com" and customer.`a.b` == 1', True),
+        ('status == "x" or (country == "DE" and not vip == false)', True),
+        # Ordering needs two numbers or two strings
+        ('total > "a" or status > 1 or tags == "x"', False),
+    ],
+)
+def test_where_expressions(expression: str, expected: bool):
+    assert compile_where(expression)(RECORD) is expected
+
+
+def test_where_paths_and_errors():
+    assert compile_where('a.b == 1 or exists c.`d.e`').paths == ("a.b", "c.d.e")
+    # Records that are not objects read as {"value": record}
+    assert compile_where("value > 2")(3)
+    for bad in ["", "status ==", "status = 1", "a < true", "a in 1", "(a == 1", "a == 1 b"]:
+        with pytest.raises(WhereSyntaxError):
+            compile_where(bad)
+
+
+def test_where_number_literals_with_string_numbers():
+    # --number-mode string: numbers arrive as the text of the JSON number
+    record = {"total": "150.50", "count": "3", "name": "abc"}
+    for expression in ["total == 150.5", "total > 100 and total <= 150.50", "count in [1, 3]", "count != 4"]:
+        assert compile_where(expression, numeric_strings=True)(record), expression
+    for expression in ["name == 1", "name < 1", "name in [1]", "total < 100"]:
+        assert not compile_where(expression, numeric_strings=True)(record), expression
+    # Without the flag, strings never equal numbers
+    assert not compile_where("total == 150.5")(record)